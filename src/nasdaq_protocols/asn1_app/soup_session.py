@@ -77,9 +77,8 @@ class Asn1SoupClientSession:
 
     async def _on_soup_message(self, message: soup.SoupMessage):
         if isinstance(message, soup.SequencedData):
-            self.log.debug('%s> incoming sequenced bytes_', self._session_id)
             await self._message_queue.put(
-                self.decode(message.data)[1]
+                self.decode(bytes(message.data))[1]
             )
 
     async def _on_soup_close(self):
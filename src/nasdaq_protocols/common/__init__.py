@@ -1,6 +1,9 @@
 from .utils import *
 from .types import *
 from .message_queue import *
+from .scheduler import *
+from .tracing import *
+from .metrics import *
 from .session import *
 from .message import *
 from .sync_executor import *
@@ -1,4 +1,6 @@
 from .types import *
+from .record_codec import *
 from .structures import *
+from .pool import *
 from .parser import *
 from .codegen import *
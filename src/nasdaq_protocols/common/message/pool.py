@@ -0,0 +1,96 @@
+"""
+Reuse of the message objects of decode-heavy consumers.
+
+Decoding a message creates a message object, its body record and the dictionary of values.
+A `MessagePool` keeps the message objects of every message class and decodes into them
+instead::
+
+    pool = MessagePool(itch.Message)
+
+    _, msg = pool.decode(payload)    # same as itch.Message.from_bytes(payload)
+    handle(msg)
+    pool.release(msg)                # msg must not be used any more
+
+With `flyweight=True` the pool holds a single message per message class, it is overwritten
+by every decode of the class and is never released.
+
+The messages of a pool are **unsafe to retain**: a released message, or a flyweight message
+after the next decode of the same class, is overwritten in place. Copy the values that must
+outlive the handling of the message, e.g. `dict(msg.record.values)`.
+
+The application sessions decode into a pool with `message_pool=`, see `SoupAppClientSession`.
+The messages are then released once the handler returns, see the `on_dispatched` hook of
+`DispatchableMessageQueue`.
+"""
+from typing import Any, Type
+
+import attrs
+from nasdaq_protocols.common.utils import logable
+from .structures import CommonMessage
+
+
+__all__ = [
+    'MessagePool',
+]
+
+
+@logable
+@attrs.define(auto_attribs=True)
+class MessagePool:
+    """
+    Pool of reusable messages of an application.
+
+    :param app: the application message class, e.g. `itch.Message`.
+    :param max_size: number of released messages kept per message class. [Default=64]
+    :param flyweight: keep a single message per message class, overwritten by every decode. [Default=False]
+    """
+    app: Type[CommonMessage]
+    max_size: int = attrs.field(kw_only=True, default=64)
+    flyweight: bool = attrs.field(kw_only=True, default=False)
+    created: int = attrs.field(init=False, default=0)
+    reused: int = attrs.field(init=False, default=0)
+    _free: dict[type, list[CommonMessage]] = attrs.field(init=False, factory=dict)
+
+    def decode(self, bytes_: bytes) -> tuple[int, CommonMessage]:
+        """
+        Decode a message of the application into a message of the pool.
+
+        :param bytes_: the encoded message.
+        :return: (length, message)
+        """
+        return self.app.from_bytes(bytes_, self)
+
+    def acquire(self, msg_cls: Type[CommonMessage]) -> CommonMessage:
+        """
+        Returns a message of `msg_cls`, a released one if any.
+
+        The values of a reused message are those of its previous use, until it is decoded.
+        """
+        free = self._free.get(msg_cls)
+        if free:
+            self.reused += 1
+            return free[0] if self.flyweight else free.pop()
+        self.created += 1
+        msg = msg_cls()
+        if self.flyweight:
+            self._free[msg_cls] = [msg]
+        return msg
+
+    def release(self, msg: Any) -> None:
+        """
+        Give a message back to the pool, the message must not be used any more.
+
+        Messages that are not application messages, e.g. `None`, are ignored, flyweight
+        messages are never released.
+
+        :param msg: the message.
+        """
+        if self.flyweight or not isinstance(msg, CommonMessage):
+            return
+        free = self._free.setdefault(msg.__class__, [])
+        if len(free) < self.max_size:
+            free.append(msg)
+
+    def __len__(self) -> int:
+        """Returns the number of messages available for reuse."""
+        return sum(len(free) for free in self._free.values())
@@ -0,0 +1,417 @@
+"""
+Precompiled codecs for records.
+
+When every field of a record has a fixed width, the whole record can be packed and
+unpacked with one precompiled `struct.Struct`, instead of calling the codec of every
+field on a new slice of the buffer, see `compile_struct_codec`.
+
+Any other record gets straight-line `unpack_from`, `to_bytes`, `pack_into` and `packed_size`
+functions generated for its layout, see `compile_record_codec`. The runs of fixed width fields are handled with
+one `struct.Struct` each at precomputed offsets, the other fields call their own codec,
+`unpack_from` when they have one, on the same buffer at the current offset.
+"""
+import itertools
+import linecache
+import struct
+from typing import Any, Callable, Iterable
+
+import attrs
+from .types import (
+    Boolean, Byte, CharAscii, CharIso8599, FixedAsciiString, FixedIsoString,
+    Int, IntBE, UnsignedInt, UnsignedIntBE,
+    Short, ShortBE, UnsignedShort, UnsignedShortBE,
+    Long, LongBE, UnsignedLong, UnsignedLongBE,
+    resolve_unpack_from, resolve_pack_into, resolve_packed_size,
+)
+
+
+__all__ = [
+    'FieldAccessor',
+    'StructCodec',
+    'RecordCodec',
+    'compile_struct_codec',
+    'compile_record_codec',
+]
+
+
+_Converter = Callable[[Any], Any]
+
+# type -> (byte order, struct format); byte order is None when the type has no byte order.
+_INT_FORMATS = {
+    Byte: (None, 'B'),
+    Short: ('<', 'h'),
+    ShortBE: ('>', 'h'),
+    UnsignedShort: ('<', 'H'),
+    UnsignedShortBE: ('>', 'H'),
+    Int: ('<', 'i'),
+    IntBE: ('>', 'i'),
+    UnsignedInt: ('<', 'I'),
+    UnsignedIntBE: ('>', 'I'),
+    Long: ('<', 'q'),
+    LongBE: ('>', 'q'),
+    UnsignedLong: ('<', 'Q'),
+    UnsignedLongBE: ('>', 'Q'),
+}
+_CHAR_ENCODINGS = {
+    CharAscii: 'ascii',
+    CharIso8599: 'iso-8859-1',
+}
+_FIXED_STRING_ENCODINGS = {
+    FixedAsciiString: 'ascii',
+    FixedIsoString: 'iso-8859-1',
+}
+
+
+@attrs.define(auto_attribs=True)
+class _FieldLayout:
+    byte_order: str | None
+    format: str
+    decoder: _Converter | None = None
+    encoder: _Converter | None = None
+
+
+def _same_codec(type_, base) -> bool:
+    return all(
+        getattr(type_, name, None) is getattr(base, name, None)
+        for name in ('from_bytes', 'to_bytes', 'unpack_from', 'pack_into', 'packed_size')
+    )
+
+
+def _find_base(type_cls, bases: Iterable):
+    """The registered base of `type_cls`, provided the codec functions are not overridden."""
+    for cls in type_cls.__mro__:
+        if cls in bases:
+            return cls
+    return None
+
+
+def _bool_encoder(value):
+    return b'\x01' if value else b'\x00'
+
+
+def _bool_decoder(value):
+    return value == b'\x01'
+
+
+def _char_codec(encoding: str) -> tuple[_Converter, _Converter]:
+    def encode(value: str) -> bytes:
+        return value[:1].encode(encoding)
+
+    def decode(value: bytes) -> str:
+        return value.decode(encoding)
+    return decode, encode
+
+
+def _fixed_string_codec(type_, encoding: str) -> tuple[_Converter, _Converter]:
+    length, right_justified = type_.length, type_.right_justified
+
+    def encode(value: str) -> bytes:
+        encoded = (value.rjust(length) if right_justified else value.ljust(length)).encode(encoding)
+        if len(encoded) != length:
+            # an oversized value, let the per-field codec deal with it.
+            raise struct.error(f'expected {length} bytes, got {len(encoded)}')
+        return encoded
+
+    def decode(value: bytes) -> str:
+        return value.decode(encoding).strip()
+    return decode, encode
+
+
+def _field_layout(type_) -> _FieldLayout | None:
+    if isinstance(type_, type):
+        base = _find_base(type_, _INT_FORMATS)
+        if base is not None and _same_codec(type_, base):
+            return _FieldLayout(*_INT_FORMATS[base])
+
+        base = _find_base(type_, _CHAR_ENCODINGS)
+        if base is not None and _same_codec(type_, base):
+            return _FieldLayout(None, 'c', *_char_codec(_CHAR_ENCODINGS[base]))
+
+        if _find_base(type_, (Boolean,)) is Boolean and _same_codec(type_, Boolean):
+            return _FieldLayout(None, 'c', _bool_decoder, _bool_encoder)
+        return None
+
+    base = _find_base(type(type_), _FIXED_STRING_ENCODINGS)
+    if base is not None and _same_codec(type(type_), base):
+        return _FieldLayout(None, f'{type_.length}s', *_fixed_string_codec(type_, _FIXED_STRING_ENCODINGS[base]))
+    return None
+
+
+@attrs.define(auto_attribs=True)
+class FieldAccessor:
+    """
+    Decodes one field of a fixed-layout record, without decoding the other fields.
+
+    :param offset: offset of the field in the record.
+    :param struct_: the layout of the field.
+    :param decoder: function converting the unpacked value, e.g. bytes to str.
+    """
+    offset: int
+    struct_: struct.Struct
+    decoder: _Converter | None = None
+
+    def decode(self, buffer: bytes | memoryview) -> Any:
+        """
+        Unpack the field from the record in `buffer`.
+
+        :raises struct.error: if the buffer is too short.
+        """
+        value, = self.struct_.unpack_from(buffer, self.offset)
+        return value if self.decoder is None else self.decoder(value)
+
+
+@attrs.define(auto_attribs=True)
+class StructCodec:
+    """
+    Packs and unpacks the values of a fixed-layout record with one `struct.Struct`.
+
+    :param names: names of the fields, in wire order.
+    :param defaults: value of the fields that are not set, in wire order.
+    :param struct_: the compiled layout of the record.
+    :param decoders: (index, function) converting the unpacked value of a field, e.g. bytes to str.
+    :param encoders: (index, function) converting the value of a field before it is packed.
+    :param accessors: name -> accessor decoding that single field.
+    """
+    names: tuple[str, ...]
+    defaults: tuple[Any, ...]
+    struct_: struct.Struct
+    decoders: tuple[tuple[int, _Converter], ...]
+    encoders: tuple[tuple[int, _Converter], ...]
+    accessors: dict[str, FieldAccessor] = attrs.field(factory=dict)
+
+    @property
+    def size(self) -> int:
+        return self.struct_.size
+
+    def decode(self, buffer: bytes | memoryview, offset: int = 0) -> dict[str, Any]:
+        """
+        Unpack the record at `offset` of `buffer`.
+
+        :raises struct.error: if the buffer is too short.
+        """
+        values = self.struct_.unpack_from(buffer, offset)
+        if self.decoders:
+            values = list(values)
+            for index, decoder in self.decoders:
+                values[index] = decoder(values[index])
+        return dict(zip(self.names, values))
+
+    def encode(self, values: dict[str, Any]) -> bytes:
+        """
+        Pack the values of the fields, the fields missing from `values` take their default value.
+
+        :raises struct.error: if a value does not fit its field.
+        """
+        values = [values.get(name, default) for name, default in zip(self.names, self.defaults)]
+        for index, encoder in self.encoders:
+            values[index] = encoder(values[index])
+        return self.struct_.pack(*values)
+
+
+def compile_struct_codec(fields: list) -> StructCodec | None:
+    """
+    Compile the codec of a record.
+
+    :param fields: the fields of the record.
+    :return: the codec, or None if the layout of the record is not fixed, i.e., it contains
+        variable length strings, arrays or nested records, or it mixes byte orders.
+    """
+    if not fields:
+        return None
+
+    byte_orders, layouts, decoders, encoders = set(), [], [], []
+    for index, field in enumerate(fields):
+        layout = _field_layout(field.type)
+        if layout is None:
+            return None
+        if layout.byte_order:
+            byte_orders.add(layout.byte_order)
+        layouts.append(layout)
+        if layout.decoder:
+            decoders.append((index, layout.decoder))
+        if layout.encoder:
+            encoders.append((index, layout.encoder))
+
+    if len(byte_orders) > 1:
+        return None
+    byte_order = byte_orders.pop() if byte_orders else '<'
+
+    accessors, offset = {}, 0
+    for field, layout in zip(fields, layouts):
+        field_struct = struct.Struct(byte_order + layout.format)
+        accessors[field.name] = FieldAccessor(offset, field_struct, layout.decoder)
+        offset += field_struct.size
+
+    return StructCodec(
+        tuple(field.name for field in fields),
+        tuple(field.type.default_value if field.default_value is None else field.default_value for field in fields),
+        struct.Struct(byte_order + ''.join(layout.format for layout in layouts)),
+        tuple(decoders),
+        tuple(encoders),
+        accessors
+    )
+
+
+@attrs.define(auto_attribs=True)
+class RecordCodec:
+    """
+    Codec functions generated for the layout of a record.
+
+    :param unpack_from: `unpack_from(buffer, offset) -> (end offset, values)`, decodes the record
+        at `offset` of `buffer`, raises `struct.error` if the buffer is too short.
+    :param to_bytes: `to_bytes(values) -> (length, bytes)`, encodes the values, the missing fields
+        take their default value, raises `struct.error` if a fixed width value does not fit.
+    :param pack_into: `pack_into(buffer, offset, values) -> end offset`, encodes the values at
+        `offset` of a writable buffer, raises `struct.error` if the buffer is too short.
+    :param packed_size: `packed_size(values) -> int`, the size of the encoded values.
+    :param source: the generated source code, for debugging.
+    :param size: the size of the encoded record when the layout is fixed, None otherwise.
+    """
+    unpack_from: Callable[[bytes | memoryview, int], tuple[int, dict[str, Any]]]
+    to_bytes: Callable[[dict[str, Any]], tuple[int, bytes]]
+    pack_into: Callable[[bytearray | memoryview, int, dict[str, Any]], int]
+    packed_size: Callable[[dict[str, Any]], int]
+    source: str
+    size: int | None = None
+
+    def from_bytes(self, buffer: bytes | memoryview) -> tuple[int, dict[str, Any]]:
+        """Decodes the record at the start of `buffer`, returns (length, values)."""
+        return self.unpack_from(buffer, 0)
+
+
+_codec_ids = itertools.count(1)
+
+
+def _default_value(field) -> Any:
+    return field.type.default_value if field.default_value is None else field.default_value
+
+
+def _split_runs(fields: list) -> list[tuple[bool, list[tuple[int, Any]]]]:
+    """Split the fields into (fixed, [(index, field)]) runs, a fixed run never mixes byte orders."""
+    runs, run_byte_order = [], None
+    for index, field in enumerate(fields):
+        layout = _field_layout(field.type)
+        if layout is None:
+            runs.append((False, [(index, field)]))
+            continue
+        byte_order = layout.byte_order
+        if runs and runs[-1][0] and (not byte_order or not run_byte_order or byte_order == run_byte_order):
+            runs[-1][1].append((index, field))
+            run_byte_order = run_byte_order or byte_order
+        else:
+            runs.append((True, [(index, field)]))
+            run_byte_order = byte_order
+    return runs
+
+
+@attrs.define(auto_attribs=True)
+class _CodecBuilder:
+    """Generates the source of the codec functions, one run of fields at a time."""
+    namespace: dict[str, Any] = attrs.field(factory=dict)
+    decode: list[str] = attrs.field(factory=lambda: ['def unpack_from(buffer, offset):'])
+    encode: list[str] = attrs.field(factory=lambda: ['def to_bytes(values):', '    get = values.get'])
+    pack: list[str] = attrs.field(factory=lambda: ['def pack_into(buffer, offset, values):', '    get = values.get'])
+    sizes: list[str] = attrs.field(factory=list)
+    parts: list[str] = attrs.field(factory=list)
+    lengths: list[str] = attrs.field(factory=list)
+    fixed_size: int = 0
+    # the offset of the next field is `offset + const`.
+    const: int = 0
+
+    def offset(self) -> str:
+        return f'offset + {self.const}' if self.const else 'offset'
+
+    def add_variable_field(self, index: int, field) -> None:
+        self.namespace[f'_unpack_from{index}'] = resolve_unpack_from(field.type)
+        self.namespace[f'_to_bytes{index}'] = field.type.to_bytes
+        self.namespace[f'_pack_into{index}'] = resolve_pack_into(field.type)
+        self.namespace[f'_packed_size{index}'] = resolve_packed_size(field.type)
+        value = f'get({field.name!r}, _default{index})'
+        self.decode.append(f'    offset, v{index} = _unpack_from{index}(buffer, {self.offset()})')
+        self.encode.append(f'    n{index}, p{index} = _to_bytes{index}({value})')
+        self.pack.append(f'    offset = _pack_into{index}(buffer, {self.offset()}, {value})')
+        self.sizes.append(f'_packed_size{index}({value})')
+        self.parts.append(f'p{index}')
+        self.lengths.append(f'n{index}')
+        self.const = 0
+
+    def add_fixed_run(self, run: list[tuple[int, Any]]) -> None:
+        first = run[0][0]
+        codec = compile_struct_codec([field for _, field in run])
+        self.namespace[f'_unpack{first}'] = codec.struct_.unpack_from
+        self.namespace[f'_pack{first}'] = codec.struct_.pack
+        self.namespace[f'_pack_into{first}'] = codec.struct_.pack_into
+
+        targets = ', '.join(f'v{index}' for index, _ in run) + (',' if len(run) == 1 else '')
+        self.decode.append(f'    {targets} = _unpack{first}(buffer, {self.offset()})')
+        for position, decoder in codec.decoders:
+            index = run[position][0]
+            self.namespace[f'_decode{index}'] = decoder
+            self.decode.append(f'    v{index} = _decode{index}(v{index})')
+
+        args = [f'get({field.name!r}, _default{index})' for index, field in run]
+        for position, encoder in codec.encoders:
+            index = run[position][0]
+            self.namespace[f'_encode{index}'] = encoder
+            args[position] = f'_encode{index}({args[position]})'
+        self.encode.append(f'    p{first} = _pack{first}({", ".join(args)})')
+        self.pack.append(f'    _pack_into{first}(buffer, {self.offset()}, {", ".join(args)})')
+        self.parts.append(f'p{first}')
+        self.const += codec.size
+        self.fixed_size += codec.size
+
+    def source(self, fields: list) -> str:
+        values = ', '.join(f'{field.name!r}: v{index}' for index, field in enumerate(fields))
+        length = ' + '.join(([str(self.fixed_size)] if self.fixed_size else []) + self.lengths)
+        encoded = self.parts[0] if len(self.parts) == 1 else f'b"".join(({", ".join(self.parts)}))'
+        decode = self.decode + [f'    return {self.offset()}, {{{values}}}']
+        encode = self.encode + [f'    return {length}, {encoded}']
+        pack = self.pack + [f'    return {self.offset()}']
+        sizes = ['def packed_size(values):']
+        if self.sizes:
+            sizes.append('    get = values.get')
+        sizes.append(f'    return {" + ".join([str(self.fixed_size)] + self.sizes)}')
+        return '\n'.join(decode + [''] + encode + [''] + pack + [''] + sizes) + '\n'
+
+    def size(self) -> int | None:
+        return None if self.sizes else self.fixed_size
+
+
+def compile_record_codec(fields: list, name: str = 'record') -> RecordCodec | None:
+    """
+    Generate the codec functions of a record.
+
+    The generated functions are straight-line code, the offsets of the fields are computed
+    when the record is compiled, relative to the start of the record up to the first variable
+    length field and relative to the end of the last variable length field after it.
+
+    :param fields: the fields of the record.
+    :param name: name of the record, used in the file name of the generated code.
+    :return: the codec, None if the record has no fields.
+    """
+    if not fields:
+        return None
+
+    builder = _CodecBuilder()
+    for index, field in enumerate(fields):
+        builder.namespace[f'_default{index}'] = _default_value(field)
+    for fixed, run in _split_runs(fields):
+        if fixed:
+            builder.add_fixed_run(run)
+        else:
+            builder.add_variable_field(*run[0])
+
+    source = builder.source(fields)
+    filename = f'<record-codec-{next(_codec_ids)} {name}>'
+    # register the source, the tracebacks then show the generated lines.
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace = builder.namespace
+    exec(compile(source, filename, 'exec'), namespace)  # pylint: disable=exec-used
+    return RecordCodec(
+        namespace['unpack_from'],
+        namespace['to_bytes'],
+        namespace['pack_into'],
+        namespace['packed_size'],
+        source,
+        builder.size()
+    )
@@ -3,6 +3,7 @@ This module contains the structures used to represent the messages in the protoc
 """
 import inspect
 import json
+import struct
 from enum import Enum
 from itertools import chain
 from collections import OrderedDict, defaultdict
@@ -12,11 +13,14 @@ import attrs
 from nasdaq_protocols.common.utils import logable
 from nasdaq_protocols.common.types import Serializable
 from nasdaq_protocols.common.types import TypeDefinition
-from .types import Short, Boolean
+from .types import Short, Boolean, resolve_unpack_from, resolve_pack_into, resolve_packed_size, pack_bytes_into
+from .record_codec import FieldAccessor, StructCodec, RecordCodec, compile_struct_codec, compile_record_codec
 
 
 __all__ = [
     'DuplicateMessageException',
+    'UnknownMessageException',
+    'UnknownMessagePolicy',
     'Field',
     'Record',
     'RecordWithPresentBit',
@@ -37,6 +41,26 @@ class DuplicateMessageException(Exception):
     new_msg: Any
 
 
+@attrs.define(auto_exc=True)
+class UnknownMessageException(KeyError):
+    """
+    Exception raised when decoding a message whose id is not defined in the app.
+
+    :param app_name: Name of the app.
+    :param msg_id: The unknown message id.
+    """
+    app_name: str
+    msg_id: Any
+
+
+class UnknownMessagePolicy(Enum):
+    """
+    What `CommonMessage.from_bytes` does with a message whose id is not defined in the app.
+    """
+    RAISE = 'raise'
+    SKIP = 'skip'
+
+
 @attrs.define(auto_attribs=True)
 class Field:
     """
@@ -50,19 +74,131 @@ class Field:
     default_value: Any = None
 
 
+_MISSING = object()
+
+
+class _FieldDescriptor:  # pylint: disable=protected-access
+    """
+    Serves a field of a record as a plain attribute, backed by `record.values`.
+
+    A lazy record decodes the field from its raw payload on first access.
+    """
+    __slots__ = ('name', 'field', 'default', 'unpack_from', 'offset', 'decoder')
+
+    def __init__(self, field: Field, accessor: FieldAccessor | None):
+        self.name = field.name
+        self.field = field
+        self.default = field.type.default_value if field.default_value is None else field.default_value
+        self.unpack_from = accessor.struct_.unpack_from if accessor else None
+        self.offset = accessor.offset if accessor else 0
+        self.decoder = accessor.decoder if accessor else None
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance._values.get(self.name, _MISSING)
+        if value is not _MISSING:
+            return value
+        if instance._raw is None:
+            return self.default
+        value, = self.unpack_from(instance._raw, self.offset)
+        if self.decoder is not None:
+            value = self.decoder(value)
+        instance._values[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        if isinstance(value, Enum):
+            value = value.value
+        if instance.ValidateTypes and not isinstance(value, self.field.type.type_cls):
+            raise ValueError(f'type mismatch, {instance.__class__.__name__}:{self.name},'
+                             f' expected type {self.field.type.hint}, received {type(value)}')
+        instance.values[self.name] = value
+
+
+class _MessageFieldDescriptor:  # pylint: disable=protected-access
+    """Serves a field of the body record of a message as a plain attribute of the message."""
+    __slots__ = ('name', 'field')
+
+    def __init__(self, name: str, field: _FieldDescriptor | None):
+        self.name = name
+        self.field = field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        record = instance.record
+        try:
+            return record._values[self.name]
+        except KeyError:
+            if self.field is not None:
+                return self.field.__get__(record)
+            return getattr(record, self.name)
+
+    def __set__(self, instance, value):
+        setattr(instance.record, self.name, value)
+
+
+def _field_descriptor(record_cls, name: str) -> _FieldDescriptor | None:
+    descriptor = inspect.getattr_static(record_cls, name, None)
+    return descriptor if isinstance(descriptor, _FieldDescriptor) else None
+
+
+def _install_descriptors(cls, names, factory) -> None:
+    """
+    Add a descriptor for each name.
+
+    A name already used by the class, e.g. `hint`, keeps its class attribute. The assignments
+    of these fields go through a `__setattr__` installed on the class instead.
+    """
+    shadowed = {}
+    for name in names:
+        existing = next((vars(base)[name] for base in cls.__mro__ if name in vars(base)), None)
+        if existing is None or isinstance(existing, (_FieldDescriptor, _MessageFieldDescriptor)):
+            setattr(cls, name, factory(name))
+        else:
+            shadowed[name] = factory(name)
+    if not shadowed:
+        return
+
+    base_setattr = super(cls, cls).__setattr__
+
+    def __setattr__(self, name, value):
+        descriptor = shadowed.get(name)
+        if descriptor is None:
+            base_setattr(self, name, value)
+        else:
+            descriptor.__set__(self, value)
+    cls.__setattr__ = __setattr__
+
+
 @attrs.define(eq=False, hash=False)
 class _Record(TypeDefinition):
     Fields: ClassVar[list[Field]]
     IndexedFields: ClassVar[dict[str, Field]]
+    RecordFields: ClassVar[tuple[Field, ...]] = ()
+    Codec: ClassVar[StructCodec | None] = None
+    CompiledCodec: ClassVar[RecordCodec | None] = None
+    UseCompiledCodec: ClassVar[bool] = True
+    ValidateTypes: ClassVar[bool] = True
     default_value: ClassVar[Any] = None
 
-    values = attrs.field(type=dict[str, Any], default=attrs.Factory(lambda self: self.init_values(), takes_self=True))
+    _values = attrs.field(type=dict[str, Any], default=attrs.Factory(lambda self: self.init_values(), takes_self=True))
+    # the undecoded payload of a lazy record, None once the record is decoded or modified.
+    _raw = attrs.field(type=bytes | None, init=False, default=None)
 
     def __init_subclass__(cls):
         try:
             cls.IndexedFields = OrderedDict((f.name, f) for f in cls.Fields)
+            cls.RecordFields = tuple(f for f in cls.Fields if _Record.is_record(f.type))
+            cls.Codec = compile_struct_codec(cls.Fields)
+            cls.CompiledCodec = compile_record_codec(cls.Fields, cls.__name__)
             cls.type_cls = cls
             cls.hint = cls.__name__
+            accessors = cls.Codec.accessors if cls.Codec is not None else {}
+            _install_descriptors(
+                cls, cls.IndexedFields, lambda name: _FieldDescriptor(cls.IndexedFields[name], accessors.get(name))
+            )
             cls.log.debug('Subclassed %s', cls.__name__)
         except AttributeError:
             pass
@@ -70,15 +206,35 @@ class _Record(TypeDefinition):
     def init_values(self):
         # if any field is a record, flatten it.
         # Does not support nested records.
-        return {_.name: _.type() for _ in self.Fields if inspect.isclass(_.type) and issubclass(_.type, _Record)}
+        return {_.name: _.type() for _ in self.RecordFields}
 
     def __attrs_post_init__(self):
-        for field in self.Fields:
-            try:
-                if issubclass(field.type, _Record) and field.name not in self.values:
-                    self.values[field.name] = field.type()
-            except TypeError:
-                pass
+        for field in self.RecordFields:
+            if field.name not in self._values:
+                self._values[field.name] = field.type()
+
+    @property
+    def values(self) -> dict[str, Any]:
+        """The values of the fields, a lazy record is fully decoded."""
+        if self._raw is not None:
+            self._values, self._raw = self.Codec.decode(self._raw), None
+        return self._values
+
+    @values.setter
+    def values(self, values: dict[str, Any]) -> None:
+        self._values, self._raw = values, None
+
+    def is_lazy(self) -> bool:
+        """Returns True if the record still holds its undecoded payload."""
+        return self._raw is not None
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        # pylint: disable=protected-access
+        if self._raw is not None and self._raw == other._raw:
+            return True
+        return self.values == other.values
 
     @staticmethod
     def is_record(type_):
@@ -110,18 +266,6 @@ class _Record(TypeDefinition):
         except KeyError:
             return self.__dict__[item]
 
-    def __setattr__(self, key, value):
-        try:
-            field = self.IndexedFields[key]
-            if isinstance(value, Enum):
-                value = value.value
-            if not isinstance(value, field.type.type_cls):
-                raise ValueError(f'type mismatch, {self.__class__.__name__}:{field.name},'
-                                 f' expected type {field.type.hint}, received {type(value)}')
-            self.values[key] = value
-        except KeyError:
-            self.__dict__[key] = value
-
     def get_field_value(self, key: str) -> Any:
         field = self.IndexedFields[key]
         try:
@@ -140,28 +284,153 @@ class _Record(TypeDefinition):
         return any_
 
 
-@attrs.define
+@attrs.define(eq=False)
 class Record(_Record):
     """
     Represents a record in the message.
+
+    The record is packed and unpacked with the functions generated for its layout when the
+    class is defined, see `compile_record_codec`. When all the fields have a fixed width, the
+    layout is also available as `Codec`, see `compile_struct_codec`.
+
+    Set `UseCompiledCodec` to False, on a record or on `Record` itself for all the records,
+    to go through the codec of every field instead, e.g. when debugging a codec.
+
+    The fields are plain attributes of the record, backed by `values`. Assigning a field checks
+    the type of the value, set `ValidateTypes` to False to skip the check on a hot path.
+    A field named after an attribute of the class, e.g. `hint`, is assigned as usual, read it
+    with `get_field_value`.
+
+    A record with a fixed layout can be decoded lazily, see `from_bytes_lazy`.
     """
+    @classmethod
+    def from_bytes_lazy(cls, bytes_: bytes) -> tuple[int, Any]:
+        """
+        Decode the record lazily.
+
+        The record keeps its raw payload and decodes a field on its first access. Assigning a
+        field, or reading `values`, decodes the whole record. A record that was not modified
+        encodes back to the original payload.
+
+        Records that do not have a fixed layout, see `Codec`, are decoded right away.
+        """
+        codec = cls.Codec
+        size = codec.size if codec is not None else -1
+        if size < 0 or len(bytes_) < size:
+            return cls.from_bytes(bytes_)
+        raw = bytes_[:size]
+        record = cls.__new__(cls)
+        # pylint: disable=protected-access
+        record._values, record._raw = {}, raw if isinstance(raw, bytes) else bytes(raw)
+        return size, record
+
     @classmethod
     def from_bytes(cls, bytes_: bytes) -> tuple[int, Any]:
-        offset = 0
+        return cls._unpack_record(bytes_, 0)
+
+    @classmethod
+    def unpack_from(cls, buffer: bytes | memoryview, offset: int = 0) -> tuple[int, Any]:
+        """
+        Decode the record at `offset` of `buffer`, without slicing the buffer.
+
+        :return: (offset after the record, record)
+        """
+        return cls._unpack_record(buffer, offset)
+
+    @classmethod
+    def decode_into(cls, record: 'Record', buffer: bytes | memoryview, offset: int = 0, lazy: bool = False) -> int:
+        """
+        Decode the record at `offset` of `buffer` into an existing record, replacing its values.
+
+        Used to reuse the records of pooled messages, see `MessagePool`.
+
+        :param record: the record to overwrite.
+        :param buffer: the encoded record.
+        :param offset: offset of the record in `buffer`.
+        :param lazy: keep the raw payload of a fixed layout record, see `from_bytes_lazy`.
+        :return: offset after the record.
+        """
+        # pylint: disable=protected-access
+        codec = cls.Codec
+        if lazy and codec is not None and len(buffer) - offset >= codec.size:
+            end = offset + codec.size
+            raw = buffer[offset:end]
+            record._values.clear()
+            record._raw = raw if isinstance(raw, bytes) else bytes(raw)
+            return end
+        end, record._values = cls._unpack_values(buffer, offset)
+        record._raw = None
+        return end
+
+    @classmethod
+    def _unpack_record(cls, buffer: bytes | memoryview, offset: int) -> tuple[int, Any]:
+        end, values = cls._unpack_values(buffer, offset)
+        return end, cls(values)
+
+    @classmethod
+    def _unpack_values(cls, buffer: bytes | memoryview, offset: int) -> tuple[int, dict[str, Any]]:
+        if cls.UseCompiledCodec and cls.CompiledCodec is not None:
+            try:
+                return cls.CompiledCodec.unpack_from(buffer, offset)
+            except struct.error:
+                # not enough data, the per-field codecs decode whatever is available.
+                pass
         values = {}
         for field in cls.Fields:
-            offset1, value = field.type.from_bytes(bytes_[offset:])
+            offset1, value = field.type.from_bytes(buffer[offset:])
             offset += offset1
             values[field.name] = value
-        return offset, cls(values)
+        return offset, values
 
     @classmethod
     def to_bytes(cls, record: 'Record') -> tuple[int, bytes]:
+        return cls._record_to_bytes(record)
+
+    @classmethod
+    def pack_into(cls, buffer: bytearray | memoryview, offset: int, record: 'Record') -> int:
+        """
+        Encode the record at `offset` of `buffer`, see `packed_size` for the size needed.
+
+        :return: offset after the record.
+        :raises struct.error: if the buffer is too short.
+        """
+        # pylint: disable=protected-access
+        if record._raw is not None:
+            return pack_bytes_into(buffer, offset, record._raw)
+        if cls.UseCompiledCodec and cls.CompiledCodec is not None:
+            try:
+                return cls.CompiledCodec.pack_into(buffer, offset, record._values)
+            except struct.error:
+                # a value that does not fit, the per-field codecs report the error.
+                pass
+        return pack_bytes_into(buffer, offset, cls._record_to_bytes(record)[1])
+
+    @classmethod
+    def packed_size(cls, record: 'Record') -> int:
+        """Returns the size of the encoded record, constant for a fixed layout."""
+        # pylint: disable=protected-access
+        if record._raw is not None:
+            return len(record._raw)
+        if cls.UseCompiledCodec and cls.CompiledCodec is not None:
+            return cls.CompiledCodec.packed_size(record._values)
+        return cls._record_to_bytes(record)[0]
+
+    @classmethod
+    def _record_to_bytes(cls, record: 'Record') -> tuple[int, bytes]:
+        if record.is_lazy():
+            raw = record._raw  # pylint: disable=protected-access
+            return len(raw), raw
+        if cls.UseCompiledCodec and cls.CompiledCodec is not None:
+            try:
+                return cls.CompiledCodec.to_bytes(record.values)
+            except struct.error:
+                # a value that does not fit, the per-field codecs report the error.
+                pass
         segments = list(zip(*(f.type.to_bytes(record.get_field_value(f.name)) for f in cls.Fields)))
         return sum(segments[0]), b''.join(segments[1])
 
 
-@attrs.define
+@attrs.define(eq=False)
 class RecordWithPresentBit(Record):
     """
     Represents a record with a present bit in the message.
@@ -174,6 +443,26 @@ class RecordWithPresentBit(Record):
         offset1, value = super(RecordWithPresentBit, cls).from_bytes(bytes_[offset:])
         return offset+offset1, value
 
+    @classmethod
+    def unpack_from(cls, buffer: bytes | memoryview, offset: int = 0) -> tuple[int, Any]:
+        offset, present = Boolean.unpack_from(buffer, offset)
+        if not present:
+            return offset, None
+        return super(RecordWithPresentBit, cls).unpack_from(buffer, offset)
+
+    @classmethod
+    def pack_into(cls, buffer: bytearray | memoryview, offset: int, record: 'Record') -> int:
+        if record is None or len(record.values) == 0:
+            return Boolean.pack_into(buffer, offset, False)
+        offset = Boolean.pack_into(buffer, offset, True)
+        return super(RecordWithPresentBit, cls).pack_into(buffer, offset, record)
+
+    @classmethod
+    def packed_size(cls, record: 'Record') -> int:
+        if record is None or len(record.values) == 0:
+            return Boolean.packed_size(False)
+        return Boolean.packed_size(True) + super(RecordWithPresentBit, cls).packed_size(record)
+
     @classmethod
     def to_bytes(cls, record: 'Record') -> tuple[int, bytes]:
         if record is None or len(record.values) == 0:
@@ -193,13 +482,26 @@ class Array(TypeDefinition):
     length_type = attrs.field(default=Short)
     packer = attrs.field(init=False, type=Callable[[Type[TypeDefinition]], tuple[int, bytes]])
     unpacker = attrs.field(init=False, type=Callable[[bytes], tuple[int, Any]])
+    _unpack_item = attrs.field(init=False, type=Callable[[bytes, int], tuple[int, Any]])
+    _pack_item = attrs.field(init=False, type=Callable[[bytearray, int, Any], int])
+    _unpack_length = attrs.field(init=False, type=Callable[[bytes, int], tuple[int, int]])
+    _pack_length = attrs.field(init=False, type=Callable[[bytearray, int, int], int])
+    _item_size = attrs.field(init=False, type=Callable[[Any], int])
+    _length_size = attrs.field(init=False, type=Callable[[int], int])
 
     def __attrs_post_init__(self):
         if issubclass(self.type, RecordWithPresentBit):
             record_cls = super(RecordWithPresentBit, self.type)
             self.packer, self.unpacker = record_cls.to_bytes, record_cls.from_bytes
+            self._unpack_item, self._pack_item = record_cls.unpack_from, record_cls.pack_into
+            self._item_size = record_cls.packed_size
         else:
             self.packer, self.unpacker = self.type.to_bytes, self.type.from_bytes
+            self._unpack_item, self._pack_item = resolve_unpack_from(self.type), resolve_pack_into(self.type)
+            self._item_size = resolve_packed_size(self.type)
+        self._unpack_length = resolve_unpack_from(self.length_type)
+        self._pack_length = resolve_pack_into(self.length_type)
+        self._length_size = resolve_packed_size(self.length_type)
 
     @classmethod
     def to_str(cls, _any: Any):
@@ -215,6 +517,11 @@ class Array(TypeDefinition):
         return sum(segments[0]), b''.join(segments[1])
 
     def from_bytes(self, bytes_: bytes) -> tuple[int, Any]:
+        try:
+            return self.unpack_from(bytes_, 0)
+        except struct.error:
+            # not enough data, the per-item codecs decode whatever is available.
+            pass
         offset, len_ = self.length_type.from_bytes(bytes_)
         data = []
         for _ in range(len_):
@@ -223,6 +530,37 @@ class Array(TypeDefinition):
             data.append(value)
         return offset, data
 
+    def unpack_from(self, buffer: bytes | memoryview, offset: int = 0) -> tuple[int, Any]:
+        """
+        Decode the array at `offset` of `buffer`, without slicing the buffer.
+
+        :return: (offset after the array, items)
+        """
+        offset, len_ = self._unpack_length(buffer, offset)
+        unpack_item = self._unpack_item
+        data = []
+        for _ in range(len_):
+            offset, value = unpack_item(buffer, offset)
+            data.append(value)
+        return offset, data
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int, list_: list[Any]) -> int:
+        """
+        Encode the array at `offset` of `buffer`.
+
+        :return: offset after the array.
+        :raises struct.error: if the buffer is too short.
+        """
+        offset = self._pack_length(buffer, offset, len(list_))
+        pack_item = self._pack_item
+        for item in list_:
+            offset = pack_item(buffer, offset, item)
+        return offset
+
+    def packed_size(self, list_: list[Any]) -> int:
+        """Returns the size of the encoded array."""
+        return self._length_size(len(list_)) + sum(map(self._item_size, list_))
+
 
 @attrs.define
 @logable
@@ -233,6 +571,12 @@ class CommonMessage(Serializable):
     MsgIdClass: ClassVar[Serializable] = None
     BodyRecord: ClassVar[Type[Record]] = None
     AppName: ClassVar[str] = None
+    # decode the body records lazily, see `Record.from_bytes_lazy`.
+    LazyDecoding: ClassVar[bool] = False
+    # the encoded `MsgId`, computed once per message class.
+    MsgIdBytes: ClassVar[bytes | None] = None
+    # what to do with the messages of an unknown id, see `from_bytes`.
+    UnknownMsgIdPolicy: ClassVar[UnknownMessagePolicy] = UnknownMessagePolicy.RAISE
 
     record = attrs.field(default=None)
 
@@ -252,6 +596,16 @@ class CommonMessage(Serializable):
             CommonMessage.MsgIdToClsMap[cls.AppName][cls.MsgId] = cls
             CommonMessage.MsgNameToMsgMap[cls.AppName][cls.__name__] = cls
 
+        if cls.MsgId is not None:
+            cls.MsgIdBytes = cls.MsgId.to_bytes()[1]
+
+        if cls.BodyRecord is not None:
+            body_record = cls.BodyRecord
+            _install_descriptors(
+                cls, body_record.IndexedFields,
+                lambda name: _MessageFieldDescriptor(name, _field_descriptor(body_record, name))
+            )
+
     def __attrs_post_init__(self):
         if self.record is None:
             self.record = self.BodyRecord()  # pylint: disable=E1102
@@ -261,16 +615,78 @@ class CommonMessage(Serializable):
         bytes_ = cls.MsgId.to_bytes()[1] + cls.BodyRecord.to_bytes(self.record)[1]
         return len(bytes_), bytes_
 
+    def packed_size(self) -> int:
+        """Returns the size of the encoded message, the message id included."""
+        return len(self.MsgIdBytes) + self.BodyRecord.packed_size(self.record)
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int = 0) -> int:
+        """
+        Encode the message at `offset` of `buffer`, the message id included.
+
+        Together with `packed_size` the message is encoded without intermediate copies::
+
+            buffer = bytearray(msg.packed_size())
+            msg.pack_into(buffer)
+
+        :return: offset after the message.
+        :raises struct.error: if the buffer is too short.
+        """
+        offset = pack_bytes_into(buffer, offset, self.MsgIdBytes)
+        return self.BodyRecord.pack_into(buffer, offset, self.record)
+
     @classmethod
-    def from_bytes(cls, bytes_: bytes) -> tuple[int, 'CommonMessage']:
+    def from_bytes(cls, bytes_: bytes, pool: Any = None) -> tuple[int, 'CommonMessage']:
+        """
+        Decode a message of the application.
+
+        When the message id is not defined in the application, `UnknownMessageException` is
+        raised, or with `UnknownMsgIdPolicy = UnknownMessagePolicy.SKIP` the whole buffer is
+        skipped and the message is None.
+
+        :param bytes_: the encoded message.
+        :param pool: a `MessagePool`, the message is taken from the pool and overwritten
+            instead of being created, see `MessagePool` for the rules of reuse.
+        :return: (length, message)
+        :raises UnknownMessageException: if the message id is unknown.
+        """
         len_, msg_id = cls.MsgIdClass.from_bytes(bytes_)
-        try:
-            msg_cls = CommonMessage.MsgIdToClsMap[cls.AppName][msg_id]
-        except KeyError:
-            cls.log.error('Unknown message id %s', msg_id)
-            raise
-        msg_len, data = msg_cls.BodyRecord.from_bytes(bytes_[len_:])
-        return len_ + msg_len, msg_cls(data)
+        msg_cls = CommonMessage.MsgIdToClsMap[cls.AppName].get(msg_id)
+        if msg_cls is None:
+            return cls.on_unknown_msg_id(bytes_, msg_id)
+        return msg_cls.decode_body(bytes_, len_, pool)
+
+    @classmethod
+    def decode_body(cls, buffer: bytes | memoryview, offset: int, pool: Any = None) -> tuple[int, 'CommonMessage']:
+        """
+        Decode the body of a message of this class, the message id being already decoded.
+
+        :param buffer: the encoded message.
+        :param offset: offset of the body in `buffer`.
+        :param pool: a `MessagePool` to take the message from.
+        :return: (offset after the message, message)
+        """
+        if pool is not None:
+            msg = pool.acquire(cls)
+            return cls.BodyRecord.decode_into(msg.record, buffer, offset, cls.LazyDecoding), msg
+        if cls.LazyDecoding:
+            msg_len, data = cls.BodyRecord.from_bytes_lazy(buffer[offset:])
+            return offset + msg_len, cls(data)
+        end, data = cls.BodyRecord.unpack_from(buffer, offset)
+        return end, cls(data)
+
+    @classmethod
+    def on_unknown_msg_id(cls, bytes_: bytes, msg_id: Any) -> tuple[int, None]:
+        """
+        Apply `UnknownMsgIdPolicy` to a message whose id is not defined in the application.
+
+        :param bytes_: the encoded message.
+        :param msg_id: the unknown message id.
+        :return: (length of `bytes_`, None) when the message is skipped.
+        :raises UnknownMessageException: unless the message is skipped.
+        """
+        if cls.UnknownMsgIdPolicy is UnknownMessagePolicy.SKIP:
+            return len(bytes_), None
+        raise UnknownMessageException(cls.AppName, msg_id)
 
     def __getattr__(self, item):
         try:
@@ -279,13 +695,6 @@ class CommonMessage(Serializable):
         except KeyError:
             return self.__dict__[item]
 
-    def __setattr__(self, key, value):
-        try:
-            _ = self.BodyRecord.IndexedFields[key]
-            setattr(self.record, key, value)
-        except KeyError:
-            self.__dict__[key] = value
-
     def __str__(self):
         data = {
             'message': f'{self.__class__.__name__}[{self.MsgId}]',
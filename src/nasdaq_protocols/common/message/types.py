@@ -1,5 +1,6 @@
+import struct
 from functools import partial
-from typing import Callable, Tuple
+from typing import Any, Callable, Tuple
 from nasdaq_protocols.common.types import TypeDefinition
 
 
@@ -27,6 +28,10 @@ __all__ = [
 ]
 _StringPackable = Callable[[str], Tuple[int, bytes]]
 _StringUnPackable = Callable[[bytes], Tuple[int, str]]
+_Buffer = bytes | bytearray | memoryview
+_UnpackFrom = Callable[[_Buffer, int], Tuple[int, Any]]
+_PackInto = Callable[[bytearray | memoryview, int, Any], int]
+_PackedSize = Callable[[Any], int]
 _IntPackable = Callable[[int], Tuple[int, bytes]]
 _IntUnPackable = Callable[[bytes], Tuple[int, int]]
 _BoolPackable = Callable[[bool], Tuple[int, bytes]]
@@ -35,6 +40,9 @@ _ASCII = 'ascii'
 _ISO_STR = 'iso-8859-1'
 _BIG = 'big'
 _LITTLE = 'little'
+_BYTE = struct.Struct('B')
+_CHAR = struct.Struct('c')
+_STR_LENGTH = struct.Struct('<h')
 
 
 def _int_packer_fac(endian: str, signed: bool, size: int, value: int) -> Tuple[int, bytes]:
@@ -47,7 +55,7 @@ def _int_unpacker_fac(endian: str, signed: bool, size: int, value: bytes) -> Tup
 
 def _str_unpack_fac(encoding: str, data: bytes) -> Tuple[int, str]:
     offset, len_ = Short.from_bytes(data)
-    return offset+len_, data[offset:offset+len_].decode(encoding)
+    return offset+len_, str(data[offset:offset+len_], encoding)
 
 
 def _str_pack_fac(encoding: str, str_: str) -> Tuple[int, bytes]:
@@ -55,6 +63,147 @@ def _str_pack_fac(encoding: str, str_: str) -> Tuple[int, bytes]:
     return len_size+len(str_), len_bytes + str_.encode(encoding)
 
 
+def _fixed_size(size: int) -> _PackedSize:
+    def packed_size(_value: Any) -> int:
+        return size
+    return packed_size
+
+
+def _int_codec(format_: str) -> tuple[_UnpackFrom, _PackInto, _PackedSize]:
+    struct_ = struct.Struct(format_)
+    size, unpack, pack = struct_.size, struct_.unpack_from, struct_.pack_into
+
+    def unpack_from(buffer: _Buffer, offset: int = 0) -> Tuple[int, int]:
+        return offset + size, unpack(buffer, offset)[0]
+
+    def pack_into(buffer: bytearray | memoryview, offset: int, value: int) -> int:
+        pack(buffer, offset, value)
+        return offset + size
+    return unpack_from, pack_into, _fixed_size(size)
+
+
+def _bool_unpack_from(buffer: _Buffer, offset: int = 0) -> Tuple[int, bool]:
+    return offset + 1, _BYTE.unpack_from(buffer, offset)[0] == 1
+
+
+def _bool_pack_into(buffer: bytearray | memoryview, offset: int, value: bool) -> int:
+    _BYTE.pack_into(buffer, offset, 1 if value else 0)
+    return offset + 1
+
+
+def _char_codec(encoding: str) -> tuple[_UnpackFrom, _PackInto, _PackedSize]:
+    def unpack_from(buffer: _Buffer, offset: int = 0) -> Tuple[int, str]:
+        return offset + 1, _CHAR.unpack_from(buffer, offset)[0].decode(encoding)
+
+    def pack_into(buffer: bytearray | memoryview, offset: int, value: str) -> int:
+        _CHAR.pack_into(buffer, offset, value[:1].encode(encoding))
+        return offset + 1
+    return unpack_from, pack_into, _fixed_size(1)
+
+
+def pack_bytes_into(buffer: bytearray | memoryview, offset: int, data: bytes) -> int:
+    """
+    Copy `data` at `offset` of `buffer`, returns the offset after the data.
+
+    :raises struct.error: if the buffer is too short.
+    """
+    end = offset + len(data)
+    if end > len(buffer):
+        # a slice assignment would grow a bytearray, fail as struct.pack_into does.
+        raise struct.error(f'pack_into requires a buffer of at least {end} bytes, got {len(buffer)}')
+    buffer[offset:end] = data
+    return end
+
+
+def _str_packed_size(value: str) -> int:
+    # both encodings are one byte per character.
+    return _STR_LENGTH.size + len(value)
+
+
+def _str_codec(encoding: str) -> tuple[_UnpackFrom, _PackInto, _PackedSize]:
+    def unpack_from(buffer: _Buffer, offset: int = 0) -> Tuple[int, str]:
+        len_, = _STR_LENGTH.unpack_from(buffer, offset)
+        start, end = offset + _STR_LENGTH.size, offset + _STR_LENGTH.size + len_
+        if end > len(buffer):
+            raise struct.error(f'unpack_from requires a buffer of at least {end} bytes, got {len(buffer)}')
+        return end, str(buffer[start:end], encoding)
+
+    def pack_into(buffer: bytearray | memoryview, offset: int, value: str) -> int:
+        encoded = value.encode(encoding)
+        end = pack_bytes_into(buffer, offset + _STR_LENGTH.size, encoded)
+        _STR_LENGTH.pack_into(buffer, offset, len(encoded))
+        return end
+    return unpack_from, pack_into, _str_packed_size
+
+
+def _justify(value: str, length: int, right_justified: bool, encoding: str) -> bytes:
+    encoded = (value.rjust(length) if right_justified else value.ljust(length)).encode(encoding)
+    if len(encoded) != length:
+        # struct would silently truncate the value.
+        raise struct.error(f'expected at most {length} bytes, got {len(encoded)}')
+    return encoded
+
+
+def _declaring_class(type_, name: str) -> type | None:
+    cls = type_ if isinstance(type_, type) else type(type_)
+    return next((base for base in cls.__mro__ if name in vars(base)), None)
+
+
+def _overrides_legacy(type_, name: str, legacy_name: str) -> bool:
+    """True if `legacy_name` is declared below `name` in the hierarchy, or `name` is missing."""
+    declared, legacy = _declaring_class(type_, name), _declaring_class(type_, legacy_name)
+    return declared is None or (legacy is not None and legacy is not declared and issubclass(legacy, declared))
+
+
+def resolve_unpack_from(type_) -> _UnpackFrom:
+    """
+    Returns the `unpack_from(buffer, offset) -> (end offset, value)` codec of a type.
+
+    Types that only provide `from_bytes`, or override the `from_bytes` of a type that provides
+    `unpack_from`, get an adapter calling their `from_bytes` on a slice of the buffer.
+    """
+    if not _overrides_legacy(type_, 'unpack_from', 'from_bytes'):
+        return type_.unpack_from
+    from_bytes = type_.from_bytes
+
+    def unpack_from(buffer: _Buffer, offset: int = 0) -> Tuple[int, Any]:
+        size, value = from_bytes(buffer[offset:])
+        return offset + size, value
+    return unpack_from
+
+
+def resolve_pack_into(type_) -> _PackInto:
+    """
+    Returns the `pack_into(buffer, offset, value) -> end offset` codec of a type.
+
+    Types that only provide `to_bytes`, or override the `to_bytes` of a type that provides
+    `pack_into`, get an adapter copying the result of their `to_bytes` into the buffer.
+    """
+    if not _overrides_legacy(type_, 'pack_into', 'to_bytes'):
+        return type_.pack_into
+    to_bytes = type_.to_bytes
+
+    def pack_into(buffer: bytearray | memoryview, offset: int, value: Any) -> int:
+        return pack_bytes_into(buffer, offset, to_bytes(value)[1])
+    return pack_into
+
+
+def resolve_packed_size(type_) -> _PackedSize:
+    """
+    Returns the `packed_size(value) -> int` function of a type, the size of the encoded value.
+
+    Types that only provide `to_bytes`, or override the `to_bytes` of a type that provides
+    `packed_size`, get an adapter encoding the value with their `to_bytes`.
+    """
+    if not _overrides_legacy(type_, 'packed_size', 'to_bytes'):
+        return type_.packed_size
+    to_bytes = type_.to_bytes
+
+    def packed_size(value: Any) -> int:
+        return to_bytes(value)[0]
+    return packed_size
+
+
 class TypeSize:
     BOOLEAN = 1
     BYTE = 1
@@ -70,6 +219,9 @@ class Boolean(TypeDefinition):
     from_str: Callable[[str], bool] = lambda x: x in ('True', '1')
     to_bytes: _BoolPackable = lambda x: (TypeSize.BOOLEAN, b'\x01' if x else b'\x00')
     from_bytes: _BoolUnPackable = lambda x: (TypeSize.BOOLEAN, x[0:1] == b'\x01')
+    unpack_from: _UnpackFrom = _bool_unpack_from
+    pack_into: _PackInto = _bool_pack_into
+    packed_size: _PackedSize = _fixed_size(TypeSize.BOOLEAN)
     hint = 'bool'
     type_cls = bool
     default_value = False
@@ -81,6 +233,7 @@ class Int(TypeDefinition):
     from_str: Callable[[str], int] = int
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, True, TypeSize.INT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, True, TypeSize.INT)
+    unpack_from, pack_into, packed_size = _int_codec('<i')
     hint = 'int'
     type_cls = int
     default_value = 0
@@ -90,72 +243,84 @@ class Int(TypeDefinition):
 class IntBE(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _BIG, True, TypeSize.INT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _BIG, True, TypeSize.INT)
+    unpack_from, pack_into, packed_size = _int_codec('>i')
 
 
 @TypeDefinition.add_type('uint_4')
 class UnsignedInt(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, False, TypeSize.INT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, False, TypeSize.INT)
+    unpack_from, pack_into, packed_size = _int_codec('<I')
 
 
 @TypeDefinition.add_type('uint_4_be')
 class UnsignedIntBE(UnsignedInt):
     to_bytes: _IntPackable = partial(_int_packer_fac, _BIG, False, TypeSize.INT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _BIG, False, TypeSize.INT)
+    unpack_from, pack_into, packed_size = _int_codec('>I')
 
 
 @TypeDefinition.add_type('byte')
 class Byte(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, False, TypeSize.BYTE)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, False, TypeSize.BYTE)
+    unpack_from, pack_into, packed_size = _int_codec('<B')
 
 
 @TypeDefinition.add_type('int_2')
 class Short(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, True, TypeSize.SHORT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, True, TypeSize.SHORT)
+    unpack_from, pack_into, packed_size = _int_codec('<h')
 
 
 @TypeDefinition.add_type('int_2_be')
 class ShortBE(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _BIG, True, TypeSize.SHORT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _BIG, True, TypeSize.SHORT)
+    unpack_from, pack_into, packed_size = _int_codec('>h')
 
 
 @TypeDefinition.add_type('uint_2')
 class UnsignedShort(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, False, TypeSize.SHORT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, False, TypeSize.SHORT)
+    unpack_from, pack_into, packed_size = _int_codec('<H')
 
 
 @TypeDefinition.add_type('uint_2_be')
 class UnsignedShortBE(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _BIG, False, TypeSize.SHORT)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _BIG, False, TypeSize.SHORT)
+    unpack_from, pack_into, packed_size = _int_codec('>H')
 
 
 @TypeDefinition.add_type('int_8')
 class Long(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, True, TypeSize.LONG)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, True, TypeSize.LONG)
+    unpack_from, pack_into, packed_size = _int_codec('<q')
 
 
 @TypeDefinition.add_type('int_8_be')
 class LongBE(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _BIG, True, TypeSize.LONG)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _BIG, True, TypeSize.LONG)
+    unpack_from, pack_into, packed_size = _int_codec('>q')
 
 
 @TypeDefinition.add_type('uint_8')
 class UnsignedLong(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _LITTLE, False, TypeSize.LONG)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _LITTLE, False, TypeSize.LONG)
+    unpack_from, pack_into, packed_size = _int_codec('<Q')
 
 
 @TypeDefinition.add_type('uint_8_be')
 class UnsignedLongBE(Int):
     to_bytes: _IntPackable = partial(_int_packer_fac, _BIG, False, TypeSize.LONG)
     from_bytes: _IntUnPackable = partial(_int_unpacker_fac, _BIG, False, TypeSize.LONG)
+    unpack_from, pack_into, packed_size = _int_codec('>Q')
 
 
 @TypeDefinition.add_type('char_ascii')
@@ -163,7 +328,8 @@ class CharAscii(TypeDefinition):
     to_str: Callable[[str], str] = str
     from_str: Callable[[str], str] = str
     to_bytes: _StringPackable = lambda x: (TypeSize.CHAR, x[:TypeSize.CHAR].encode(_ASCII))
-    from_bytes: _StringUnPackable = lambda x: (TypeSize.CHAR, x[:TypeSize.CHAR].decode(_ASCII))
+    from_bytes: _StringUnPackable = lambda x: (TypeSize.CHAR, str(x[:TypeSize.CHAR], _ASCII))
+    unpack_from, pack_into, packed_size = _char_codec(_ASCII)
     hint = 'str'
     type_cls = str
     default_value = ' '
@@ -172,7 +338,8 @@ class CharAscii(TypeDefinition):
 @TypeDefinition.add_type('char_iso-8859-1')
 class CharIso8599(CharAscii):
     to_bytes: _StringPackable = lambda x: (TypeSize.CHAR, x[:TypeSize.CHAR].encode('iso-8859-1'))
-    from_bytes: _StringUnPackable = lambda x: (TypeSize.CHAR, x[:TypeSize.CHAR].decode('iso-8859-1'))
+    from_bytes: _StringUnPackable = lambda x: (TypeSize.CHAR, str(x[:TypeSize.CHAR], 'iso-8859-1'))
+    unpack_from, pack_into, packed_size = _char_codec(_ISO_STR)
 
 
 @TypeDefinition.add_type('str_ascii')
@@ -186,6 +353,7 @@ class AsciiString(CharAscii):
     """
     to_bytes: _StringPackable = partial(_str_pack_fac, _ASCII)
     from_bytes: _StringUnPackable = partial(_str_unpack_fac, _ASCII)
+    unpack_from, pack_into, packed_size = _str_codec(_ASCII)
     default_value = ''
 
 
@@ -193,6 +361,7 @@ class AsciiString(CharAscii):
 class Iso8859String(CharAscii):
     to_bytes: _StringPackable = partial(_str_pack_fac, 'iso-8859-1')
     from_bytes: _StringUnPackable = partial(_str_unpack_fac, 'iso-8859-1')
+    unpack_from, pack_into, packed_size = _str_codec(_ISO_STR)
     default_value = ''
 
 
@@ -207,13 +376,24 @@ class FixedAsciiString(TypeDefinition):
     def __init__(self, length, right_justified=False):
         self.length = length
         self.right_justified = right_justified
+        self._struct = struct.Struct(f'{length}s')
 
     def to_bytes(self, value: str) -> Tuple[int, bytes]:
         value = value.rjust(self.length) if self.right_justified else value.ljust(self.length)
         return self.length, value.encode(_ASCII)
 
     def from_bytes(self, data: bytes) -> Tuple[int, str]:
-        return self.length, data[:self.length].decode(_ASCII).strip()
+        return self.length, str(data[:self.length], _ASCII).strip()
+
+    def unpack_from(self, buffer: _Buffer, offset: int = 0) -> Tuple[int, str]:
+        return offset + self.length, self._struct.unpack_from(buffer, offset)[0].decode(_ASCII).strip()
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int, value: str) -> int:
+        self._struct.pack_into(buffer, offset, _justify(value, self.length, self.right_justified, _ASCII))
+        return offset + self.length
+
+    def packed_size(self, _value: str) -> int:
+        return self.length
 
 
 @TypeDefinition.add_type('str_iso-8859-1_n')
@@ -227,10 +407,21 @@ class FixedIsoString(TypeDefinition):
     def __init__(self, length, right_justified=False):
         self.length = length
         self.right_justified = right_justified
+        self._struct = struct.Struct(f'{length}s')
 
     def to_bytes(self, value: str) -> Tuple[int, bytes]:
         value = value.rjust(self.length) if self.right_justified else value.ljust(self.length)
         return self.length, value.encode(_ISO_STR)
 
     def from_bytes(self, data: bytes) -> Tuple[int, str]:
-        return self.length, data[:self.length].decode(_ISO_STR).strip()
+        return self.length, str(data[:self.length], _ISO_STR).strip()
+
+    def unpack_from(self, buffer: _Buffer, offset: int = 0) -> Tuple[int, str]:
+        return offset + self.length, self._struct.unpack_from(buffer, offset)[0].decode(_ISO_STR).strip()
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int, value: str) -> int:
+        self._struct.pack_into(buffer, offset, _justify(value, self.length, self.right_justified, _ISO_STR))
+        return offset + self.length
+
+    def packed_size(self, _value: str) -> int:
+        return self.length
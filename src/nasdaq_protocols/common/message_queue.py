@@ -1,37 +1,92 @@
 import asyncio
 import contextlib
+import inspect
+import time
 from contextlib import asynccontextmanager
-from itertools import count
 from typing import Any, Callable, Awaitable
 
 import attrs
 from .utils import logable, stop_task, Validators
 from .types import Stoppable, StateError, EndOfQueue
+from . import tracing
+from .metrics import SessionMetrics
 
 
 __all__ = [
     'DispatchableMessageQueue',
     'DispatcherCoro',
+    'OnWatermarkCallback',
 ]
 
 
-DispatcherCoro = Callable[[Any], Awaitable[None]]
+DispatcherCoro = Callable[[Any], Awaitable[None] | None]
+OnWatermarkCallback = Callable[[], None]
+
+
+@attrs.define(auto_attribs=True, slots=True)
+class _AwaitedDispatch:
+    """A message whose synchronous dispatch returned an awaitable, queued for the dispatcher task."""
+    msg: Any
+    result: Awaitable
+    start: int
 
 
 @logable
 @attrs.define(auto_attribs=True)
 class DispatchableMessageQueue(Stoppable):
-    """A message queue that dispatches messages to a coro."""
+    """A message queue that dispatches messages to a coro.
+
+    The dispatcher can also be a plain synchronous function. Then, as long as the queue is
+    empty and dispatching is active, the message is handed to the function straight from
+    `put`, without going through the queue. The queue is used only when the handler falls
+    behind, or when dispatching is paused. A function that returns an awaitable, e.g. a
+    lambda wrapping a coroutine, is not synchronous: its result is awaited by the dispatcher
+    task, which then dispatches all the following messages.
+
+    The queue itself is unbounded, but it can signal its owner when it fills up, so that
+    the owner can stop producing::
+
+        queue = DispatchableMessageQueue(session_id, on_msg_coro,
+                                         high_watermark=10000, low_watermark=1000,
+                                         on_high_watermark=transport.pause_reading,
+                                         on_low_watermark=transport.resume_reading)
+
+    :param session_id: The session id.
+    :param on_msg_coro: coroutine or function to which the messages are dispatched.
+    :param high_watermark: `on_high_watermark` is called when the queue holds this many entries.
+    :param low_watermark: once the high watermark was crossed, `on_low_watermark` is called when
+        the queue holds no more than this many entries. [Default=high_watermark // 2]
+    :param on_high_watermark: callback, queue crossed the high watermark.
+    :param on_low_watermark: callback, queue fell back to the low watermark.
+    :param metrics: metrics updated by the queue, the queue depth high-water mark, the
+        watermark crossings and the dispatch latency. [Default=new metrics object]
+    :param on_dispatched: called with every message once the dispatcher is done with it,
+        e.g. `MessagePool.release`. The messages read with `get` are not reported.
+    """
 
     session_id: Any = attrs.field(validator=Validators.not_none())
     on_msg_coro: DispatcherCoro = None
+    high_watermark: int | None = attrs.field(kw_only=True, default=None)
+    low_watermark: int | None = attrs.field(kw_only=True, default=None)
+    on_high_watermark: OnWatermarkCallback | None = attrs.field(kw_only=True, default=None)
+    on_low_watermark: OnWatermarkCallback | None = attrs.field(kw_only=True, default=None)
+    metrics: SessionMetrics = attrs.field(kw_only=True, default=None)
+    on_dispatched: Callable[[Any], None] | None = attrs.field(kw_only=True, default=None)
+    _above_high_watermark: bool = attrs.field(init=False, default=False)
+    _sync_handler: bool = attrs.field(init=False, default=False)
+    _in_flight: bool = attrs.field(init=False, default=False)
     _closed: bool = attrs.field(init=False, default=False)
     _msg_queue: asyncio.Queue = attrs.field(init=False, default=None)
     _buffer_msg_queue: asyncio.Queue | None = attrs.field(init=False, default=None)
     _recv_task: asyncio.Task = attrs.field(init=False, default=None)
     _dispatcher_task: asyncio.Task = attrs.field(init=False, default=None)
+    _idle: asyncio.Event = attrs.field(init=False, factory=asyncio.Event)
 
     def __attrs_post_init__(self):
+        if self.high_watermark is not None and self.low_watermark is None:
+            self.low_watermark = self.high_watermark // 2
+        if self.metrics is None:
+            self.metrics = SessionMetrics(self.session_id)
         self._msg_queue = asyncio.Queue()
         self.start_dispatching(self.on_msg_coro)
 
@@ -39,13 +94,52 @@ class DispatchableMessageQueue(Stoppable):
         """Return the number of entries in the queue."""
         return self._msg_queue.qsize()
 
+    @property
+    def high_watermark_crossings(self) -> int:
+        """Number of times the queue crossed its high watermark."""
+        return self.metrics.queue_high_watermark_crossings
+
+    @property
+    def low_watermark_crossings(self) -> int:
+        """Number of times the queue fell back to its low watermark."""
+        return self.metrics.queue_low_watermark_crossings
+
     async def put(self, msg: Any) -> None:
         """
         put an entry into the queue.
         :param msg: Any
         """
+        if self.dispatches_inline():
+            self._dispatch_inline(msg)
+            return
         queue = self._buffer_msg_queue if self._buffer_msg_queue else self._msg_queue
         await queue.put(msg)
+        self._enqueued(queue)
+
+    def dispatch_nowait(self, msg: Any) -> None:
+        """
+        put an entry into the queue, without waiting. Like `put`, the entry is handed to a
+        synchronous dispatcher right away when nothing is waiting in the queue.
+        :param msg: Any
+        """
+        if self.dispatches_inline():
+            self._dispatch_inline(msg)
+        else:
+            self.put_nowait(msg)
+
+    async def put_batch(self, msgs: list[Any]) -> None:
+        """
+        put all the entries into the queue in one operation.
+        :param msgs: list of entries
+        """
+        index = 0
+        while index < len(msgs) and self.dispatches_inline():
+            self._dispatch_inline(msgs[index])
+            index += 1
+        queue = self._buffer_msg_queue if self._buffer_msg_queue else self._msg_queue
+        for msg in msgs[index:] if index else msgs:
+            queue.put_nowait(msg)
+        self._enqueued(queue)
 
     async def get(self):
         """get an entry from the queue.
@@ -68,6 +162,7 @@ class DispatchableMessageQueue(Stoppable):
         """
         queue = self._buffer_msg_queue if self._buffer_msg_queue else self._msg_queue
         queue.put_nowait(msg)
+        self._enqueued(queue)
 
     def get_nowait(self) -> Any | None:
         """
@@ -79,6 +174,8 @@ class DispatchableMessageQueue(Stoppable):
         msg = None
         try:
             msg = self._msg_queue.get_nowait()
+            if self._above_high_watermark:
+                self._check_low_watermark()
         except asyncio.QueueEmpty:
             if self._closed:
                 raise EndOfQueue()
@@ -100,6 +197,7 @@ class DispatchableMessageQueue(Stoppable):
         if not self._dispatcher_task:
             raise StateError('Dispatcher is not running, cannot pause')
         self._dispatcher_task = await stop_task(self._dispatcher_task)
+        self._idle.set()
         try:
             self.log.debug('%s> queue dispatcher paused.', self.session_id)
             yield
@@ -107,6 +205,13 @@ class DispatchableMessageQueue(Stoppable):
             self._dispatcher_task = asyncio.create_task(self._start_dispatching(), name=f'{self.session_id}-dispatcher')
             self.log.debug('%s> queue dispatcher resumed.', self.session_id)
 
+    def dispatches_inline(self) -> bool:
+        """
+        Returns True if the next message put is handed to the synchronous dispatcher straight
+        from `put`, i.e. it is handled before `put` returns.
+        """
+        return self._sync_handler and self._can_dispatch_inline()
+
     def is_dispatching(self) -> bool:
         """
         Check is message queue is actively dispatching.
@@ -123,9 +228,20 @@ class DispatchableMessageQueue(Stoppable):
             raise StateError('Dispatcher is already running, cannot start')
         if on_msg_coro:
             self.on_msg_coro = on_msg_coro
+            self._sync_handler = not inspect.iscoroutinefunction(on_msg_coro)
             self._dispatcher_task = asyncio.create_task(self._start_dispatching(), name=f'{self.session_id}-dispatcher')
             self.log.debug('%s> queue dispatcher started.', self.session_id)
 
+    async def join(self) -> None:
+        """
+        Wait until the dispatcher handled all the messages of the queue.
+
+        Returns right away when the queue is not dispatching.
+        """
+        while self._dispatcher_task is not None and (self._in_flight or not self._msg_queue.empty()):
+            self._idle.clear()
+            await self._idle.wait()
+
     @contextlib.asynccontextmanager
     async def buffer_until_drained(self, discard_buffer: bool = False):
         """Async context manager that waits until the buffer is drained."""
@@ -155,6 +271,7 @@ class DispatchableMessageQueue(Stoppable):
             self._closed = True
             self._dispatcher_task = await stop_task(self._dispatcher_task)
             self._recv_task = await stop_task(self._recv_task)
+            self._idle.set()
 
     def is_stopped(self) -> bool:
         """
@@ -163,21 +280,102 @@ class DispatchableMessageQueue(Stoppable):
         return self._closed
 
     async def _start_dispatching(self):
-        counter = count(1)
         while True:
             try:
-                await self.on_msg_coro(await self._msg_queue.get())
-                self.log.debug('%s> dispatched message %s', self.session_id, next(counter))
+                msg = await self._msg_queue.get()
+                if self._above_high_watermark:
+                    self._check_low_watermark()
+                await self._dispatch(msg)
             except asyncio.CancelledError:
                 break
-            except Exception as exc:  # pylint: disable=broad-except
-                self.log.warning('%s> Exception when handling message, %s', self.session_id, exc)
+
+    def _can_dispatch_inline(self) -> bool:
+        return (self._dispatcher_task is not None
+                and not self._in_flight
+                and not self._closed
+                and self._buffer_msg_queue is None
+                and self._msg_queue.empty())
+
+    async def _dispatch(self, msg):
+        self._in_flight = True
+        start = time.perf_counter_ns()
+        try:
+            if isinstance(msg, _AwaitedDispatch):
+                msg, result, start = msg.msg, msg.result, msg.start
+            else:
+                result = self.on_msg_coro(msg)
+            if inspect.isawaitable(result):
+                await result
+            if tracing.tracer is not None:
+                tracing.tracer.message_dispatched(self.session_id, msg)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.warning('%s> Exception when handling message, %s', self.session_id, exc)
+        finally:
+            self._dispatched(msg, start)
+
+    def _dispatch_inline(self, msg):
+        self._in_flight = True
+        start = time.perf_counter_ns()
+        try:
+            result = self.on_msg_coro(msg)
+            if inspect.isawaitable(result):
+                # not a synchronous handler, the result is awaited by the dispatcher task,
+                # and so are the following messages to keep them in order.
+                self._sync_handler = False
+                self._in_flight = False
+                self._msg_queue.put_nowait(_AwaitedDispatch(msg, result, start))
+                self._idle.clear()
+                return
+            if tracing.tracer is not None:
+                tracing.tracer.message_dispatched(self.session_id, msg)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.warning('%s> Exception when handling message, %s', self.session_id, exc)
+        self._dispatched(msg, start)
+
+    def _dispatched(self, msg, start: int):
+        self.metrics.dispatch_latency.record(time.perf_counter_ns() - start)
+        self._in_flight = False
+        if self.on_dispatched is not None:
+            self.on_dispatched(msg)
+        if self._msg_queue.empty():
+            # wake up `join`
+            self._idle.set()
+
+    def _enqueued(self, queue: asyncio.Queue):
+        self.metrics.queue_depth_high_water = max(self.metrics.queue_depth_high_water, queue.qsize())
+        if self.high_watermark is not None:
+            self._check_high_watermark()
 
     async def _blocking_read(self):
         self._recv_task = asyncio.create_task(self._msg_queue.get())
         try:
-            return await self._recv_task
+            msg = await self._recv_task
+            if self._above_high_watermark:
+                self._check_low_watermark()
+            return msg
         except asyncio.CancelledError:
             raise EndOfQueue()  # pylint: disable=W0707
         finally:
             self._recv_task = await stop_task(self._recv_task)
+
+    def _backlog(self) -> int:
+        """Number of messages waiting, including the ones buffered while draining."""
+        if self._buffer_msg_queue is None:
+            return self._msg_queue.qsize()
+        return self._msg_queue.qsize() + self._buffer_msg_queue.qsize()
+
+    def _check_high_watermark(self):
+        if not self._above_high_watermark and self._backlog() >= self.high_watermark:
+            self._above_high_watermark = True
+            self.metrics.queue_high_watermark_crossings += 1
+            self.log.debug('%s> queue crossed high watermark %d', self.session_id, self.high_watermark)
+            if self.on_high_watermark:
+                self.on_high_watermark()
+
+    def _check_low_watermark(self):
+        if self._backlog() <= self.low_watermark:
+            self._above_high_watermark = False
+            self.metrics.queue_low_watermark_crossings += 1
+            self.log.debug('%s> queue fell to low watermark %d', self.session_id, self.low_watermark)
+            if self.on_low_watermark:
+                self.on_low_watermark()
@@ -0,0 +1,264 @@
+"""
+Runtime metrics of the sessions.
+
+Every session carries a `SessionMetrics` object, available as `session.metrics`, and
+registers it with the process-wide `REGISTRY` until it is closed. The counters are plain integer updates
+on the hot path, they are always on::
+
+    print(session.metrics.snapshot())
+
+    exporter = common.MetricsExporter(port=9400)
+    await exporter.start()  # serves http://127.0.0.1:9400/metrics in Prometheus text format
+"""
+import asyncio
+import bisect
+import weakref
+from typing import Any
+
+import attrs
+from .utils import logable, stop_task
+
+
+__all__ = [
+    'Histogram',
+    'SessionMetrics',
+    'MetricsRegistry',
+    'MetricsExporter',
+    'REGISTRY',
+]
+
+
+# upper bounds of the histogram buckets, in nanoseconds.
+_DEFAULT_BUCKETS_NS = (
+    1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000,
+    1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000,
+    250_000_000, 500_000_000, 1_000_000_000
+)
+
+
+@attrs.define(auto_attribs=True)
+class Histogram:
+    """
+    Histogram of durations with fixed buckets.
+
+    :param bounds_ns: sorted upper bounds of the buckets in nanoseconds, the last bucket is unbounded.
+    """
+    bounds_ns: tuple[int, ...] = _DEFAULT_BUCKETS_NS
+    count: int = attrs.field(init=False, default=0)
+    sum_ns: int = attrs.field(init=False, default=0)
+    _buckets: list[int] = attrs.field(init=False)
+
+    @_buckets.default
+    def _init_buckets(self):
+        return [0] * (len(self.bounds_ns) + 1)
+
+    def record(self, duration_ns: int, count: int = 1) -> None:
+        """
+        Record `count` observations of `duration_ns`.
+
+        :param duration_ns: observed duration in nanoseconds.
+        :param count: number of observations.
+        """
+        self._buckets[bisect.bisect_left(self.bounds_ns, duration_ns)] += count
+        self.count += count
+        self.sum_ns += duration_ns * count
+
+    def buckets(self) -> list[tuple[float, int]]:
+        """Returns the cumulative counts as (upper bound in seconds, count), the last bound is +inf."""
+        bounds = [bound / 1e9 for bound in self.bounds_ns] + [float('inf')]
+        cumulative, total = [], 0
+        for bound, count in zip(bounds, self._buckets):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.sum_ns / 1e9,
+            'buckets': self.buckets(),
+        }
+
+
+@attrs.define(auto_attribs=True, eq=False)
+class SessionMetrics:
+    """
+    Counters of one session.
+
+    :param session_id: id of the session, used as label when exporting.
+    :param layer: the layer of the session counted, 'transport' for the session reading the
+        network, 'application' for a session on top of it, e.g. `itch.ClientSession`. Used as
+        label when exporting. [Default='transport']
+    """
+    session_id: Any
+    layer: str = attrs.field(kw_only=True, default='transport')
+    bytes_in: int = attrs.field(init=False, default=0)
+    bytes_out: int = attrs.field(init=False, default=0)
+    frames_decoded: int = attrs.field(init=False, default=0)
+    decode_time: Histogram = attrs.field(init=False, factory=Histogram)
+    dispatch_latency: Histogram = attrs.field(init=False, factory=Histogram)
+    queue_depth_high_water: int = attrs.field(init=False, default=0)
+    queue_high_watermark_crossings: int = attrs.field(init=False, default=0)
+    queue_low_watermark_crossings: int = attrs.field(init=False, default=0)
+    heartbeats_sent: int = attrs.field(init=False, default=0)
+    heartbeats_received: int = attrs.field(init=False, default=0)
+    heartbeats_missed: int = attrs.field(init=False, default=0)
+    sequence_gaps: int = attrs.field(init=False, default=0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns a copy of all the counters as a dictionary."""
+        return {
+            'session_id': str(self.session_id),
+            'layer': self.layer,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'frames_decoded': self.frames_decoded,
+            'decode_time': self.decode_time.snapshot(),
+            'dispatch_latency': self.dispatch_latency.snapshot(),
+            'queue_depth_high_water': self.queue_depth_high_water,
+            'queue_high_watermark_crossings': self.queue_high_watermark_crossings,
+            'queue_low_watermark_crossings': self.queue_low_watermark_crossings,
+            'heartbeats_sent': self.heartbeats_sent,
+            'heartbeats_received': self.heartbeats_received,
+            'heartbeats_missed': self.heartbeats_missed,
+            'sequence_gaps': self.sequence_gaps,
+        }
+
+
+# name, type, help; in the order they are exported.
+_EXPORTED_METRICS = (
+    ('bytes_in', 'counter', 'Bytes received from the transport.'),
+    ('bytes_out', 'counter', 'Bytes written to the transport.'),
+    ('frames_decoded', 'counter', 'Frames decoded by the reader.'),
+    ('decode_time', 'histogram', 'Time taken to decode a frame, in seconds.'),
+    ('dispatch_latency', 'histogram', 'Time taken by the message handler, in seconds.'),
+    ('queue_depth_high_water', 'gauge', 'Highest number of messages waiting in the message queue.'),
+    ('queue_high_watermark_crossings', 'counter', 'Times the message queue crossed its high watermark.'),
+    ('queue_low_watermark_crossings', 'counter', 'Times the message queue fell back to its low watermark.'),
+    ('heartbeats_sent', 'counter', 'Heartbeats sent to the peer.'),
+    ('heartbeats_received', 'counter', 'Heartbeats received from the peer, counted by the readers that skip them.'),
+    ('heartbeats_missed', 'counter', 'Heartbeats missed from the peer.'),
+    ('sequence_gaps', 'counter', 'Sequence gaps detected.'),
+)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_float(value: float) -> str:
+    return '+Inf' if value == float('inf') else repr(value)
+
+
+@attrs.define(auto_attribs=True)
+class MetricsRegistry:
+    """
+    Collection of the metrics of the live sessions.
+
+    The sessions unregister their metrics once closed. The registry holds weak references, the
+    metrics of a session are also dropped along with the session.
+
+    :param prefix: prefix of the exported metric names.
+    """
+    prefix: str = 'nasdaq_protocols'
+    _metrics: weakref.WeakSet = attrs.field(init=False, factory=weakref.WeakSet)
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def register(self, metrics: SessionMetrics) -> SessionMetrics:
+        """Add the metrics to the registry."""
+        self._metrics.add(metrics)
+        return metrics
+
+    def unregister(self, metrics: SessionMetrics) -> None:
+        """Remove the metrics from the registry."""
+        self._metrics.discard(metrics)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Returns the snapshots of all the registered metrics."""
+        return [metrics.snapshot() for metrics in list(self._metrics)]
+
+    def to_prometheus(self) -> str:
+        """Returns all the registered metrics in the Prometheus text exposition format."""
+        snapshots = self.snapshot()
+        lines = []
+        for name, type_, help_ in _EXPORTED_METRICS:
+            full_name = f'{self.prefix}_{name}'
+            if type_ == 'counter':
+                full_name += '_total'
+            lines.append(f'# HELP {full_name} {help_}')
+            lines.append(f'# TYPE {full_name} {type_}')
+            for snapshot in snapshots:
+                label = f'session="{_escape_label(snapshot["session_id"])}",layer="{snapshot["layer"]}"'
+                value = snapshot[name]
+                if type_ != 'histogram':
+                    lines.append(f'{full_name}{{{label}}} {value}')
+                    continue
+                for bound, count in value['buckets']:
+                    lines.append(f'{full_name}_bucket{{{label},le="{_format_float(bound)}"}} {count}')
+                lines.append(f'{full_name}_sum{{{label}}} {_format_float(value["sum"])}')
+                lines.append(f'{full_name}_count{{{label}}} {value["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+@logable
+@attrs.define(auto_attribs=True)
+class MetricsExporter:
+    """
+    Minimal HTTP server that serves the registry in the Prometheus text format on `/metrics`.
+
+    :param host: address to listen on. [Default=127.0.0.1]
+    :param port: port to listen on, 0 picks a free port. [Default=0]
+    :param registry: the registry to export. [Default=REGISTRY]
+    """
+    host: str = '127.0.0.1'
+    port: int = 0
+    registry: MetricsRegistry = REGISTRY
+    _server: asyncio.AbstractServer | None = attrs.field(init=False, default=None)
+    _server_task: asyncio.Task | None = attrs.field(init=False, default=None)
+
+    async def start(self) -> 'MetricsExporter':
+        """Start serving, `port` is updated with the listening port."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._server_task = asyncio.create_task(self._server.serve_forever(), name='metrics-exporter')
+        self.log.debug('metrics exporter listening on %s:%d', self.host, self.port)
+        return self
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.close()
+            self._server_task = await stop_task(self._server_task)
+            self._server = None
+
+    def is_stopped(self) -> bool:
+        return self._server is None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b'GET' and parts[1].split(b'?')[0] == b'/metrics':
+                status, body = '200 OK', self.registry.to_prometheus().encode()
+            else:
+                status, body = '404 Not Found', b'not found\n'
+
+            writer.write(
+                f'HTTP/1.0 {status}\r\n'
+                f'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f'\r\n'.encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,131 @@
+import asyncio
+import heapq
+import weakref
+from typing import Callable
+
+import attrs
+from .utils import logable, stop_task
+
+
+__all__ = [
+    'HeartbeatScheduler',
+    'ScheduledCall',
+]
+
+
+@attrs.define(eq=False)
+class ScheduledCall:
+    """
+    A callback registered with the `HeartbeatScheduler`.
+
+    :param when: loop time at which the callback is due.
+    :param callback: function called, without arguments, once `when` is reached.
+    """
+    when: float
+    callback: Callable[[], None]
+    _cancelled: bool = attrs.field(init=False, default=False)
+
+    def cancel(self) -> None:
+        """Cancel the call, it is dropped when it reaches the head of the schedule."""
+        self._cancelled = True
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def __lt__(self, other: 'ScheduledCall') -> bool:
+        return self.when < other.when
+
+
+@logable
+@attrs.define(auto_attribs=True)
+class HeartbeatScheduler:
+    """
+    Timer shared by all the heartbeat monitors running on an event loop.
+
+    The pending calls are kept in a heap ordered by their due time, a single driver task
+    sleeps until the earliest one is due and then fires all the expired calls. The driver
+    task exits when there is nothing left to schedule and is restarted on demand, so a
+    process with thousands of sessions carries one timer instead of one task per monitor.
+
+    Use `HeartbeatScheduler.get()` to get the scheduler of the running loop.
+    """
+    _calls: list[ScheduledCall] = attrs.field(init=False, factory=list)
+    _driver_task: asyncio.Task | None = attrs.field(init=False, default=None)
+    _wakeup: asyncio.Future | None = attrs.field(init=False, default=None)
+
+    _Schedulers = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def get(cls) -> 'HeartbeatScheduler':
+        """Returns the scheduler of the running event loop, it is created on first use."""
+        loop = asyncio.get_running_loop()
+        scheduler = cls._Schedulers.get(loop)
+        if scheduler is None:
+            scheduler = cls._Schedulers[loop] = cls()
+        return scheduler
+
+    def __len__(self) -> int:
+        """Returns the number of entries in the schedule, including the cancelled ones."""
+        return len(self._calls)
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> ScheduledCall:
+        """
+        Schedule `callback` to be called at loop time `when`.
+
+        :param when: loop time, see `asyncio.AbstractEventLoop.time`.
+        :param callback: function called without arguments.
+        :return: handle that can be used to cancel the call.
+        """
+        call = ScheduledCall(when, callback)
+        heapq.heappush(self._calls, call)
+        if self._driver_task is None:
+            self._driver_task = asyncio.create_task(self._drive(), name='heartbeat-scheduler')
+        elif self._calls[0] is call:
+            self._wake()
+        return call
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> ScheduledCall:
+        """Schedule `callback` to be called after `delay` seconds."""
+        return self.call_at(asyncio.get_running_loop().time() + delay, callback)
+
+    def is_running(self) -> bool:
+        """Returns True if the driver task is active."""
+        return self._driver_task is not None
+
+    async def stop(self) -> None:
+        """Drop all the pending calls and stop the driver task."""
+        self._calls.clear()
+        self._driver_task = await stop_task(self._driver_task)
+
+    def _wake(self):
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _drive(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._calls:
+                call = self._calls[0]
+                if call.cancelled():
+                    heapq.heappop(self._calls)
+                    continue
+
+                if call.when > loop.time():
+                    self._wakeup = loop.create_future()
+                    timer = loop.call_at(call.when, self._wake)
+                    try:
+                        await self._wakeup
+                    finally:
+                        timer.cancel()
+                        self._wakeup = None
+                    continue
+
+                heapq.heappop(self._calls)
+                try:
+                    call.callback()
+                except Exception as exc:  # pylint: disable=broad-except
+                    self.log.warning('heartbeat scheduler, exception in callback, %s', exc)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._driver_task = None
@@ -1,22 +1,30 @@
 import abc
 import asyncio
 import contextlib
+import functools
+import time
 from typing import Any, Callable, Coroutine, Generic, Type, TypeVar
-from itertools import count
 
 import attrs
 from .types import Stoppable, Serializable, StateError
 from .utils import logable, stop_task, Validators
 from .message_queue import DispatchableMessageQueue
+from .scheduler import HeartbeatScheduler, ScheduledCall
+from . import tracing
+from .metrics import REGISTRY, SessionMetrics
 
 
 __all__ = [
     'HeartbeatMonitor',
     'Reader',
     'AsyncSession',
+    'BufferedProtocolSession',
+    'buffered_session',
     'OnMonitorNoActivityCoro',
     'OnMsgCoro',
+    'OnMsgBatchCoro',
     'OnCloseCoro',
+    'OfflineTransport',
     'ReaderFactory',
     'SessionId'
 ]
@@ -24,6 +32,7 @@ T = TypeVar('T')
 
 OnMonitorNoActivityCoro = Callable[[], Coroutine]
 OnMsgCoro = Callable[[Any], Coroutine]
+OnMsgBatchCoro = Callable[[list[Any]], Coroutine]
 OnCloseCoro = Callable[[], Coroutine]
 ReaderFactory = Callable[[Any, OnMsgCoro, OnCloseCoro], 'Reader']
 
@@ -36,6 +45,11 @@ class HeartbeatMonitor(Stoppable):
 
     Currently, activity is externally signalled by calling the `ping` method.
 
+    The monitor does not own a task, it is checked every `interval` seconds by the
+    `HeartbeatScheduler` shared by all the monitors of the event loop. When it trips,
+    `on_no_activity_coro` runs in its own task and the monitor is checked again `interval`
+    seconds after the coroutine completed.
+
     :param session_id: The session id.
     :param interval: interval in seconds at which the monitor checks for activity.
     :param on_no_activity_coro: coroutine to be called when no activity is detected.
@@ -49,10 +63,16 @@ class HeartbeatMonitor(Stoppable):
     tolerate_missed_heartbeats: int = attrs.field(kw_only=True, default=1)
     name: str = attrs.field(kw_only=True, default='monitor')
     _pinged: bool = attrs.field(init=False, default=True)
-    _monitor_task: asyncio.Task | None = attrs.field(init=False, default=None)
+    _missed_heartbeats: int = attrs.field(init=False, default=0)
+    _running: bool = attrs.field(init=False, default=False)
+    _scheduler: HeartbeatScheduler = attrs.field(init=False, default=None)
+    _scheduled_call: ScheduledCall | None = attrs.field(init=False, default=None)
+    _trip_task: asyncio.Task | None = attrs.field(init=False, default=None)
 
     def __attrs_post_init__(self):
-        self._monitor_task = asyncio.create_task(self._start_monitor(), name=f'{self.session_id}-{self.name}')
+        self._scheduler = HeartbeatScheduler.get()
+        self._running = True
+        self._schedule()
         self.log.debug('%s> %s started.', self.session_id, self.name)
 
     def ping(self) -> None:
@@ -61,36 +81,54 @@ class HeartbeatMonitor(Stoppable):
 
     def is_running(self) -> bool:
         """Returns True if the monitor is running."""
-        return self._monitor_task is not None and not self._monitor_task.done()
+        return self._running
 
     async def stop(self) -> None:
         """Stop the monitor."""
-        self._monitor_task = await stop_task(self._monitor_task)
+        self._running = False
+        if self._scheduled_call is not None:
+            self._scheduled_call.cancel()
+            self._scheduled_call = None
+        # the trip handler may stop its own monitor, it is left to complete.
+        if self._trip_task is not asyncio.current_task():
+            self._trip_task = await stop_task(self._trip_task)
 
     def is_stopped(self) -> bool:
         return not self.is_running()
 
-    async def _start_monitor(self):
-        missed_heartbeats = count(1)
+    def _schedule(self):
+        self._scheduled_call = self._scheduler.call_later(self.interval, self._check)
+
+    def _check(self):
+        self._scheduled_call = None
+        if self._pinged:
+            if tracing.tracer is not None:
+                tracing.tracer.heartbeat(self.session_id, self.name, 'pinged')
+            self._pinged = False
+            self._missed_heartbeats = 0
+            self._schedule()
+            return
+
+        self._missed_heartbeats += 1
+        if tracing.tracer is not None:
+            tracing.tracer.heartbeat(self.session_id, self.name, 'missed')
+        if self._missed_heartbeats >= self.tolerate_missed_heartbeats:
+            self.log.debug('%s> %s no activity detected.', self.session_id, self.name)
+            if tracing.tracer is not None:
+                tracing.tracer.heartbeat(self.session_id, self.name, 'tripped')
+            self._trip_task = asyncio.create_task(self._trip(), name=f'{self.session_id}-{self.name}')
+        else:
+            self._schedule()
+
+    async def _trip(self):
         try:
-            while True:
-                await asyncio.sleep(self.interval)
-
-                if self._pinged:
-                    self.log.debug('%s> %s pinged.', self.session_id, self.name)
-                    self._pinged = False
-                    missed_heartbeats = count(1)
-                    continue
-
-                if next(missed_heartbeats) >= self.tolerate_missed_heartbeats:
-                    self.log.debug('%s> %s no activity detected.', self.session_id, self.name)
-                    await self.on_no_activity_coro()
-                    if self.stop_when_no_activity:
-                        break
-        except asyncio.CancelledError:
-            pass
+            await self.on_no_activity_coro()
         finally:
-            self._monitor_task = None
+            self._trip_task = None
+            if self.stop_when_no_activity:
+                self._running = False
+            elif self._running:
+                self._schedule()
 
 
 @attrs.define(auto_attribs=True)
@@ -101,19 +139,37 @@ class Reader(Stoppable):
     A reader is responsible for parsing the received data from the transport
     and dispatching it to the on_msg_coro.
 
+    The reader is driven by data arrival, every call to `on_data` wakes up the
+    processing task, which drains the buffer until it holds no complete frame
+    and then waits for more data.
+
     :param session_id: The session id.
     :param on_msg_coro: coroutine to be called for every message parsed.
     :param on_close_coro: coroutine to be called when the reader detects end of session.
+    :param on_msg_batch_coro: If set, the reader decodes all the complete frames in the buffer
+        in one pass and hands them over as a list to this coroutine instead of calling
+        `on_msg_coro` for every message.
+    :param receive_buffer_size: initial size of the receive buffer, used when the transport
+        reads straight into the reader, see `get_buffer`.
+    :param metrics: metrics updated by the reader, the frames decoded and the decode time.
+        [Default=new metrics object]
     """
     session_id: Any = attrs.field(validator=Validators.not_none())
     on_msg_coro: OnMsgCoro = attrs.field(validator=Validators.not_none())
     on_close_coro: OnCloseCoro = attrs.field(validator=Validators.not_none())
+    on_msg_batch_coro: OnMsgBatchCoro | None = attrs.field(kw_only=True, default=None)
+    receive_buffer_size: int = attrs.field(kw_only=True, default=64 * 1024)
+    metrics: SessionMetrics = attrs.field(
+        kw_only=True, default=attrs.Factory(lambda self: SessionMetrics(self.session_id), takes_self=True)
+    )
     _buffer: bytearray = attrs.field(init=False, factory=bytearray)
     _read_pos: int = attrs.field(init=False, default=0)
+    _write_pos: int | None = attrs.field(init=False, default=None)
     _drain_buffer: bytearray | None = attrs.field(init=False, default=None)
     _task: asyncio.Task = attrs.field(init=False, default=None)
     _stopped: bool = attrs.field(init=False, default=False)
     _drain_mode: asyncio.Event | None = attrs.field(init=False, default=None)
+    _data_available: asyncio.Event = attrs.field(init=False, factory=asyncio.Event)
 
     def __attrs_post_init__(self):
         self._task = asyncio.create_task(self._process(), name=f'reader:{self.session_id}')
@@ -125,6 +181,8 @@ class Reader(Stoppable):
             raise StateError('Already draining, cannot nest buffer_until_drained')
         self._drain_mode = asyncio.Event()
         self._drain_buffer = bytearray()
+        # wake up the processing task, so that it can report the buffer as drained.
+        self._data_available.set()
         try:
             await self._drain_mode.wait()
             yield
@@ -132,18 +190,71 @@ class Reader(Stoppable):
             self._drain_mode = None
             if not discard_buffer:
                 # Compact before extending with drain buffer
-                if self._read_pos > 0:
+                if self._read_pos > 0 and self._write_pos is None:
                     del self._buffer[:self._read_pos]
                     self._read_pos = 0
-                self._buffer.extend(self._drain_buffer)
+                self._append(self._drain_buffer)
+                self._data_available.set()
             self._drain_buffer = None
 
     def on_data(self, data: bytes):
-        self.log.debug('%s> on_data: existing = %s, received = %s', self.session_id, self._buffer, data)
         if len(data) == 0:
             return
-        buffer = self._drain_buffer if self._drain_buffer is not None else self._buffer
-        buffer.extend(data)
+        if tracing.tracer is not None:
+            tracing.tracer.data_received(self.session_id, data)
+        if self._drain_buffer is not None:
+            self._drain_buffer.extend(data)
+        else:
+            self._append(data)
+            self._data_available.set()
+
+    async def feed(self, data: bytes | bytearray | memoryview) -> None:
+        """
+        Process `data` in the calling task, until the buffer holds no complete frame.
+
+        Unlike `on_data`, the frames are decoded and handed over before returning, without
+        waking up the processing task, e.g. to replay a captured stream. It must not be mixed
+        with `on_data` or `buffer_updated`, the processing task would decode concurrently.
+
+        :param data: bytes received.
+        """
+        if len(data) == 0 or self._stopped:
+            return
+        self._append(data)
+        await self._drain()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """
+        Returns the free tail of the receive buffer, the transport reads straight into it.
+
+        The first call switches the reader from a growing buffer to a preallocated
+        receive buffer of `receive_buffer_size` bytes. Consumed bytes are reclaimed by
+        moving the unprocessed tail to the front, the buffer grows only when the
+        unprocessed bytes, typically a single frame larger than the buffer, leave no
+        room for a read.
+
+        :param sizehint: minimum number of bytes the transport would like to read, -1 if any.
+        """
+        if self._write_pos is None:
+            self._use_receive_buffer()
+        self._reserve(max(sizehint, len(self._buffer) // 8, 1))
+        return memoryview(self._buffer)[self._write_pos:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """The transport has written `nbytes` into the buffer returned by `get_buffer`."""
+        if nbytes == 0:
+            return
+        if tracing.tracer is not None:
+            received = memoryview(self._buffer)[self._write_pos:self._write_pos + nbytes]
+            try:
+                tracing.tracer.data_received(self.session_id, received)
+            finally:
+                received.release()
+        if self._drain_buffer is not None:
+            self._drain_buffer.extend(self._buffer[self._write_pos:self._write_pos + nbytes])
+            return
+        self._write_pos += nbytes
+        self._data_available.set()
 
     async def stop(self):
         if self._stopped:
@@ -158,17 +269,114 @@ class Reader(Stoppable):
 
     async def _process(self):
         while not self._stopped:
-            available_before = available_after = len(self._buffer) - self._read_pos
-            if available_before > 0:
-                await self._process_1()
-                available_after = len(self._buffer) - self._read_pos
-            if self._drain_mode and not self._drain_mode.is_set() and available_after == available_before:
+            await self._data_available.wait()
+            self._data_available.clear()
+            await self._drain()
+
+            if self._drain_mode and not self._drain_mode.is_set():
                 self._drain_mode.set()
 
-            await asyncio.sleep(0.0001)
+    def _end(self) -> int:
+        """Position after the last byte received."""
+        return len(self._buffer) if self._write_pos is None else self._write_pos
+
+    def _available(self) -> int:
+        return self._end() - self._read_pos
+
+    def _consume(self, nbytes: int) -> None:
+        """Mark `nbytes` from the read position as processed."""
+        self._read_pos += nbytes
+        if self._write_pos is None:
+            # Compact when more than half the buffer is consumed
+            if self._read_pos > len(self._buffer) // 2:
+                del self._buffer[:self._read_pos]
+                self._read_pos = 0
+        elif self._read_pos == self._write_pos:
+            self._read_pos = self._write_pos = 0
+
+    def _append(self, data: bytes | bytearray) -> None:
+        if self._write_pos is None:
+            self._buffer.extend(data)
+            return
+        self._reserve(len(data))
+        self._buffer[self._write_pos:self._write_pos + len(data)] = data
+        self._write_pos += len(data)
+
+    def _use_receive_buffer(self) -> None:
+        pending = self._buffer[self._read_pos:]
+        self._buffer = bytearray(max(self.receive_buffer_size, len(pending)))
+        self._buffer[:len(pending)] = pending
+        self._read_pos, self._write_pos = 0, len(pending)
+
+    def _reserve(self, nbytes: int) -> None:
+        """Make room for at least `nbytes` after the write position of the receive buffer."""
+        if len(self._buffer) - self._write_pos >= nbytes:
+            return
+        pending = self._write_pos - self._read_pos
+        if len(self._buffer) - pending >= nbytes:
+            # same size assignment, the buffer is never resized while the transport holds a view.
+            self._buffer[:pending] = self._buffer[self._read_pos:self._write_pos]
+        else:
+            buffer = bytearray(max(2 * len(self._buffer), pending + nbytes))
+            buffer[:pending] = self._buffer[self._read_pos:self._write_pos]
+            self._buffer = buffer
+        self._read_pos, self._write_pos = 0, pending
+
+    async def _drain(self):
+        """Process messages until the buffer holds no complete frame."""
+        if self.on_msg_batch_coro:
+            await self._process_batch()
+            return
+
+        available_before = self._available()
+        while available_before > 0 and not self._stopped:
+            await self._process_1()
+            available_after = self._available()
+            if available_after == available_before:
+                # incomplete frame, wait for more data.
+                break
+            available_before = available_after
+
+    async def _process_batch(self):
+        batch, stop, frames = [], False, 0
+        start = time.perf_counter_ns()
+        available_before = self._available()
+        while available_before > 0:
+            msg, stop, skip = self.deserialize()
+            if stop:
+                break
+            if msg is not None:
+                frames += 1
+            if msg is not None and not skip:
+                if tracing.tracer is not None:
+                    tracing.tracer.message_decoded(self.session_id, msg)
+                batch.append(msg)
+            available_after = self._available()
+            if available_after == available_before:
+                break
+            available_before = available_after
+
+        if frames:
+            self.metrics.frames_decoded += frames
+            self.metrics.decode_time.record((time.perf_counter_ns() - start) // frames, frames)
+
+        if batch:
+            try:
+                await self.on_msg_batch_coro(batch)
+            except Exception:  # pylint: disable=broad-except
+                await self.stop()
+                return
+
+        if stop:
+            self.log.debug('%s> stopping reader', self.session_id)
+            await self.stop()
 
     async def _process_1(self):
+        start = time.perf_counter_ns()
         msg, stop, skip = self.deserialize()
+        if msg is not None:
+            self.metrics.frames_decoded += 1
+            self.metrics.decode_time.record(time.perf_counter_ns() - start)
 
         if stop:
             self.log.debug('%s> stopping reader', self.session_id)
@@ -176,10 +384,10 @@ class Reader(Stoppable):
             return
 
         if msg is None or skip:
-            self.log.debug('%s> skipping message %s', self.session_id, str(msg))
             return
 
-        self.log.debug('%s> dispatching message %s', self.session_id, str(msg))
+        if tracing.tracer is not None:
+            tracing.tracer.message_decoded(self.session_id, msg)
         try:
             await self.on_msg_coro(msg)
         except Exception:  # pylint: disable=broad-except
@@ -190,10 +398,45 @@ class Reader(Stoppable):
         """
         Deserialize the buffer and return the message.
 
+        The message is None when the buffer holds no complete frame, or when a frame was
+        consumed without producing a message, e.g. a heartbeat.
+
         :return: tuple of message, stop reader, skip message
         """
 
 
+class OfflineTransport(asyncio.Transport):
+    """
+    Transport of a session fed with `AsyncSession.feed` instead of a network connection,
+    the writes are discarded.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._closing = False
+
+    def get_extra_info(self, name, default=None):
+        return ('offline', 0) if name == 'peername' else default
+
+    def write(self, data):
+        pass
+
+    def writelines(self, list_of_data):
+        pass
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+    def is_closing(self):
+        return self._closing
+
+    def close(self):
+        self._closing = True
+
+
 @attrs.define(auto_attribs=True)
 class SessionId:
     """
@@ -209,7 +452,7 @@ class SessionId:
 
 @logable
 @attrs.define(auto_attribs=True)
-class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
+class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):  # pylint: disable=too-many-public-methods
     """
     Abstract base class for async sessions.
 
@@ -219,11 +462,25 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
     By default, the session starts in a dispatching mode, meaning the incoming messages
     are dispatched to the `on_msg_coro`. This can be changed by setting `dispatch_on_connect=False`.
 
+    The runtime counters of the session, its reader and its message queue are available in
+    `metrics`, the metrics of all the live sessions are registered with `common.REGISTRY`.
+
     :param session_id: The session id.
     :param reader_factory: A callable that returns a reader.
-    :param on_msg_coro: coroutine to be called when a message is received.
+    :param on_msg_coro: coroutine to be called when a message is received. A plain function is
+        called inline from the reader whenever no message is waiting in the queue.
     :param on_close_coro: coroutine to be called when the session is closed.
     :param dispatch_on_connect: If True, the session starts with dispatching once connected.
+    :param batch_dispatch: If True, the reader decodes all the complete frames received in one pass
+        and the decoded messages are queued in one operation.
+    :param cork_writes: If True, the writes issued in the same event-loop iteration are coalesced
+        and sent with one `writelines` call at the end of the iteration.
+    :param cork_flush_threshold: number of buffered bytes after which corked writes are flushed
+        right away.
+    :param queue_high_watermark: If set, reading from the transport is paused when this many
+        messages are waiting in the session's message queue.
+    :param queue_low_watermark: reading is resumed once the queue holds no more than this many
+        messages. [Default=queue_high_watermark // 2]
     """
     session_id: SessionId = attrs.field(kw_only=True, validator=Validators.not_none())
     reader_factory: ReaderFactory = attrs.field(kw_only=True, validator=Validators.not_none())
@@ -231,6 +488,11 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
     on_close_coro: OnCloseCoro = attrs.field(kw_only=True, default=None)
     dispatch_on_connect: bool = attrs.field(kw_only=True, default=True)
     graceful_shutdown: bool = attrs.field(kw_only=True, default=True)
+    batch_dispatch: bool = attrs.field(kw_only=True, default=False)
+    cork_writes: bool = attrs.field(kw_only=True, default=False)
+    cork_flush_threshold: int = attrs.field(kw_only=True, default=64 * 1024)
+    queue_high_watermark: int | None = attrs.field(kw_only=True, default=None)
+    queue_low_watermark: int | None = attrs.field(kw_only=True, default=None)
     _reader: Reader = attrs.field(init=False, default=None)
     _transport: asyncio.Transport = attrs.field(init=False, default=None)
     _closed: bool = attrs.field(init=False, default=False)
@@ -238,10 +500,24 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
     _local_hb_monitor: HeartbeatMonitor = attrs.field(init=False, default=None)
     _remote_hb_monitor: HeartbeatMonitor = attrs.field(init=False, default=None)
     _msg_queue: DispatchableMessageQueue = attrs.field(init=False, default=None)
+    _pending_writes: list[bytes] = attrs.field(init=False, factory=list)
+    _pending_write_size: int = attrs.field(init=False, default=0)
+    _flush_handle: asyncio.Handle | None = attrs.field(init=False, default=None)
+    _cork_depth: int = attrs.field(init=False, default=0)
+    _read_pause_count: int = attrs.field(init=False, default=0)
+    metrics: SessionMetrics = attrs.field(init=False, default=None)
 
     def __attrs_post_init__(self):
+        self.metrics = REGISTRY.register(SessionMetrics(self.session_id))
         # By default do not dispatch messages
-        self._msg_queue = DispatchableMessageQueue(self.session_id)
+        self._msg_queue = DispatchableMessageQueue(
+            self.session_id,
+            high_watermark=self.queue_high_watermark,
+            low_watermark=self.queue_low_watermark,
+            on_high_watermark=self.pause_reading,
+            on_low_watermark=self.resume_reading,
+            metrics=self.metrics
+        )
 
     async def receive_msg(self) -> Type[T]:
         """
@@ -292,6 +568,81 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
 
         self._closing_task = asyncio.create_task(self.close(drain), name=name)
 
+    @contextlib.contextmanager
+    def corked(self):
+        """
+        Context manager that holds back all the writes until the context is exited::
+
+            with session.corked():
+                for order in orders:
+                    session.send_msg(order)
+
+        All the writes are then sent with one `writelines` call, unless `cork_flush_threshold`
+        is reached before.
+        """
+        self._cork_depth += 1
+        try:
+            yield self
+        finally:
+            self._cork_depth -= 1
+            if self._cork_depth == 0:
+                self.flush()
+
+    def flush(self) -> None:
+        """Send all the corked writes to the transport."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending_writes:
+            pending, self._pending_writes, self._pending_write_size = self._pending_writes, [], 0
+            self._transport.writelines(pending)
+
+    async def feed(self, data: bytes | bytearray | memoryview) -> None:
+        """
+        Process bytes as if they were received from the transport, and wait until the messages
+        decoded from them are dispatched.
+
+        The bytes are decoded in the calling task, refer `Reader.feed`. The session must be
+        connected to an `OfflineTransport`, the reader of a network connection decodes in its
+        own task.
+
+        :param data: bytes received.
+        :raises StateError: if the session is not connected to an `OfflineTransport`.
+        """
+        if self._reader is None:
+            raise StateError('Session is not connected, cannot feed')
+        if not isinstance(self._transport, OfflineTransport):
+            raise StateError('Session is connected to a network transport, cannot feed')
+        self.metrics.bytes_in += len(data)
+        await self._reader.feed(data)
+        await self._msg_queue.join()
+
+    def pause_reading(self) -> None:
+        """
+        Stop reading from the transport until `resume_reading` is called.
+
+        The calls are counted, reading is resumed only after every `pause_reading` was
+        matched with a `resume_reading`. This lets several consumers, e.g., the session's own
+        message queue and an application queue above it, hold back the same transport.
+        """
+        self._read_pause_count += 1
+        if self._read_pause_count == 1 and self._transport and not self._closed:
+            self.log.debug('%s> pause reading', self.session_id)
+            self._transport.pause_reading()
+
+    def resume_reading(self) -> None:
+        """Resume reading from the transport, see `pause_reading`."""
+        if self._read_pause_count == 0:
+            return
+        self._read_pause_count -= 1
+        if self._read_pause_count == 0 and self._transport and not self._closed:
+            self.log.debug('%s> resume reading', self.session_id)
+            self._transport.resume_reading()
+
+    def is_reading_paused(self) -> bool:
+        """Returns True if reading from the transport is paused."""
+        return self._read_pause_count > 0
+
     @contextlib.asynccontextmanager
     async def buffer_until_drained(self, discard_buffer: bool = False):
         """Async context manager that waits until both the reader and message queue are drained."""
@@ -306,6 +657,7 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
         if not self._closed:
             self._closed = True
             if self._transport:
+                self.flush()
                 self._transport.close()
 
             await stop_task([self._local_hb_monitor, self._remote_hb_monitor])
@@ -315,6 +667,7 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
                     self.log.debug('%s> close: drained session.', self.session_id)
 
             await stop_task([self._msg_queue,self._reader])
+            REGISTRY.unregister(self.metrics)
 
             if self.on_close_coro:
                 await self.on_close_coro()
@@ -328,11 +681,11 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
         self._local_hb_monitor = HeartbeatMonitor(
             f'{self.session_id}-local-monitor',
             local_hb_interval,
-            self.send_heartbeat,
+            self._on_local_heartbeat_due,
             stop_when_no_activity=False
         )
         self._remote_hb_monitor = HeartbeatMonitor(
-            f'{self.session_id}-remote-monitor', remote_hb_interval, self.close
+            f'{self.session_id}-remote-monitor', remote_hb_interval, self._on_remote_heartbeat_missed
         )
         self.log.debug('%s> started heartbeats', self.session_id)
 
@@ -366,7 +719,7 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
         self.log.debug('%s> connected', self.session_id)
         self._transport = transport
         self.session_id.set_transport(self._transport)
-        self._reader = self.reader_factory(self.session_id, self.on_message, self.close)
+        self._reader = self._create_reader()
         if self.dispatch_on_connect:
             self.start_dispatching()
 
@@ -374,6 +727,7 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
         """
         :meta private:
         """
+        self.metrics.bytes_in += len(data)
         if self._remote_hb_monitor:
             self._remote_hb_monitor.ping()
         self._reader.on_data(data)
@@ -385,9 +739,43 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
         self.log.debug('%s> connection lost', self.session_id)
         self.initiate_close(self.graceful_shutdown)
 
+    def _create_reader(self) -> Reader:
+        reader = self.reader_factory(self.session_id, self.on_message, self.close)
+        reader.metrics = self.metrics
+        if self.batch_dispatch:
+            reader.on_msg_batch_coro = self.on_message_batch
+        return reader
+
+    def _write(self, data: bytes) -> None:
+        """Write to the transport, the write is held back if the session is corked."""
+        self.metrics.bytes_out += len(data)
+        if tracing.tracer is not None:
+            tracing.tracer.data_sent(self.session_id, data)
+        if not (self.cork_writes or self._cork_depth):
+            self._transport.write(data)
+            return
+
+        self._pending_writes.append(data)
+        self._pending_write_size += len(data)
+        if self._pending_write_size >= self.cork_flush_threshold:
+            self.flush()
+        elif self._flush_handle is None and not self._cork_depth:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self.flush)
+
+    async def _on_local_heartbeat_due(self):
+        self.metrics.heartbeats_sent += 1
+        await self.send_heartbeat()
+
+    async def _on_remote_heartbeat_missed(self):
+        self.metrics.heartbeats_missed += 1
+        await self.close()
+
     async def on_message(self, msg):
         await self._msg_queue.put(msg)
 
+    async def on_message_batch(self, msgs: list[Any]):
+        await self._msg_queue.put_batch(msgs)
+
     @abc.abstractmethod
     def send_msg(self, msg: Serializable[T]) -> None:
         """
@@ -401,3 +789,43 @@ class AsyncSession(asyncio.Protocol, abc.ABC, Generic[T]):
         Callback to send a heartbeat to the peer.
         :meta private:
         """
+
+
+class BufferedProtocolSession(asyncio.BufferedProtocol):
+    """
+    Mixin that turns an `AsyncSession` into an `asyncio.BufferedProtocol`.
+
+    The event loop reads the incoming bytes straight into the receive buffer owned by
+    the session's reader, instead of allocating a new `bytes` object for every read.
+
+    Use `buffered_session` to get the buffered variant of an existing session class.
+    """
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """
+        :meta private:
+        """
+        return self._reader.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """
+        :meta private:
+        """
+        self.metrics.bytes_in += nbytes
+        if self._remote_hb_monitor:
+            self._remote_hb_monitor.ping()
+        self._reader.buffer_updated(nbytes)
+
+
+@functools.cache
+def buffered_session(session_cls: Type[AsyncSession]) -> Type[AsyncSession]:
+    """
+    Returns the `asyncio.BufferedProtocol` variant of the given session class::
+
+        loop.create_connection(buffered_session(SoupClientSession), host, port)
+
+    :param session_cls: Any subclass of `AsyncSession`.
+    :return: subclass of `session_cls` that reads straight into the reader's buffer.
+    """
+    namespace = {'__module__': session_cls.__module__}
+    return type(f'Buffered{session_cls.__name__}', (BufferedProtocolSession, session_cls), namespace)
@@ -0,0 +1,109 @@
+"""
+Hooks to observe the traffic of all the sessions in the process.
+
+The sessions, readers and message queues report their hot-path events to the
+process-wide tracer. No tracer is attached by default and then every call site costs
+a single attribute lookup::
+
+    from nasdaq_protocols import common
+
+    class FrameCounter(common.Tracer):
+        def __init__(self):
+            self.frames = 0
+
+        def message_decoded(self, session_id, msg):
+            self.frames += 1
+
+    common.set_tracer(FrameCounter())
+
+The hooks are called synchronously from the event loop, they must not block.
+Buffers handed to the hooks may be views into the reader's receive buffer,
+they are only valid for the duration of the call.
+"""
+import logging
+from typing import Any
+
+from .utils import logable
+
+
+__all__ = [
+    'Tracer',
+    'LoggingTracer',
+    'set_tracer',
+    'get_tracer',
+]
+
+
+class Tracer:
+    """
+    Base class for tracers, all the hooks do nothing.
+
+    Override the hooks of interest.
+    """
+
+    def data_received(self, session_id: Any, data: bytes | memoryview) -> None:
+        """Bytes received from the transport, before they are decoded."""
+
+    def message_decoded(self, session_id: Any, msg: Any) -> None:
+        """A message was decoded by the reader."""
+
+    def message_dispatched(self, session_id: Any, msg: Any) -> None:
+        """A message was handed to, and processed by, the message handler."""
+
+    def data_sent(self, session_id: Any, data: bytes) -> None:
+        """Bytes written to the transport, or to the cork buffer."""
+
+    def heartbeat(self, session_id: Any, monitor: str, event: str) -> None:
+        """
+        A heartbeat monitor checked for activity.
+
+        :param session_id: id passed to the monitor.
+        :param monitor: name of the monitor.
+        :param event: `pinged` if activity was seen, `missed` if not and `tripped`
+            if the monitor is invoking its no-activity handler.
+        """
+
+
+@logable
+class LoggingTracer(Tracer):
+    """
+    Tracer that logs all the events at DEBUG level.
+
+    The messages are formatted only when DEBUG is enabled for the `LoggingTracer` logger.
+    """
+
+    def data_received(self, session_id, data):
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug('%s> received %s', session_id, bytes(data))
+
+    def message_decoded(self, session_id, msg):
+        self.log.debug('%s> decoded message %s', session_id, msg)
+
+    def message_dispatched(self, session_id, msg):
+        self.log.debug('%s> dispatched message %s', session_id, msg)
+
+    def data_sent(self, session_id, data):
+        self.log.debug('%s> sent %s', session_id, data)
+
+    def heartbeat(self, session_id, monitor, event):
+        self.log.debug('%s> %s %s', session_id, monitor, event)
+
+
+tracer: Tracer | None = None  # pylint: disable=invalid-name
+
+
+def set_tracer(new_tracer: Tracer | None) -> Tracer | None:
+    """
+    Attach a tracer to all the sessions of the process.
+
+    :param new_tracer: the tracer, None detaches the current tracer.
+    :return: the tracer that was attached before.
+    """
+    global tracer  # pylint: disable=global-statement
+    previous, tracer = tracer, new_tracer
+    return previous
+
+
+def get_tracer() -> Tracer | None:
+    """Returns the attached tracer, None when no tracer is attached."""
+    return tracer
@@ -64,11 +64,27 @@ class TypeDefinition:
     :param from_bytes: Function to convert bytes to value
     :type from_bytes: Callable[[bytes], Tuple[int, Any]]
     :return: Tuple[int, Any]
+
+    :param unpack_from: Optional, function to decode the value at an offset of a buffer,
+        e.g. a memoryview, without slicing it
+    :type unpack_from: Callable[[bytes, int], Tuple[int, Any]]
+    :return: Tuple[offset after the value, value]
+
+    :param pack_into: Optional, function to encode the value at an offset of a writable buffer
+    :type pack_into: Callable[[bytearray, int, Any], int]
+    :return: offset after the value
+
+    :param packed_size: Optional, function returning the size of the encoded value
+    :type packed_size: Callable[[Any], int]
+    :return: int
     """
     to_str: Callable[[Any], str]
     from_str: Callable[[str], Any]
     to_bytes: Callable[[Any], tuple[int, bytes]]
     from_bytes: Callable[[bytes], tuple[int, Any]]
+    unpack_from: Callable[[bytes, int], tuple[int, Any]]
+    pack_into: Callable[[bytearray, int, Any], int]
+    packed_size: Callable[[Any], int]
     hint: 'str'
     type_cls: Type
     default_value: Any
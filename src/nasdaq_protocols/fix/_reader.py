@@ -16,7 +16,7 @@ MSG_TYPE_TAG = b'35='
 class FixMessageReader(common.Reader):
     def deserialize(self):
         empty_response = (None, False, False)
-        view = bytes(self._buffer[self._read_pos:])
+        view = bytes(self._buffer[self._read_pos:self._end()])
 
         if view.find(MSG_TYPE_TAG) != -1:
             start = view.find(b'=', SKIP_FIRST_EQ_POS)
@@ -31,12 +31,7 @@ class FixMessageReader(common.Reader):
                 return empty_response
 
             _len, msg = Message.from_bytes(view[:msg_len])
-            self._read_pos += msg_len
-
-            # Compact when more than half the buffer is consumed
-            if self._read_pos > len(self._buffer) // 2:
-                del self._buffer[:self._read_pos]
-                self._read_pos = 0
+            self._consume(msg_len)
 
             return msg, msg.is_logout(), msg.is_heartbeat()
         return empty_response
@@ -80,17 +80,13 @@ class FixSession(common.AsyncSession):
         msg.Header.SendingTime = datetime.now(timezone.utc).strftime("%Y%m%d-%H:%M:%S")
 
         data = self._prepare_complete_msg(msg)
-        self.log.debug('%s> sent message[%s]: %s', self.session_id, msg.Name, data)
-        self._transport.write(data)
-        self.log.debug('%s> sent message[%s]: %s', self.session_id, msg.Name, msg.as_collection())
+        self._write(data)
 
         if not msg.is_heartbeat() and self._local_hb_monitor:
             self._local_hb_monitor.ping()
 
     async def send_heartbeat(self):
-        heart_beat = core.Message.Def[core.HEART_BEAT_MSG]()
-        self.log.debug('%s> sending heartbeat: %s', self.session_id, heart_beat)
-        self.send_msg(heart_beat)
+        self.send_msg(core.Message.Def[core.HEART_BEAT_MSG]())
 
     def _initialize_session(self, logon_msg):
         self.session_id.username = logon_msg.Username
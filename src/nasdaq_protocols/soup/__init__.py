@@ -41,6 +41,10 @@ from .session import (
     SoupServerSession, SoupClientSessionSync
 )
 from .tools_soupapp_tail import tail_soup_app
+from .columnar import ColumnarBatch, ColumnarDecoder, ColumnarEncoder, record_dtype
+from .server import SequencedStore, MemoryStore, MmapStore, SequencedServerSession, SoupServer
+from .journal import JournalWriter, JournalReader
+from .replay import ReplaySource, ReplayStats, replay
 
 
 __all__ = [
@@ -64,6 +68,20 @@ __all__ = [
     'SoupServerSession',
     'SoupClientSessionSync',
     'tail_soup_app',
+    'ColumnarBatch',
+    'ColumnarDecoder',
+    'ColumnarEncoder',
+    'record_dtype',
+    'SequencedStore',
+    'MemoryStore',
+    'MmapStore',
+    'SequencedServerSession',
+    'SoupServer',
+    'JournalWriter',
+    'JournalReader',
+    'ReplaySource',
+    'ReplayStats',
+    'replay',
     'connect_async',
     'connect',
 ]
@@ -79,7 +97,9 @@ async def connect_async(remote: tuple[str, int],  # pylint: disable=too-many-arg
                         session_factory: Callable[[], SoupClientSession] = None,
                         client_heartbeat_interval: int = 10,
                         server_heartbeat_interval: int = 10,
-                        connect_timeout: int = 5) -> SoupClientSession:
+                        connect_timeout: int = 5,
+                        buffered_protocol: bool = False,
+                        capture: JournalWriter | None = None) -> SoupClientSession:
     """
     Connect asynchronously to the SoupBinTCP server and login.
 
@@ -102,16 +122,21 @@ async def connect_async(remote: tuple[str, int],  # pylint: disable=too-many-arg
     :param client_heartbeat_interval: seconds between client heartbeats.
     :param server_heartbeat_interval: seconds between server heartbeats.
     :param connect_timeout: seconds to wait for connection.
+    :param buffered_protocol: If True, the default session reads straight into the reader's buffer,
+                              refer `common.buffered_session`.
+    :param capture: journal the sequenced messages received are appended to, refer `JournalWriter`.
     :return: SoupClientSession
     """
     loop = asyncio.get_running_loop()
+    session_cls = common.buffered_session(SoupClientSession) if buffered_protocol else SoupClientSession
 
     def default_session_factory():
-        return SoupClientSession(
+        return session_cls(
             on_msg_coro=on_msg_coro,
             on_close_coro=on_close_coro,
             client_heartbeat_interval=client_heartbeat_interval,
-            server_heartbeat_interval=server_heartbeat_interval
+            server_heartbeat_interval=server_heartbeat_interval,
+            capture=capture
         )
 
     try:
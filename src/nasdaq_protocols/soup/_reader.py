@@ -1,31 +1,118 @@
-from typing import Any
+from typing import Any, Callable
 
 import attrs
 from nasdaq_protocols import common
-from .core import SoupMessage
+from .core import SoupMessage, SequencedData, ClientHeartbeat, ServerHeartbeat
+
+
+SEQUENCED_DATA_INDICATOR = ord(SequencedData.Indicator)
+HEARTBEATS = {ord(cls.Indicator): cls for cls in (ClientHeartbeat, ServerHeartbeat)}
 
 
 @attrs.define(auto_attribs=True)
 @common.logable
 class SoupMessageReader(common.Reader):
+    """
+    Reader for SoupBinTCP frames.
+
+    :param zero_copy: If True, the payload of every `SequencedData` is a read-only memoryview
+        into a frame arena owned by the reader instead of a copy of the frame.
+
+    In zero copy mode all the complete frames in the buffer are copied once into an immutable
+    arena, and the payloads are sliced out of it without any further copies. The arena is never
+    modified, it stays valid for as long as any payload refers to it and is released once the
+    last payload is dropped. Call `bytes(msg.data)` to keep a payload independent of the arena.
+
+    Heartbeat frames are recognised by their indicator and consumed without creating a message,
+    they are only counted in `metrics.heartbeats_received`. The liveness of the peer is tracked
+    by the session, on every data received.
+
+    :param on_heartbeat: If set, called with every heartbeat received, the heartbeat message is
+        then created.
+    """
+    zero_copy: bool = attrs.field(kw_only=True, default=False)
+    on_heartbeat: Callable[[SoupMessage], None] | None = attrs.field(kw_only=True, default=None)
+    _arena: memoryview | None = attrs.field(init=False, default=None)
+    _arena_pos: int = attrs.field(init=False, default=0)
+
     def deserialize(self) -> Any:
+        if self.zero_copy:
+            return self._deserialize_from_arena()
+
         empty_response = (None, False, False)
-        available = len(self._buffer) - self._read_pos
+        available = self._end() - self._read_pos
 
         if available < 2:
             return empty_response
 
-        siz = int.from_bytes(self._buffer[self._read_pos:self._read_pos + 2], 'big')
+        buffer, pos = self._buffer, self._read_pos
+        siz = (buffer[pos] << 8) | buffer[pos + 1]
         if (siz + 2) > available:
             return empty_response
 
-        frame = bytes(memoryview(self._buffer)[self._read_pos:self._read_pos + siz + 2])
-        _, msg = SoupMessage.from_bytes(frame)
-        self._read_pos += siz + 2
+        # decoded straight from the buffer, the sequenced data payload is the only copy.
+        end = pos + siz + 2
+        if siz > 0 and buffer[pos + 2] == SEQUENCED_DATA_INDICATOR:
+            msg = SequencedData(bytes(memoryview(buffer)[pos + 3:end]))
+        elif siz == 1 and buffer[pos + 2] in HEARTBEATS:
+            indicator = buffer[pos + 2]
+            self._consume(3)
+            return self._heartbeat_received(indicator)
+        else:
+            _, msg = SoupMessage.unpack_from(buffer, pos)
+        self._consume(siz + 2)
 
-        # Compact when more than half the buffer is consumed
-        if self._read_pos > len(self._buffer) // 2:
-            del self._buffer[:self._read_pos]
-            self._read_pos = 0
+        return msg, msg.is_logout(), msg.is_heartbeat()
+
+    def _available(self) -> int:
+        available = super()._available()
+        if self._arena is not None:
+            available += len(self._arena) - self._arena_pos
+        return available
+
+    def _deserialize_from_arena(self) -> Any:
+        if self._arena is None and not self._fill_arena():
+            return None, False, False
+
+        arena, pos = self._arena, self._arena_pos
+        end = pos + 2 + ((arena[pos] << 8) | arena[pos + 1])
+        indicator = arena[pos + 2] if end > pos + 2 else None
+        if indicator == SEQUENCED_DATA_INDICATOR:
+            msg = SequencedData(arena[pos + 3:end])
+        elif end == pos + 3 and indicator in HEARTBEATS:
+            msg = None
+        else:
+            _, msg = SoupMessage.unpack_from(arena, pos)
 
+        if end == len(arena):
+            # the reader drops its reference, the payloads still refer to the arena.
+            self._arena, self._arena_pos = None, 0
+        else:
+            self._arena_pos = end
+        if msg is None:
+            return self._heartbeat_received(indicator)
         return msg, msg.is_logout(), msg.is_heartbeat()
+
+    def _heartbeat_received(self, indicator: int) -> tuple[None, bool, bool]:
+        self.metrics.heartbeats_received += 1
+        if self.on_heartbeat is not None:
+            self.on_heartbeat(HEARTBEATS[indicator]())
+        return None, False, False
+
+    def _fill_arena(self) -> bool:
+        """Move all the complete frames from the buffer into a new arena."""
+        buffer, start = self._buffer, self._read_pos
+        end, available = start, self._end()
+        while end + 2 <= available:
+            frame_end = end + 2 + ((buffer[end] << 8) | buffer[end + 1])
+            if frame_end > available:
+                break
+            end = frame_end
+
+        if end == start:
+            return False
+
+        self._arena = memoryview(bytes(memoryview(buffer)[start:end]))
+        self._arena_pos = 0
+        self._consume(end - start)
+        return True
@@ -0,0 +1,299 @@
+"""
+Columnar decoding and encoding of SoupBinTCP application streams with NumPy.
+
+Analytics jobs rarely need message objects, they need columns. The `ColumnarDecoder`
+groups the frames of a stream by message type and decodes each group in one go into a
+NumPy structured array, using a `numpy.dtype` derived from the layout of the body record::
+
+    from nasdaq_protocols import itch, soup
+
+    decoder = soup.ColumnarDecoder(MyItchApp)
+    batch = decoder.decode_frames(captured_bytes)
+    add_orders = batch.arrays[AddOrder]  # structured array, one row per message
+    prices = batch.columns(AddOrder)['price']
+
+The message types are looked up in the `CommonMessage` registry, every generated
+application gets the decoder without further changes. Only the message types whose body
+record has a fixed layout (see `Record.Codec`) can be decoded, the frames of the other
+types are counted in `ColumnarBatch.skipped`.
+
+The integers keep the byte order of the wire format, fixed width strings and characters are
+`bytes` (`S<n>`) columns padded as on the wire and booleans are `?` columns.
+
+The `ColumnarEncoder` goes the other way, it encodes columns of values for one message
+type into one contiguous buffer, optionally framed as `UnSequencedData` packets, ready to
+be sent with one write::
+
+    encoder = soup.ColumnarEncoder(EnterOrder)
+    batch = encoder.encode({'orderToken': tokens, 'price': prices, 'side': 'B'}, unsequenced=True)
+    session.send_encoded(batch)
+
+NumPy is an optional dependency, install it with `pip install nasdaq-protocols[columnar]`.
+"""
+import struct
+from typing import Any, Iterable, Type
+
+import attrs
+from nasdaq_protocols.common import Boolean, CommonMessage
+from .core import SequencedData, UnSequencedData
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # pylint: disable=invalid-name
+
+
+__all__ = [
+    'ColumnarBatch',
+    'ColumnarDecoder',
+    'ColumnarEncoder',
+    'record_dtype',
+]
+
+
+_SOUP_HEADER = struct.Struct('!H')
+_SEQUENCED_DATA = ord(SequencedData.Indicator)
+_HEADER_FIELD = '__header__'
+# struct format character -> numpy type, the byte order is carried over.
+_NUMPY_TYPES = {
+    'B': 'u1',
+    'h': 'i2',
+    'H': 'u2',
+    'i': 'i4',
+    'I': 'u4',
+    'q': 'i8',
+    'Q': 'u8',
+}
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('numpy is required for columnar decoding, '
+                          'install it with: pip install nasdaq-protocols[columnar]')
+    return numpy
+
+
+def record_dtype(record_cls) -> Any:
+    """
+    Returns the `numpy.dtype` of a record with a fixed layout.
+
+    :param record_cls: the record class, e.g. the `BodyRecord` of a message.
+    :raises ValueError: if the layout of the record is not fixed.
+    """
+    np = _require_numpy()
+    codec = record_cls.Codec
+    if codec is None:
+        raise ValueError(f'{record_cls.__name__} does not have a fixed layout')
+
+    fields = []
+    for field in record_cls.Fields:
+        format_ = codec.accessors[field.name].struct_.format
+        byte_order, type_ = format_[0], format_[1:]
+        if type_ == 'c':
+            is_bool = isinstance(field.type, type) and issubclass(field.type, Boolean)
+            fields.append((field.name, '?' if is_bool else 'S1'))
+        elif type_.endswith('s'):
+            fields.append((field.name, f'S{type_[:-1]}'))
+        else:
+            fields.append((field.name, byte_order + _NUMPY_TYPES[type_]))
+    return np.dtype(fields)
+
+
+@attrs.define(auto_attribs=True)
+class ColumnarBatch:
+    """
+    Result of a columnar decode.
+
+    :param arrays: message class -> structured array holding the bodies of its messages.
+    :param skipped: number of application frames that were not decoded, the message
+        type is unknown, its layout is not fixed or the frame is too short.
+    """
+    arrays: dict[Type[CommonMessage], Any] = attrs.field(factory=dict)
+    skipped: int = 0
+
+    def columns(self, msg_cls: Type[CommonMessage]) -> dict[str, Any]:
+        """Returns the decoded messages of `msg_cls` as a dictionary of columns."""
+        array = self.arrays[msg_cls]
+        return {name: array[name] for name in array.dtype.names}
+
+    def __len__(self) -> int:
+        return sum(len(array) for array in self.arrays.values())
+
+
+@attrs.define(auto_attribs=True)
+class ColumnarDecoder:
+    """
+    Decodes the messages of an application into one structured array per message type.
+
+    :param app: the application message class, e.g. `itch.Message` or a generated
+        application, the message types are looked up in its registry.
+    """
+    app: Type[CommonMessage]
+    _types: dict[bytes, tuple[Type[CommonMessage], Any]] = attrs.field(init=False, factory=dict)
+    _id_lengths: tuple[int, ...] = attrs.field(init=False, default=())
+    # first byte -> (id, message class, dtype), when all the ids are one byte long.
+    _by_byte: list | None = attrs.field(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        _require_numpy()
+        for msg_id, msg_cls in CommonMessage.MsgIdToClsMap[self.app.AppName].items():
+            id_bytes = msg_id.to_bytes()[1]
+            # only the ids that decode back to themselves can be received.
+            if self.app.MsgIdClass.from_bytes(id_bytes)[1] != msg_id:
+                continue
+            dtype = record_dtype(msg_cls.BodyRecord) if msg_cls.BodyRecord.Codec is not None else None
+            self._types[id_bytes] = (msg_cls, dtype)
+        self._id_lengths = tuple(sorted({len(id_bytes) for id_bytes in self._types}, reverse=True))
+        if self._id_lengths == (1,):
+            self._by_byte = [None] * 256
+            for id_bytes, (msg_cls, dtype) in self._types.items():
+                self._by_byte[id_bytes[0]] = (id_bytes, msg_cls, dtype)
+
+    def decode_frames(self, buffer: bytes | bytearray | memoryview) -> ColumnarBatch:
+        """
+        Decode a buffer of concatenated SoupBinTCP packets, e.g. a capture of a stream.
+
+        Only the `SequencedData` packets are decoded, the other packets are ignored.
+        A truncated packet at the end of the buffer is ignored.
+
+        :param buffer: the packets.
+        """
+        offsets = []
+        end, offset = len(buffer), 0
+        while offset + 3 <= end:
+            length, = _SOUP_HEADER.unpack_from(buffer, offset)
+            if offset + 2 + length > end:
+                break
+            if buffer[offset + 2] == _SEQUENCED_DATA:
+                offsets.append((offset + 3, length - 1))
+            offset += 2 + length
+        return self._decode(buffer, offsets)
+
+    def decode_payloads(self, payloads: Iterable[bytes | SequencedData]) -> ColumnarBatch:
+        """
+        Decode application payloads, e.g. the data of the received `SequencedData` packets.
+
+        :param payloads: the payloads, or the `SequencedData` packets.
+        """
+        chunks, offsets, offset = [], [], 0
+        for payload in payloads:
+            if isinstance(payload, SequencedData):
+                payload = payload.data
+            chunks.append(payload)
+            offsets.append((offset, len(payload)))
+            offset += len(payload)
+        return self._decode(b''.join(chunks), offsets)
+
+    def _decode(self, buffer, frames: list[tuple[int, int]]) -> ColumnarBatch:
+        batch = ColumnarBatch()
+        bodies = self._group_by_type(buffer, frames, batch)
+        if bodies:
+            np = numpy
+            data = np.frombuffer(buffer, dtype=np.uint8)
+            for msg_cls, dtype, offsets in bodies.values():
+                rows = np.asarray(offsets, dtype=np.intp)[:, None] + np.arange(dtype.itemsize, dtype=np.intp)
+                batch.arrays[msg_cls] = data[rows].view(dtype).reshape(-1)
+        return batch
+
+    def _group_by_type(self, buffer, frames, batch: ColumnarBatch) -> dict[bytes, tuple[Any, Any, list[int]]]:
+        """Returns id -> (message class, dtype, offsets of the bodies)."""
+        if self._by_byte is not None:
+            return self._group_by_first_byte(buffer, frames, batch)
+
+        bodies = {}
+        for offset, length in frames:
+            for id_length in self._id_lengths:
+                id_bytes = bytes(buffer[offset:offset + id_length])
+                entry = self._types.get(id_bytes)
+                if entry is not None:
+                    break
+            else:
+                batch.skipped += 1
+                continue
+
+            msg_cls, dtype = entry
+            if dtype is None or length < id_length + dtype.itemsize:
+                batch.skipped += 1
+                continue
+            try:
+                bodies[id_bytes][2].append(offset + id_length)
+            except KeyError:
+                bodies[id_bytes] = (msg_cls, dtype, [offset + id_length])
+        return bodies
+
+    def _group_by_first_byte(self, buffer, frames, batch: ColumnarBatch) -> dict[bytes, tuple[Any, Any, list[int]]]:
+        bodies, by_byte = {}, self._by_byte
+        for offset, length in frames:
+            entry = by_byte[buffer[offset]] if length > 0 else None
+            if entry is None or entry[2] is None or length < 1 + entry[2].itemsize:
+                batch.skipped += 1
+                continue
+            try:
+                bodies[entry[0]][2].append(offset + 1)
+            except KeyError:
+                bodies[entry[0]] = (entry[1], entry[2], [offset + 1])
+        return bodies
+
+
+@attrs.define(auto_attribs=True)
+class ColumnarEncoder:
+    """
+    Encodes columns of values of one message type into one contiguous buffer.
+
+    :param msg_cls: the message class, its body record must have a fixed layout.
+    """
+    msg_cls: Type[CommonMessage]
+    dtype: Any = attrs.field(init=False)
+    _id_bytes: bytes = attrs.field(init=False)
+
+    def __attrs_post_init__(self):
+        self.dtype = record_dtype(self.msg_cls.BodyRecord)
+        self._id_bytes = self.msg_cls.MsgId.to_bytes()[1]
+
+    def encode(self, data: Any, count: int | None = None, unsequenced: bool = False) -> bytes:
+        """
+        Encode the messages.
+
+        :param data: a structured array, or a mapping of field name to column, e.g. a list or an
+            array. A scalar is used for all the messages, a missing field takes its default value.
+            Strings are encoded as ascii and padded as the field requires.
+        :param count: number of messages, needed only when all the values are scalars.
+        :param unsequenced: frame every message as a SoupBinTCP `UnSequencedData` packet.
+        :return: the encoded messages, back to back.
+        :raises ValueError: if a string does not fit its field, or the number of messages is unknown.
+        """
+        np = numpy
+        columns = {name: data[name] for name in data.dtype.names} if hasattr(data, 'dtype') else data
+        if count is None:
+            lengths = {len(value) for value in columns.values() if np.ndim(value) > 0}
+            if len(lengths) != 1:
+                raise ValueError(f'unable to tell the number of messages from the column lengths {lengths}')
+            count = lengths.pop()
+
+        header = self._id_bytes
+        if unsequenced:
+            header = _SOUP_HEADER.pack(1 + len(header) + self.dtype.itemsize) + UnSequencedData.Indicator.encode() + header
+        frame_dtype = np.dtype([(_HEADER_FIELD, f'S{len(header)}')] + self.dtype.descr)
+        frames = np.zeros(count, dtype=frame_dtype)
+        frames[_HEADER_FIELD] = header
+
+        for field in self.msg_cls.BodyRecord.Fields:
+            value = columns.get(field.name)
+            if value is None:
+                value = field.type.default_value if field.default_value is None else field.default_value
+            frames[field.name] = self._column(field, value)
+        return frames.tobytes()
+
+    def _column(self, field, value) -> Any:
+        np = numpy
+        kind = self.dtype[field.name].kind
+        if kind != 'S':
+            return value
+        width = self.dtype[field.name].itemsize
+        value = np.asarray(value)
+        if value.dtype.kind == 'U':
+            value = np.char.encode(value, 'ascii')
+        if value.size and np.char.str_len(value).max() > width:
+            raise ValueError(f'{field.name}, value longer than {width} characters')
+        right_justified = getattr(field.type, 'right_justified', False)
+        return np.char.rjust(value, width) if right_justified else np.char.ljust(value, width)
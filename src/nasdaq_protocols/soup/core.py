@@ -26,6 +26,11 @@ __all__ = [
 ]
 
 
+_HEADER = struct.Struct('!h c')
+# indicator byte -> soup message class.
+_CLASS_BY_INDICATOR: list[Type['SoupMessage'] | None] = [None] * 256
+
+
 class InvalidSoupMessage(ValueError):
     """Raised when an invalid soup message is received."""
 
@@ -53,18 +58,25 @@ class SoupMessage(common.Serializable['SoupMessage']):
         len, soup_msg = SoupMessage.from_bytes(input_bytes)
         type(soup_msg)
 
+    A message can also be decoded at an offset of a larger buffer, e.g. a receive buffer,
+    without slicing the buffer first, see `unpack_from`.
+
+    `Format` is compiled once per message class into `Struct`.
     """
 
     ClassByIndicator = {}
     Format = '!h c'
     Length = 1
     Indicator = ''
+    Struct = _HEADER
 
     def __init_subclass__(cls, indicator: str, description: str, **kwargs):
         assert len(indicator) == 1, f'Invalid type {indicator}, type can be only one character'
         SoupMessage.ClassByIndicator[indicator] = cls
+        _CLASS_BY_INDICATOR[ord(indicator)] = cls
         cls.Indicator = indicator
         cls.Description = description
+        cls.Struct = struct.Struct(cls.Format)
 
     def to_bytes(self) -> tuple[int, bytes]:
         """
@@ -72,7 +84,7 @@ class SoupMessage(common.Serializable['SoupMessage']):
 
         :return: tuple of length and bytes
         """
-        bytes_ = struct.pack(SoupMessage.Format, SoupMessage.Length, self.Indicator.encode('ascii'))
+        bytes_ = _HEADER.pack(SoupMessage.Length, self.Indicator.encode('ascii'))
         return len(bytes_), bytes_
 
     @classmethod
@@ -80,24 +92,56 @@ class SoupMessage(common.Serializable['SoupMessage']):
         """
         unpacks the bytes to the corresponding soup message
 
-        :param bytes_: bytes to unpack
+        :param bytes_: bytes to unpack, exactly one soup message
         :return: tuple of length and soup message
         """
+        end = len(bytes_)
         try:
-            return len(bytes_), SoupMessage.ClassByIndicator[chr(bytes_[2])].unpack(bytes_)
-        except KeyError:
-            indicator = chr(bytes_[2])
-            raise InvalidSoupMessage(f'unpacking soup message with unknown {indicator=}, received = {bytes_}')
+            msg_cls = _CLASS_BY_INDICATOR[bytes_[2]]
         except IndexError:
-            raise InvalidSoupMessage(f'not enough bytes to unpack, received = {bytes_}')
+            raise InvalidSoupMessage(f'not enough bytes to unpack, received = {bytes(bytes_)}')
+        if msg_cls is None or ((bytes_[0] << 8) | bytes_[1]) + 2 != end:
+            raise _invalid_frame(cls, msg_cls, bytes_, 0, end)
+        return end, msg_cls.unpack_frame(bytes_, 0, end)
 
     @classmethod
-    def unpack(cls, bytes_: bytes) -> Type['SoupMessage'] | 'SoupMessage':
+    def unpack_from(cls, buffer: bytes | bytearray | memoryview,
+                    offset: int = 0) -> tuple[int, Union[type['SoupMessage'], 'SoupMessage']]:
+        """
+        unpacks the soup message at `offset` of `buffer`, the buffer may hold more bytes.
+
+        The payload of `SequencedData` and `UnSequencedData` is a slice of `buffer`, i.e. a
+        view when `buffer` is a memoryview, and a copy otherwise.
+
+        Called on a subclass, e.g. `LoginAccepted.unpack_from`, the message must be of that class.
+
+        :param buffer: buffer holding the message.
+        :param offset: offset of the message in `buffer`.
+        :return: tuple of offset after the message and soup message
+        """
         try:
-            _, _ = struct.unpack(SoupMessage.Format, bytes_)
-            return cls()
-        except struct.error:
-            raise InvalidSoupMessage(f'invalid soup message, received = {bytes_}')
+            msg_cls = _CLASS_BY_INDICATOR[buffer[offset + 2]]
+            end = offset + 2 + ((buffer[offset] << 8) | buffer[offset + 1])
+        except IndexError:
+            raise InvalidSoupMessage(f'not enough bytes to unpack, received = {bytes(buffer[offset:])}')
+        if msg_cls is None or end > len(buffer) or (msg_cls is not cls and cls is not SoupMessage):
+            raise _invalid_frame(cls, msg_cls, buffer, offset, end)
+        return end, msg_cls.unpack_frame(buffer, offset, end)
+
+    @classmethod
+    def unpack(cls, bytes_: bytes) -> Type['SoupMessage'] | 'SoupMessage':
+        return cls.unpack_frame(bytes_, 0, len(bytes_))
+
+    @classmethod
+    def unpack_frame(cls, buffer: bytes | bytearray | memoryview,
+                     offset: int, end: int) -> Type['SoupMessage'] | 'SoupMessage':
+        """
+        unpacks the soup message of this class in `buffer[offset:end]`, the header included.
+
+        :meta private:
+        """
+        _check_frame_size(cls, buffer, offset, end)
+        return cls()
 
     def is_heartbeat(self):
         return False
@@ -138,18 +182,18 @@ class LoginRequest(SoupMessage, indicator='L', description='Login Request'):
 
         :return:
         """
-        bytes_ = struct.pack(LoginRequest.Format,
-                             LoginRequest.Length,
-                             self.Indicator.encode('ascii'),
-                             _pack(self.user, 6),
-                             _pack(self.password, 10),
-                             _pack(self.session, 10),
-                             _pack(str(self.sequence), 20))
+        bytes_ = LoginRequest.Struct.pack(LoginRequest.Length,
+                                          self.Indicator.encode('ascii'),
+                                          _pack(self.user, 6),
+                                          _pack(self.password, 10),
+                                          _pack(self.session, 10),
+                                          _pack(str(self.sequence), 20))
         return len(bytes_), bytes_
 
     @classmethod
-    def unpack(cls, bytes_):
-        _1, _2, user, passwd, sess, seq = struct.unpack(LoginRequest.Format, bytes_)
+    def unpack_frame(cls, buffer, offset, end):
+        _check_frame_size(cls, buffer, offset, end)
+        _1, _2, user, passwd, sess, seq = cls.Struct.unpack_from(buffer, offset)
         return LoginRequest(_unpack_string(user),
                             _unpack_string(passwd),
                             _unpack_string(sess),
@@ -175,15 +219,15 @@ class LoginAccepted(SoupMessage, indicator='A', description='Login Accepted'):
         Pack the soup message to binary format
         :return: bytes
         """
-        bytes_ = struct.pack(LoginAccepted.Format,
-                             LoginAccepted.Len, self.Indicator.encode('ascii'),
-                             _pack(self.session_id, 10),
-                             _pack(str(self.sequence), 20))
+        bytes_ = LoginAccepted.Struct.pack(LoginAccepted.Len, self.Indicator.encode('ascii'),
+                                           _pack(self.session_id, 10),
+                                           _pack(str(self.sequence), 20))
         return len(bytes_), bytes_
 
     @classmethod
-    def unpack(cls, bytes_):
-        _, _, sess, seq = struct.unpack(LoginAccepted.Format, bytes_)
+    def unpack_frame(cls, buffer, offset, end):
+        _check_frame_size(cls, buffer, offset, end)
+        _, _, sess, seq = cls.Struct.unpack_from(buffer, offset)
         return LoginAccepted(_unpack_string(sess), _unpack_int(seq))
 
 
@@ -204,20 +248,59 @@ class LoginRejected(SoupMessage, indicator='J', description='Login Rejected'):
         Pack the soup message to binary format
         :return: bytes
         """
-        bytes_ = struct.pack(LoginRejected.Format,
-                             LoginRejected.Length,
-                             self.Indicator.encode('ascii'),
-                             self.reason.value.encode('ascii'))
+        bytes_ = LoginRejected.Struct.pack(LoginRejected.Length,
+                                           self.Indicator.encode('ascii'),
+                                           self.reason.value.encode('ascii'))
         return len(bytes_), bytes_
 
     @classmethod
-    def unpack(cls, bytes_):
-        _, _, rea = struct.unpack(LoginRejected.Format, bytes_)
+    def unpack_frame(cls, buffer, offset, end):
+        _check_frame_size(cls, buffer, offset, end)
+        _, _, rea = cls.Struct.unpack_from(buffer, offset)
         return LoginRejected(_unpack_string(rea))
 
 
+class _ApplicationData:
+    """
+    Frames application messages, i.e. `CommonMessage` objects, without intermediate copies.
+
+    The message is encoded right after the soup header, in one buffer::
+
+        buffer = UnSequencedData.encode_message(msg)
+
+        buffer = bytearray(UnSequencedData.packed_size(msg1) + UnSequencedData.packed_size(msg2))
+        offset = UnSequencedData.pack_message_into(buffer, 0, msg1)
+        UnSequencedData.pack_message_into(buffer, offset, msg2)
+    """
+    Indicator: str
+
+    @classmethod
+    def packed_size(cls, msg) -> int:
+        """Returns the size of the framed message."""
+        return _HEADER.size + msg.packed_size()
+
+    @classmethod
+    def pack_message_into(cls, buffer: bytearray | memoryview, offset: int, msg) -> int:
+        """
+        Frame and encode the message at `offset` of `buffer`.
+
+        :return: offset after the framed message.
+        :raises struct.error: if the buffer is too short.
+        """
+        end = msg.pack_into(buffer, offset + _HEADER.size)
+        _HEADER.pack_into(buffer, offset, end - offset - 2, cls.Indicator.encode('ascii'))
+        return end
+
+    @classmethod
+    def encode_message(cls, msg) -> bytearray:
+        """Returns the framed message, encoded in a buffer of the exact size."""
+        buffer = bytearray(cls.packed_size(msg))
+        cls.pack_message_into(buffer, 0, msg)
+        return buffer
+
+
 @attrs.define(slots=False, auto_attribs=True)
-class SequencedData(SoupMessage, indicator='S', description='Sequenced Data'):
+class SequencedData(_ApplicationData, SoupMessage, indicator='S', description='Sequenced Data'):
     """
     SoupBinTCP Sequenced Data Message.
 
@@ -230,18 +313,17 @@ class SequencedData(SoupMessage, indicator='S', description='Sequenced Data'):
         Pack the soup message to binary format
         :return: bytes
         """
-        msg = struct.pack(SoupMessage.Format, len(self.data) + 1, self.Indicator.encode('ascii'))
+        msg = _HEADER.pack(len(self.data) + 1, self.Indicator.encode('ascii'))
         bytes_ = msg + bytes(self.data)
         return len(bytes_), bytes_
 
     @classmethod
-    def unpack(cls, bytes_):
-        len_, _ = struct.unpack(SoupMessage.Format, bytes_[:3])
-        return SequencedData(bytes_[3:] if len_ > 1 else b'')
+    def unpack_frame(cls, buffer, offset, end):
+        return SequencedData(_payload(buffer, offset + 3, end))
 
 
 @attrs.define(slots=False, auto_attribs=True)
-class UnSequencedData(SoupMessage, indicator='U', description='UnSequenced Data'):
+class UnSequencedData(_ApplicationData, SoupMessage, indicator='U', description='UnSequenced Data'):
     """
     SoupBinTCP Unsequenced Data Message.
 
@@ -254,14 +336,13 @@ class UnSequencedData(SoupMessage, indicator='U', description='UnSequenced Data'
         Pack the soup message to binary format
         :return: bytes
         """
-        msg = struct.pack(SoupMessage.Format, len(self.data) + 1, self.Indicator.encode('ascii'))
+        msg = _HEADER.pack(len(self.data) + 1, self.Indicator.encode('ascii'))
         bytes_ = msg + bytes(self.data)
         return len(bytes_), bytes_
 
     @classmethod
-    def unpack(cls, bytes_):
-        len_, _ = struct.unpack(SoupMessage.Format, bytes_[:3])
-        return UnSequencedData(bytes_[3:] if len_ > 1 else b'')
+    def unpack_frame(cls, buffer, offset, end):
+        return UnSequencedData(_payload(buffer, offset + 3, end))
 
 
 @attrs.define(slots=False, auto_attribs=True)
@@ -278,14 +359,13 @@ class Debug(SoupMessage, indicator='+', description='Debug'):
         Pack the soup message to binary format
         :return: bytes
         """
-        msg = struct.pack(SoupMessage.Format, len(self.msg) + 1, self.Indicator.encode('ascii'))
+        msg = _HEADER.pack(len(self.msg) + 1, self.Indicator.encode('ascii'))
         bytes_ = msg + self.msg.encode('ascii')
         return len(bytes_), bytes_
 
     @classmethod
-    def unpack(cls, bytes_):
-        len_, _ = struct.unpack(SoupMessage.Format, bytes_[:3])
-        return Debug(bytes_[3:].decode('ascii') if len_ > 1 else '')
+    def unpack_frame(cls, buffer, offset, end):
+        return Debug(str(buffer[offset + 3:end], 'ascii'))
 
 
 @attrs.define(slots=False, auto_attribs=True)
@@ -332,6 +412,28 @@ class LogoutRequest(SoupMessage, indicator='O', description='LogoutRequest'):
         return True
 
 
+def _check_frame_size(cls, buffer, offset, end) -> None:
+    if end - offset != cls.Struct.size:
+        raise InvalidSoupMessage(f'invalid soup message, received = {bytes(buffer[offset:end])}')
+
+
+def _invalid_frame(cls, msg_cls, buffer, offset, end) -> InvalidSoupMessage:
+    if msg_cls is None:
+        indicator = chr(buffer[offset + 2])
+        return InvalidSoupMessage(f'unpacking soup message with unknown {indicator=}, '
+                                  f'received = {bytes(buffer[offset:end])}')
+    if end != offset + 2 + ((buffer[offset] << 8) | buffer[offset + 1]) or end > len(buffer):
+        return InvalidSoupMessage(f'length of the soup message does not match, received = {bytes(buffer[offset:])}')
+    return InvalidSoupMessage(f'expected {cls.__name__}, received {msg_cls.__name__}')
+
+
+def _payload(buffer, start, end):
+    """Returns the payload in `buffer[start:end]`, as bytes unless `buffer` is a memoryview."""
+    if isinstance(buffer, bytearray):
+        return bytes(memoryview(buffer)[start:end])
+    return buffer[start:end]
+
+
 def _pack(data, field_size):
     return data.ljust(field_size).encode('ascii')
 
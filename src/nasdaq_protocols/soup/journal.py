@@ -0,0 +1,329 @@
+"""
+A journal of the sequenced messages of a soup stream, for capture and replay.
+
+The journal is a file holding a header followed by one record per sequenced message::
+
+    header : magic 'SJ01', index interval (u32), sequence of the first message (u64)
+    record : receive timestamp in ns (u64), the SequencedData packet (length u16, 'S', payload)
+
+All the integers are in network byte order. The sequence numbers are not stored, the records
+are consecutive messages from the first sequence onwards.
+
+Every `index_interval`-th record is indexed: the offset of the record is appended to a sidecar
+file, the path of the journal with the suffix `.idx`. A message is found by reading the
+offset of its indexed record and walking at most `index_interval - 1` records from there.
+A missing or short index only makes the lookups and the opening of the journal slower.
+
+A client session captures its stream with `capture=`, see `SoupClientSession`::
+
+    with soup.JournalWriter('itch.journal') as journal:
+        session = await soup.connect_async(remote, user, password, capture=journal)
+        ...
+
+    with soup.JournalReader('itch.journal') as journal:
+        for sequence, timestamp, payload in journal.frames(1000):
+            ...
+
+The payloads are memoryviews into the mapped file, they must be released, or copied with
+`bytes(payload)`, before the reader is closed.
+"""
+import io
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Iterator
+
+import attrs
+
+
+__all__ = [
+    'JournalWriter',
+    'JournalReader',
+]
+
+
+_MAGIC = b'SJ01'
+_HEADER = struct.Struct('!4sIQ')
+# receive timestamp, soup packet length, soup packet type.
+_RECORD = struct.Struct('!QHc')
+_TIMESTAMP = struct.Struct('!Q')
+_LENGTH = struct.Struct('!H')
+_SEQUENCED = b'S'
+
+
+def _index_path(path: str | os.PathLike) -> str:
+    return os.fspath(path) + '.idx'
+
+
+def _to_network_order(offsets: array) -> None:
+    if sys.byteorder == 'little':
+        offsets.byteswap()
+
+
+@attrs.define(auto_attribs=True)
+class JournalWriter:
+    """
+    Writes the sequenced messages of a soup stream to a journal file.
+
+    The file and its index are created, or truncated if they exist.
+
+    :param path: path of the journal file.
+    :param index_interval: a record out of `index_interval` is indexed. [Default=256]
+    :param buffer_size: size of the write buffer in bytes. [Default=1MiB]
+    """
+    path: str | os.PathLike
+    index_interval: int = attrs.field(kw_only=True, default=256)
+    buffer_size: int = attrs.field(kw_only=True, default=1 << 20)
+    first_sequence: int | None = attrs.field(init=False, default=None)
+    count: int = attrs.field(init=False, default=0)
+    _file: io.BufferedWriter | None = attrs.field(init=False, default=None)
+    _index_file: io.BufferedWriter | None = attrs.field(init=False, default=None)
+    _offset: int = attrs.field(init=False, default=_HEADER.size)
+
+    def __attrs_post_init__(self):
+        if self.index_interval < 1:
+            raise ValueError('index_interval must be at least 1')
+        self._file = open(self.path, 'wb', buffering=self.buffer_size)  # pylint: disable=consider-using-with
+        self._index_file = open(_index_path(self.path), 'wb')  # pylint: disable=consider-using-with
+
+    def __enter__(self) -> 'JournalWriter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def next_sequence(self) -> int | None:
+        """The sequence number of the next message appended, None until the journal began."""
+        return None if self.first_sequence is None else self.first_sequence + self.count
+
+    def begin(self, sequence: int) -> None:
+        """
+        Set the sequence number of the first message, called upon login.
+
+        Once messages are appended, a re-login must continue from the next sequence number,
+        a journal cannot hold a gap.
+
+        :param sequence: sequence number of the next message appended.
+        :raises ValueError: if the journal expects another sequence number.
+        """
+        if self.first_sequence is None:
+            self.first_sequence = sequence
+            self._file.write(_HEADER.pack(_MAGIC, self.index_interval, sequence))
+        elif sequence != self.next_sequence:
+            raise ValueError(f'{self.path}> journal expects sequence {self.next_sequence}, logged in at {sequence}')
+
+    def append(self, payload: bytes | memoryview, timestamp: int | None = None) -> int:
+        """
+        Append a sequenced message.
+
+        :param payload: application payload of the message.
+        :param timestamp: receive time in nanoseconds since the epoch. [Default=now]
+        :return: the sequence number of the message.
+        """
+        if self.first_sequence is None:
+            self.begin(1)
+        if self.count % self.index_interval == 0:
+            offsets = array('Q', [self._offset])
+            _to_network_order(offsets)
+            self._index_file.write(offsets.tobytes())
+        length = len(payload)
+        self._file.write(_RECORD.pack(time.time_ns() if timestamp is None else timestamp, length + 1, _SEQUENCED))
+        self._file.write(payload)
+        self._offset += _RECORD.size + length
+        self.count += 1
+        return self.first_sequence + self.count - 1
+
+    def append_batch(self, payloads: list[bytes | memoryview], timestamp: int | None = None) -> None:
+        """
+        Append sequenced messages received together.
+
+        :param payloads: application payloads of the messages.
+        :param timestamp: receive time in nanoseconds since the epoch. [Default=now]
+        """
+        timestamp = time.time_ns() if timestamp is None else timestamp
+        for payload in payloads:
+            self.append(payload, timestamp)
+
+    def flush(self) -> None:
+        """Write the buffered records to the file."""
+        self._file.flush()
+        self._index_file.flush()
+
+    def close(self) -> None:
+        """Flush and close the journal."""
+        if self._file is None:
+            return
+        if self.first_sequence is None:
+            self.begin(1)
+        self._file.close()
+        self._index_file.close()
+        self._file = self._index_file = None
+
+
+@attrs.define(auto_attribs=True)
+class JournalReader:
+    """
+    Reads a journal file written by `JournalWriter`, the file is memory-mapped.
+
+    :param path: path of the journal file.
+    :raises ValueError: if the file is not a journal.
+    """
+    path: str | os.PathLike
+    first_sequence: int = attrs.field(init=False, default=1)
+    index_interval: int = attrs.field(init=False, default=1)
+    _mmap: mmap.mmap | None = attrs.field(init=False, default=None)
+    _view: memoryview | None = attrs.field(init=False, default=None)
+    _size: int = attrs.field(init=False, default=0)
+    _count: int = attrs.field(init=False, default=0)
+    # offset of every `index_interval`-th record.
+    _index: array = attrs.field(init=False, factory=lambda: array('Q'))
+
+    def __attrs_post_init__(self):
+        with open(self.path, 'rb') as file:
+            self._size = os.fstat(file.fileno()).st_size
+            if self._size < _HEADER.size:
+                raise ValueError(f'{self.path} is not a soup journal')
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, self.index_interval, self.first_sequence = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or self.index_interval < 1:
+            self.close()
+            raise ValueError(f'{self.path} is not a soup journal')
+        self._load_index()
+
+    def __enter__(self) -> 'JournalReader':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Returns the number of messages in the journal."""
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple[int, int, memoryview]]:
+        return self.frames()
+
+    @property
+    def next_sequence(self) -> int:
+        """The sequence number following the last message of the journal."""
+        return self.first_sequence + self._count
+
+    def offset(self, sequence: int) -> int:
+        """
+        Returns the offset of the record of a message in the file.
+
+        :param sequence: sequence number of the message.
+        :raises IndexError: if the journal does not hold the message.
+        """
+        if not self.first_sequence <= sequence < self.next_sequence:
+            raise IndexError(f'no message with sequence {sequence}')
+        position = sequence - self.first_sequence
+        offset = self._index[position // self.index_interval]
+        for _ in range(position % self.index_interval):
+            offset += _TIMESTAMP.size + _LENGTH.size + _LENGTH.unpack_from(self._mmap, offset + _TIMESTAMP.size)[0]
+        return offset
+
+    def frames(self, sequence: int | None = None) -> Iterator[tuple[int, int, memoryview]]:
+        """
+        Iterate over the messages from `sequence` onwards.
+
+        :param sequence: sequence number of the first message. [Default=first message]
+        :return: iterator of (sequence, receive timestamp in ns, payload)
+        """
+        sequence = self.first_sequence if sequence is None else max(sequence, self.first_sequence)
+        if sequence >= self.next_sequence:
+            return
+        offset, end, view, unpack_from = self.offset(sequence), self._end(), self._view, _RECORD.unpack_from
+        while offset < end:
+            timestamp, length, _ = unpack_from(view, offset)
+            start = offset + _RECORD.size
+            offset = start + length - 1
+            yield sequence, timestamp, view[start:offset]
+            sequence += 1
+
+    def packets(self, sequence: int | None = None) -> Iterator[tuple[int, memoryview]]:
+        """
+        Iterate over the messages from `sequence` onwards, as they were received.
+
+        :param sequence: sequence number of the first message. [Default=first message]
+        :return: iterator of (receive timestamp in ns, encoded SequencedData packet)
+        """
+        sequence = self.first_sequence if sequence is None else max(sequence, self.first_sequence)
+        if sequence >= self.next_sequence:
+            return
+        offset, end, view, unpack_from = self.offset(sequence), self._end(), self._view, _RECORD.unpack_from
+        while offset < end:
+            timestamp, length, _ = unpack_from(view, offset)
+            start = offset + _TIMESTAMP.size
+            offset = start + _LENGTH.size + length
+            yield timestamp, view[start:offset]
+
+    def payload(self, sequence: int) -> memoryview:
+        """
+        Returns the payload of a message.
+
+        :param sequence: sequence number of the message.
+        :raises IndexError: if the journal does not hold the message.
+        """
+        offset = self.offset(sequence)
+        _, length, _ = _RECORD.unpack_from(self._view, offset)
+        return self._view[offset + _RECORD.size:offset + _RECORD.size + length - 1]
+
+    def timestamp(self, sequence: int) -> int:
+        """
+        Returns the receive timestamp of a message in nanoseconds since the epoch.
+
+        :param sequence: sequence number of the message.
+        :raises IndexError: if the journal does not hold the message.
+        """
+        return _TIMESTAMP.unpack_from(self._view, self.offset(sequence))[0]
+
+    def close(self) -> None:
+        """
+        Unmap the journal.
+
+        :raises BufferError: if payloads returned by the reader are still referenced.
+        """
+        if self._mmap is None:
+            return
+        self._view.release()
+        self._mmap.close()
+        self._mmap = self._view = None
+
+    def _end(self) -> int:
+        """Returns the offset past the last complete record."""
+        if not self._count:
+            return _HEADER.size
+        offset = self.offset(self.next_sequence - 1)
+        return offset + _TIMESTAMP.size + _LENGTH.size + _LENGTH.unpack_from(self._mmap, offset + _TIMESTAMP.size)[0]
+
+    def _load_index(self) -> None:
+        """Load the index, then count the records following the last indexed one."""
+        try:
+            with open(_index_path(self.path), 'rb') as file:
+                data = file.read()
+            self._index.frombytes(data[:len(data) - len(data) % self._index.itemsize])
+            _to_network_order(self._index)
+        except FileNotFoundError:
+            pass
+        # the index may be ahead of the journal when the writer did not flush both files.
+        while self._index and self._index[-1] >= self._size:
+            self._index.pop()
+        if not self._index:
+            self._index.append(_HEADER.size)
+
+        offset, count = self._index[-1], (len(self._index) - 1) * self.index_interval
+        while offset + _RECORD.size <= self._size:
+            end = offset + _TIMESTAMP.size + _LENGTH.size + _LENGTH.unpack_from(self._mmap, offset + _TIMESTAMP.size)[0]
+            if end > self._size:
+                break
+            count += 1
+            offset = end
+            if count % self.index_interval == 0 and offset + _RECORD.size <= self._size:
+                self._index.append(offset)
+        self._count = count
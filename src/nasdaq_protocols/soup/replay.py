@@ -0,0 +1,180 @@
+"""
+Replay of captured soup streams through the client sessions, without a network.
+
+The replay feeds the soup packets, read from a journal or from raw bytes, into the reader of
+a session in chunks, and waits for the handlers of a chunk to complete before feeding the
+next one. No socket, heartbeat or timer is involved::
+
+    session = itch.ClientSession(soup.SoupClientSession(), on_msg_coro=on_msg)
+    stats = await soup.replay('itch.journal', session, chunk_size=64 * 1024)
+    print(stats)
+
+By default the stream is replayed as fast as possible. With `speed`, the packets of a journal
+are fed following their receive timestamps: `speed=1` replays in the original timing,
+`speed=10` ten times faster.
+
+The session is connected to a `common.OfflineTransport`, which discards the writes, it is
+not closed by the replay.
+"""
+import asyncio
+import os
+import time
+from typing import Any
+
+import attrs
+from nasdaq_protocols import common
+from .journal import JournalReader
+from .session import SoupClientSession
+
+
+__all__ = [
+    'ReplaySource',
+    'ReplayStats',
+    'replay',
+]
+ReplaySource = JournalReader | str | os.PathLike | bytes | bytearray | memoryview
+
+
+@attrs.define(auto_attribs=True)
+class ReplayStats:
+    """
+    Outcome of a replay.
+
+    The time spent in the stages is measured independently, the stages overlap:
+
+    - read: reading the packets from the source.
+    - decode: decoding the soup frames.
+    - dispatch: the handler of the soup session. For an application session, it covers the
+      decoding of the application messages and their queueing.
+    - handler: the handler of the application session, if any.
+
+    :param messages: number of soup frames decoded.
+    :param bytes: number of bytes fed.
+    :param elapsed: duration of the replay in seconds.
+    :param stages: seconds spent in every stage.
+    """
+    messages: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    stages: dict[str, float] = attrs.field(factory=dict)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        stages = ', '.join(f'{name}={seconds:.3f}s' for name, seconds in self.stages.items())
+        return (f'{self.messages} messages, {self.bytes} bytes in {self.elapsed:.3f}s, '
+                f'{self.messages_per_second:,.0f} msg/s, {self.bytes_per_second / 1e6:,.1f} MB/s [{stages}]')
+
+
+def _metrics_time(metrics: common.SessionMetrics) -> tuple[int, int, int]:
+    return metrics.frames_decoded, metrics.decode_time.sum_ns, metrics.dispatch_latency.sum_ns
+
+
+async def replay(source: ReplaySource,  # pylint: disable=too-many-locals
+                 session: Any,
+                 *,
+                 chunk_size: int = 64 * 1024,
+                 speed: float | None = None,
+                 sequence: int | None = None) -> ReplayStats:
+    """
+    Replay a captured stream through a session.
+
+    :param source: a journal, the path of a journal or the soup packets as raw bytes.
+    :param session: a `SoupClientSession`, or an application session e.g. `itch.ClientSession`,
+                    not connected yet.
+    :param chunk_size: number of bytes fed at once. A journal is fed in whole packets,
+                       raw bytes are cut every `chunk_size` bytes.
+    :param speed: None replays as fast as possible, otherwise the receive timestamps of the
+                  journal are followed, `speed` times faster. [Default=None]
+    :param sequence: sequence number of the first message replayed from a journal.
+                     [Default=first message]
+    :return: ReplayStats
+    :raises ValueError: if `speed` is set for raw bytes, which carry no timestamps.
+    """
+    if speed is not None and speed <= 0:
+        raise ValueError('speed must be positive')
+    if isinstance(source, (bytes, bytearray, memoryview)) and speed is not None:
+        raise ValueError('raw bytes carry no timestamps, they can only be replayed as fast as possible')
+
+    soup_session: SoupClientSession = getattr(session, 'soup_session', session)
+    soup_session.connection_made(common.OfflineTransport())
+    if soup_session is session:
+        soup_session.start_dispatching()
+    app_metrics = session.metrics if soup_session is not session else None
+
+    stats = ReplayStats()
+    frames, decode_ns, dispatch_ns = _metrics_time(soup_session.metrics)
+    handler_ns = app_metrics.dispatch_latency.sum_ns if app_metrics else 0
+    read_ns = 0
+    start = time.perf_counter_ns()
+
+    async def feed(chunk):
+        stats.bytes += len(chunk)
+        await session.feed(chunk)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for offset in range(0, len(view), chunk_size):
+            await feed(view[offset:offset + chunk_size])
+    else:
+        journal = source if isinstance(source, JournalReader) else JournalReader(source)
+        try:
+            read_ns = await _replay_journal(journal, feed, chunk_size, speed, sequence)
+        finally:
+            if journal is not source:
+                journal.close()
+
+    stats.elapsed = (time.perf_counter_ns() - start) / 1e9
+    frames_after, decode_after, dispatch_after = _metrics_time(soup_session.metrics)
+    stats.messages = frames_after - frames
+    stats.stages = {
+        'read': read_ns / 1e9,
+        'decode': (decode_after - decode_ns) / 1e9,
+        'dispatch': (dispatch_after - dispatch_ns) / 1e9,
+    }
+    if app_metrics:
+        stats.stages['handler'] = (app_metrics.dispatch_latency.sum_ns - handler_ns) / 1e9
+    return stats
+
+
+async def _replay_journal(journal, feed, chunk_size, speed, sequence) -> int:  # pylint: disable=too-many-locals
+    """Feed the packets of the journal, returns the nanoseconds spent reading them."""
+    clock = time.perf_counter_ns
+    parts, size, read_ns = [], 0, 0
+    first = origin = None
+    read_start = clock()
+    for timestamp, packet in journal.packets(sequence):
+        if speed is not None:
+            if first is None:
+                first, origin = timestamp, read_start
+            due = origin + (timestamp - first) / speed
+            if due > clock():
+                # feed what is due, then wait for this packet.
+                chunk = b''.join(parts)
+                read_ns += clock() - read_start
+                if chunk:
+                    await feed(chunk)
+                    parts, size = [], 0
+                delay = due - clock()
+                if delay > 0:
+                    await asyncio.sleep(delay / 1e9)
+                read_start = clock()
+        parts.append(packet)
+        size += len(packet)
+        if size >= chunk_size:
+            chunk = b''.join(parts)
+            read_ns += clock() - read_start
+            await feed(chunk)
+            parts, size = [], 0
+            read_start = clock()
+    chunk = b''.join(parts)
+    read_ns += clock() - read_start
+    if chunk:
+        await feed(chunk)
+    return read_ns
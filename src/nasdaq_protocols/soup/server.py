@@ -0,0 +1,389 @@
+"""
+A SoupBinTCP server serving sequenced messages from a store.
+
+The sequenced messages are appended to a `SequencedStore`, an append-only log of the
+encoded `SequencedData` packets indexed by sequence number, kept in memory (`MemoryStore`)
+or in a memory-mapped file (`MmapStore`)::
+
+    server = await soup.SoupServer(soup.MemoryStore(), session_name='session').start(port=0)
+    server.append(b'payload')     # or an application message, e.g. an itch message
+    ...
+    await server.stop()
+
+A client logging in with sequence `n` receives the stored messages from `n` onwards, then
+the live appends; sequence 0 joins at the end of the stream. The stored packets are streamed
+in chunks of up to `batch_bytes`, one write per chunk, and the streaming is suspended while
+the transport asks to pause writing.
+
+The appends of one event-loop iteration are fanned out to the logged-in sessions together,
+the sessions at the same sequence share the same chunk.
+"""
+import abc
+import asyncio
+import bisect
+import mmap
+import os
+from array import array
+from typing import Any, Awaitable, Callable
+
+import attrs
+from nasdaq_protocols import common
+from .core import (
+    LoginRequest,
+    LoginAccepted,
+    LoginRejected,
+    LoginRejectReason,
+    SequencedData,
+    UnSequencedData,
+)
+from .session import SoupServerSession
+
+
+__all__ = [
+    'SequencedStore',
+    'MemoryStore',
+    'MmapStore',
+    'SequencedServerSession',
+    'SoupServer',
+]
+
+
+@attrs.define(auto_attribs=True)
+class SequencedStore(abc.ABC):
+    """
+    Append-only log of sequenced messages, the first message has the sequence number 1.
+
+    The messages are stored as encoded `SequencedData` packets, back to back, and indexed by
+    their offset in the log, so that a range of messages is read in one go.
+    """
+    # offset of every packet in the log, followed by the end of the log.
+    _offsets: array = attrs.field(init=False, factory=lambda: array('Q', [0]))
+
+    def __len__(self) -> int:
+        """Returns the number of messages in the store."""
+        return len(self._offsets) - 1
+
+    @property
+    def next_sequence(self) -> int:
+        """The sequence number of the next message appended."""
+        return len(self._offsets)
+
+    def append(self, data: bytes | common.CommonMessage) -> int:
+        """
+        Append a message.
+
+        :param data: application payload, or application message.
+        :return: the sequence number of the message.
+        """
+        if isinstance(data, common.CommonMessage):
+            packet = SequencedData.encode_message(data)
+        else:
+            packet = SequencedData(data).to_bytes()[1]
+        offset = self._offsets[-1]
+        self._write(offset, packet)
+        self._offsets.append(offset + len(packet))
+        return len(self._offsets) - 1
+
+    def read_packets(self, sequence: int, max_bytes: int) -> tuple[bytes, int]:
+        """
+        Read the encoded packets of the messages from `sequence` onwards.
+
+        :param sequence: sequence number of the first message.
+        :param max_bytes: the packets read do not exceed this size, unless the first one does.
+        :return: (packets back to back, number of messages)
+        """
+        offsets, index = self._offsets, sequence - 1
+        if not 0 <= index < len(offsets) - 1:
+            return b'', 0
+        start = offsets[index]
+        end_index = bisect.bisect_right(offsets, start + max_bytes, index + 1) - 1
+        end_index = max(end_index, index + 1)
+        return self._read(start, offsets[end_index]), end_index - index
+
+    def payload(self, sequence: int) -> bytes:
+        """Returns the application payload of the message `sequence`."""
+        if not 0 < sequence < len(self._offsets):
+            raise IndexError(f'no message with sequence {sequence}')
+        return self._read(self._offsets[sequence - 1] + 3, self._offsets[sequence])
+
+    def close(self) -> None:
+        """Release the resources of the store."""
+
+    @abc.abstractmethod
+    def _write(self, offset: int, packet: bytes) -> None:
+        """Write `packet` at `offset` of the log, the end of the log."""
+
+    @abc.abstractmethod
+    def _read(self, start: int, end: int) -> bytes:
+        """Returns a copy of the log between `start` and `end`."""
+
+
+@attrs.define(auto_attribs=True)
+class MemoryStore(SequencedStore):
+    """
+    Sequenced store kept in memory.
+    """
+    _log: bytearray = attrs.field(init=False, factory=bytearray)
+
+    def _write(self, offset: int, packet: bytes) -> None:
+        self._log += packet
+
+    def _read(self, start: int, end: int) -> bytes:
+        return bytes(memoryview(self._log)[start:end])
+
+
+@attrs.define(auto_attribs=True)
+class MmapStore(SequencedStore):
+    """
+    Sequenced store kept in a memory-mapped file.
+
+    The file holds the encoded packets back to back, it is grown as needed and truncated to
+    the end of the log when the store is closed. An existing file is opened and its messages
+    are indexed again, new messages are appended after them.
+
+    :param path: path of the file.
+    :param initial_size: initial size of the mapping in bytes. [Default=1MiB]
+    """
+    path: str | os.PathLike
+    initial_size: int = attrs.field(kw_only=True, default=1 << 20)
+    _fd: int = attrs.field(init=False, default=-1)
+    _mmap: mmap.mmap | None = attrs.field(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        size = os.fstat(self._fd).st_size
+        self._map(max(size, self.initial_size, 1))
+        self._index(size)
+
+    def close(self) -> None:
+        if self._mmap is None:
+            return
+        self._mmap.flush()
+        self._mmap.close()
+        self._mmap = None
+        os.ftruncate(self._fd, self._offsets[-1])
+        os.close(self._fd)
+
+    def _map(self, size: int) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+
+    def _index(self, size: int) -> None:
+        """Index the packets already in the file, the log ends at the first empty or partial packet."""
+        log, offset = self._mmap, 0
+        while offset + 3 <= size:
+            end = offset + 2 + ((log[offset] << 8) | log[offset + 1])
+            if end == offset + 2 or end > size:
+                break
+            self._offsets.append(end)
+            offset = end
+
+    def _write(self, offset: int, packet: bytes) -> None:
+        end = offset + len(packet)
+        if end > len(self._mmap):
+            self._map(max(2 * len(self._mmap), end))
+        self._mmap[offset:end] = packet
+
+    def _read(self, start: int, end: int) -> bytes:
+        return self._mmap[start:end]
+
+
+OnUnsequencedCoro = Callable[['SequencedServerSession', UnSequencedData], Awaitable[None]]
+
+
+@attrs.define(auto_attribs=True)
+@common.logable
+class SequencedServerSession(SoupServerSession):
+    """
+    Server session streaming the sequenced messages of a `SoupServer`.
+
+    Once logged in, the session sends the messages of the store from its `sequence` onwards,
+    and keeps up with the appends. The streaming stops while the transport asks to pause
+    writing, and resumes once it drained.
+
+    :param server: the server owning the session.
+    """
+    server: 'SoupServer' = attrs.field(kw_only=True, default=None)
+    _writing_paused: bool = attrs.field(init=False, default=False)
+
+    async def on_login(self, msg: LoginRequest) -> LoginAccepted | LoginRejected:
+        reply = self.server.login(msg)
+        if isinstance(reply, LoginAccepted):
+            self.sequence = reply.sequence
+        return reply
+
+    async def on_unsequenced(self, msg: UnSequencedData) -> None:
+        if self.server.on_unsequenced is not None:
+            await self.server.on_unsequenced(self, msg)
+
+    def is_logged_in(self) -> bool:
+        return self._logged_in
+
+    def pump(self, chunks: dict[int, tuple[bytes, int]] | None = None) -> None:
+        """
+        Send the messages of the store the client has not received yet.
+
+        :param chunks: packets read from the store by sequence, shared by the sessions of a fan-out.
+        :meta private:
+        """
+        store, batch_bytes = self.server.store, self.server.batch_bytes
+        while not self._writing_paused and self.sequence < store.next_sequence and self.is_active():
+            chunk = chunks.get(self.sequence) if chunks is not None else None
+            if chunk is None:
+                chunk = store.read_packets(self.sequence, batch_bytes)
+                if chunks is not None:
+                    chunks[self.sequence] = chunk
+            self.send_encoded(chunk[0])
+            self.sequence += chunk[1]
+
+    def pause_writing(self) -> None:
+        """
+        :meta private:
+        """
+        self.log.debug('%s> pause writing', self.session_id)
+        self._writing_paused = True
+
+    def resume_writing(self) -> None:
+        """
+        :meta private:
+        """
+        self.log.debug('%s> resume writing', self.session_id)
+        self._writing_paused = False
+        if self._logged_in:
+            asyncio.get_running_loop().call_soon(self.pump)
+
+    async def close(self, drain: bool = False):
+        if self.server is not None:
+            self.server.remove_session(self)
+        await super().close(drain)
+
+    async def _handle_login(self, msg: LoginRequest) -> None:
+        await super()._handle_login(msg)
+        if self._logged_in:
+            self.pump()
+
+
+@common.logable
+@attrs.define(auto_attribs=True)
+class SoupServer(common.Stoppable):
+    """
+    SoupBinTCP server serving the sequenced messages of a store.
+
+    :param store: the sequenced messages. [Default=new MemoryStore]
+    :param session_name: name of the soup session, a login for another session is rejected.
+    :param authenticate: called with the user and the password of a login, the login is rejected
+        if it returns False. [Default=all logins are accepted]
+    :param on_unsequenced: coroutine called with the session and every unsequenced message received.
+    :param batch_bytes: maximum size of a write when streaming the stored messages. [Default=64KiB]
+    :param client_heartbeat_interval: seconds between client heartbeats.
+    :param server_heartbeat_interval: seconds between server heartbeats.
+    """
+    store: SequencedStore = attrs.field(factory=MemoryStore)
+    session_name: str = attrs.field(kw_only=True, default='')
+    authenticate: Callable[[str, str], bool] | None = attrs.field(kw_only=True, default=None)
+    on_unsequenced: OnUnsequencedCoro | None = attrs.field(kw_only=True, default=None)
+    batch_bytes: int = attrs.field(kw_only=True, default=64 * 1024)
+    client_heartbeat_interval: int = attrs.field(kw_only=True, default=10)
+    server_heartbeat_interval: int = attrs.field(kw_only=True, default=10)
+    host: str | None = attrs.field(init=False, default=None)
+    port: int | None = attrs.field(init=False, default=None)
+    # the sessions by id, attrs sessions compare by value and are not hashable.
+    _sessions: dict[int, SequencedServerSession] = attrs.field(init=False, factory=dict)
+    _server: asyncio.Server | None = attrs.field(init=False, default=None)
+    _serve_task: asyncio.Task | None = attrs.field(init=False, default=None)
+    _fan_out_handle: asyncio.Handle | None = attrs.field(init=False, default=None)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, **kwargs: Any) -> 'SoupServer':
+        """
+        Start listening, `port` is updated with the listening port.
+
+        :param host: address to listen on.
+        :param port: port to listen on, 0 picks a free port.
+        :param kwargs: passed to `loop.create_server`.
+        """
+        self._server, self._serve_task = await common.start_server(
+            (host, port), self.create_session, name=f'soup-server:{self.session_name}', **kwargs
+        )
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        self.log.debug('soup server listening on %s:%d', self.host, self.port)
+        return self
+
+    async def stop(self) -> None:
+        """Stop listening, close all the sessions and the store."""
+        if self._server is not None:
+            self._server.close()
+            self._serve_task = await common.stop_task(self._serve_task)
+            self._server = None
+        if self._fan_out_handle is not None:
+            self._fan_out_handle.cancel()
+            self._fan_out_handle = None
+        for session in self.sessions:
+            await session.close()
+        self.store.close()
+
+    def is_stopped(self) -> bool:
+        return self._server is None
+
+    def create_session(self) -> SequencedServerSession:
+        """Returns a new session of the server, the protocol factory of the listening socket."""
+        session = SequencedServerSession(
+            server=self,
+            client_heartbeat_interval=self.client_heartbeat_interval,
+            server_heartbeat_interval=self.server_heartbeat_interval
+        )
+        self._sessions[id(session)] = session
+        return session
+
+    def remove_session(self, session: SequencedServerSession) -> None:
+        """Forget a closed session."""
+        self._sessions.pop(id(session), None)
+
+    @property
+    def sessions(self) -> list[SequencedServerSession]:
+        """The connected sessions."""
+        return list(self._sessions.values())
+
+    def append(self, data: bytes | common.CommonMessage) -> int:
+        """
+        Append a sequenced message, it is sent to the logged-in sessions in the same event-loop
+        iteration, along with the other messages appended in that iteration.
+
+        :param data: application payload, or application message.
+        :return: the sequence number of the message.
+        """
+        sequence = self.store.append(data)
+        if self._fan_out_handle is None and self._sessions:
+            self._fan_out_handle = asyncio.get_running_loop().call_soon(self._fan_out)
+        return sequence
+
+    def end_session(self) -> None:
+        """Send an end of session to all the sessions, and close them."""
+        for session in self.sessions:
+            if session.is_active():
+                session.end_session()
+
+    def login(self, msg: LoginRequest) -> LoginAccepted | LoginRejected:
+        """
+        Returns the reply to a login.
+
+        The session streams from the requested sequence, or from the next message appended when
+        the requested sequence is 0 or past the end of the store.
+        :meta private:
+        """
+        if self.authenticate is not None and not self.authenticate(msg.user, msg.password):
+            return LoginRejected(LoginRejectReason.NOT_AUTHORIZED)
+        if msg.session and msg.session != self.session_name:
+            return LoginRejected(LoginRejectReason.SESSION_NOT_AVAILABLE)
+        requested, next_sequence = int(msg.sequence or 0), self.store.next_sequence
+        sequence = requested if 0 < requested <= next_sequence else next_sequence
+        return LoginAccepted(self.session_name, sequence)
+
+    def _fan_out(self) -> None:
+        self._fan_out_handle = None
+        chunks = {}
+        for session in self.sessions:
+            if session.is_logged_in():
+                session.pump(chunks)
@@ -9,6 +9,7 @@ from typing import Any, Awaitable, Callable, ClassVar
 import attrs
 from nasdaq_protocols import common
 from ._reader import SoupMessageReader
+from .journal import JournalWriter
 from .core import (
     SoupMessage,
     LoginRequest,
@@ -80,6 +81,10 @@ class SoupSession(common.AsyncSession, abc.ABC):
     :param sequence: The sequence number. [Default=1]
     :param client_heartbeat_interval: The client heartbeat interval in seconds. [Default=10]
     :param server_heartbeat_interval: The server heartbeat interval in seconds. [Default=10]
+    :param zero_copy: If True, the payload of received `SequencedData` messages is a read-only memoryview
+                      into a frame arena owned by the reader. [Default=False]
+    :param on_heartbeat: Called with every heartbeat received. The reader skips the heartbeats
+                         without creating a message unless this is set. [Default=None]
     :param session_id: The session id.
     """
 
@@ -90,6 +95,8 @@ class SoupSession(common.AsyncSession, abc.ABC):
     sequence: int = attrs.field(default=1, kw_only=True)
     client_heartbeat_interval: int = attrs.field(default=10, kw_only=True)
     server_heartbeat_interval: int = attrs.field(default=10, kw_only=True)
+    zero_copy: bool = attrs.field(default=False, kw_only=True)
+    on_heartbeat: Callable[[SoupMessage], None] | None = attrs.field(default=None, kw_only=True)
     session_id: SoupSessionId = attrs.Factory(SoupSessionId)
     reader_factory: common.ReaderFactory = attrs.field(init=False, default=SoupMessageReader)
 
@@ -106,6 +113,12 @@ class SoupSession(common.AsyncSession, abc.ABC):
         self.session_id.session_type = self.SessionType
         super().__attrs_post_init__()
 
+    def _create_reader(self) -> SoupMessageReader:
+        reader = super()._create_reader()
+        reader.zero_copy = self.zero_copy
+        reader.on_heartbeat = self.on_heartbeat
+        return reader
+
     def send_msg(self, msg: SoupMessage) -> None:
         """
         Send a soup message to the server.
@@ -113,15 +126,26 @@ class SoupSession(common.AsyncSession, abc.ABC):
         :param msg: SoupMessage object.
         """
         _, bytes_ = msg.to_bytes()
-        self._transport.write(bytes_)
-        self.log.debug('%s> sent %s', self.session_id, str(bytes_))
+        self._write(bytes_)
 
         if not msg.is_heartbeat() and self._local_hb_monitor:
             self._local_hb_monitor.ping()
         if isinstance(msg, SequencedData):
-            self.log.debug('%s> sent sequenced message, seq = %d', self.session_id, self.sequence)
             self.sequence += 1
 
+    def send_encoded(self, data: bytes) -> None:
+        """
+        Send packets that are already encoded, in one write.
+
+        The packets are written as they are, they must not carry sequenced data,
+        e.g. a batch of `UnSequencedData` packets from `ColumnarEncoder`.
+
+        :param data: the encoded packets, back to back.
+        """
+        self._write(data)
+        if self._local_hb_monitor:
+            self._local_hb_monitor.ping()
+
     def send_debug(self, text: str) -> None:
         """
         Send a debug message to the peer.
@@ -149,8 +173,14 @@ class SoupClientSession(SoupSession, session_type='client'):
     SoupBinTCP client session.
 
     Upon successful connecting to the soup server, the client session is instantiated.
+
+    :param capture: journal the sequenced messages received are appended to, along with their
+                    receive time, refer `JournalWriter`. A journal is shared across re-logins only if
+                    they continue from the next sequence number, otherwise the capture stops.
+                    [Default=None]
     """
     dispatch_on_connect: bool = False
+    capture: JournalWriter | None = attrs.field(default=None, kw_only=True)
 
     async def login(self, msg: LoginRequest):
         """
@@ -164,6 +194,7 @@ class SoupClientSession(SoupSession, session_type='client'):
         """
         self.log.debug('%s> logging in', self.session_id)
         self.session_id.update(msg)
+        self.sequence = 0
         self.send_msg(msg)
 
         reply = await self.receive_msg()
@@ -173,7 +204,13 @@ class SoupClientSession(SoupSession, session_type='client'):
             raise ConnectionRefusedError(str(reply))
 
         self.session_id.update(reply)
-        self.sequence = reply.sequence - 1
+        requested_sequence = int(msg.sequence)
+        if requested_sequence and reply.sequence > requested_sequence:
+            self.log.warning('%s> sequence gap, requested = %d, accepted = %d',
+                             self.session_id, requested_sequence, reply.sequence)
+            self.metrics.sequence_gaps += 1
+        # sequenced messages decoded along with the login reply are already counted.
+        self.sequence += reply.sequence - 1
         self.log.debug('%s> session established, sequence = %d', self.session_id, self.sequence)
         self.start_heartbeats(self.client_heartbeat_interval, self.server_heartbeat_interval)
         self.start_dispatching()
@@ -194,11 +231,51 @@ class SoupClientSession(SoupSession, session_type='client'):
         """
         self.send_msg(UnSequencedData(data))
 
+    def send_unseq_msg(self, msg: common.CommonMessage):
+        """
+        Send an application message as unsequenced data to the server.
+
+        The message and its soup header are encoded in one buffer.
+        :param msg: application message
+        """
+        self.send_encoded(UnSequencedData.encode_message(msg))
+
     async def on_message(self, msg):
         if isinstance(msg, SequencedData):
             self.sequence += 1
+            if self.capture is not None:
+                self.capture.append(msg.data)
+        elif isinstance(msg, LoginAccepted) and self.capture is not None:
+            self._capture_login(msg.sequence)
         await super().on_message(msg)
 
+    async def on_message_batch(self, msgs):
+        if self.capture is not None:
+            self._capture_batch(msgs)
+        self.sequence += sum(1 for msg in msgs if isinstance(msg, SequencedData))
+        await super().on_message_batch(msgs)
+
+    def _capture_batch(self, msgs):
+        payloads = []
+        for msg in msgs:
+            if isinstance(msg, SequencedData):
+                payloads.append(msg.data)
+            elif isinstance(msg, LoginAccepted):
+                self.capture.append_batch(payloads)
+                payloads = []
+                if not self._capture_login(msg.sequence):
+                    return
+        self.capture.append_batch(payloads)
+
+    def _capture_login(self, sequence) -> bool:
+        try:
+            self.capture.begin(sequence)
+        except ValueError as exc:
+            self.log.error('%s> capture stopped, %s', self.session_id, exc)
+            self.capture = None
+            return False
+        return True
+
 
 @attrs.define(auto_attribs=True)
 @common.logable
@@ -238,12 +315,18 @@ class SoupServerSession(SoupSession, session_type='server'):
         :param msg: UnSequencedData message.
         """
 
-    def send_seq_msg(self, data: bytes | SequencedData) -> None:
+    def send_seq_msg(self, data: bytes | SequencedData | common.CommonMessage) -> None:
         """
         Send sequenced data to the client.
 
-        :param data: application payload
+        An application message and its soup header are encoded in one buffer.
+
+        :param data: application payload, or application message
         """
+        if isinstance(data, common.CommonMessage):
+            self.send_encoded(SequencedData.encode_message(data))
+            self.sequence += 1
+            return
         if not isinstance(data, SequencedData):
             data = SequencedData(data)
         self.send_msg(data)
@@ -331,6 +414,9 @@ class SoupClientSessionSync:
     def send_unseq_data(self, data: bytes):
         self.session.send_unseq_data(data)
 
+    def send_unseq_msg(self, msg: common.CommonMessage):
+        self.bridge.execute_sync(self.session.send_unseq_msg, msg)
+
     def logout(self):
         with self.close_lock:
             if not self.closed_event.is_set():
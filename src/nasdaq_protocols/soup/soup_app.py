@@ -1,5 +1,5 @@
 import asyncio
-from typing import Callable, Type, Awaitable, Generic, TypeVar
+from typing import Any, Callable, ClassVar, Type, Awaitable, Generic, TypeVar
 
 import attrs
 
@@ -7,8 +7,11 @@ from nasdaq_protocols.common import (
     Serializable,
     Byte,
     CommonMessage,
+    MessagePool,
     logable,
     DispatchableMessageQueue,
+    SessionMetrics,
+    REGISTRY,
 )
 from nasdaq_protocols import soup
 
@@ -40,11 +43,23 @@ class SoupAppMessageId(Serializable):
         return f'indicator={self.indicator}, direction={self.direction}'
 
 
+# (app name, direction) -> indicator -> `decode_body` of the message class, see `SoupAppMessage.from_bytes`.
+_DISPATCH_TABLES: dict[tuple[str, str], list[Callable | None]] = {}
+
+
 @attrs.define
 @logable
 class SoupAppMessage(CommonMessage):
+    """
+    Base class of the messages of the applications carried over SoupBinTCP.
+
+    The message id is the one byte indicator. `from_bytes` decodes the messages of the
+    `DecodeDirection`, 'outgoing' (sent by the server) by default. The message class is found
+    in a table indexed by the indicator, built once per application and direction.
+    """
     IncomingMsgClasses = []
     OutgoingMsgsClasses = []
+    DecodeDirection: ClassVar[str] = 'outgoing'
 
     def __init_subclass__(cls, *args, **kwargs):
         cls.log.debug('%s subclassing %s, params = %s', cls.__mro__[1].__name__, cls.__name__, str(kwargs))
@@ -57,6 +72,34 @@ class SoupAppMessage(CommonMessage):
             kwargs['msg_id'] = SoupAppMessageId(kwargs['indicator'], kwargs['direction'])
 
         super().__init_subclass__(**kwargs)
+        _DISPATCH_TABLES.clear()
+
+    @classmethod
+    def from_bytes(cls, bytes_: bytes, pool: Any = None) -> tuple[int, CommonMessage]:
+        if not bytes_:
+            return super().from_bytes(bytes_, pool)
+        decode_body = cls.dispatch_table()[bytes_[0]]
+        if decode_body is None:
+            return cls.on_unknown_msg_id(bytes_, SoupAppMessageId(bytes_[0], cls.DecodeDirection))
+        return decode_body(bytes_, 1, pool)
+
+    @classmethod
+    def dispatch_table(cls) -> list[Callable | None]:
+        """
+        Returns the 256 entries table of the application, indexed by the indicator.
+
+        An entry is the `decode_body` of the message class of the indicator in the
+        `DecodeDirection`, or None when the indicator is unknown.
+        """
+        key = (cls.AppName, cls.DecodeDirection)
+        table = _DISPATCH_TABLES.get(key)
+        if table is None:
+            table = [None] * 256
+            for msg_id, msg_cls in CommonMessage.MsgIdToClsMap[cls.AppName].items():
+                if msg_id.direction == cls.DecodeDirection:
+                    table[msg_id.indicator] = msg_cls.decode_body
+            _DISPATCH_TABLES[key] = table
+        return table
 
 
 class SoupAppSessionId:
@@ -73,18 +116,51 @@ class SoupAppSessionId:
 @attrs.define(auto_attribs=True)
 @logable
 class SoupAppClientSession(Generic[M]):
-    """Base client session class with common functionality for all protocol implementations."""
+    """Base client session class with common functionality for all protocol implementations.
+
+    When `queue_high_watermark` is set, the underlying soup session stops reading from the
+    network while the application's message queue holds that many messages, and resumes once
+    it has drained down to `queue_low_watermark`.
+
+    The application message queue reports to its own `metrics`, the counters of the
+    transport are in `soup_session.metrics`. Both are exported with the label of the soup
+    session, the `layer` label tells them apart.
+
+    A plain function `on_msg_coro` is called from the reader of the soup session while no
+    message is waiting in the application message queue, refer `DispatchableMessageQueue`.
+
+    When `message_pool` is set, the received messages are decoded into the messages of the
+    pool, and given back to the pool once `on_msg_coro` returns. The messages must then not
+    be retained by the handler, see `MessagePool`. The messages read with `receive_message`
+    are not given back, release them with `message_pool.release(msg)`. A flyweight pool is used
+    only for the messages handed to a synchronous `on_msg_coro` right away, the messages that
+    have to wait in the queue are decoded into new messages.
+    """
     soup_session: soup.SoupClientSession
     on_msg_coro: Callable[[Type[M]], Awaitable[None]] = None
     on_close_coro: Callable[[], Awaitable[None]] = None
     closed: bool = False
+    queue_high_watermark: int | None = attrs.field(kw_only=True, default=None)
+    queue_low_watermark: int | None = attrs.field(kw_only=True, default=None)
+    message_pool: MessagePool | None = attrs.field(kw_only=True, default=None)
     _session_id: SoupAppSessionId = None
     _close_event: asyncio.Event = None
     _message_queue: DispatchableMessageQueue = None
+    metrics: SessionMetrics = attrs.field(init=False, default=None)
 
     def __attrs_post_init__(self):
         self._session_id = self._create_session_id()
-        self._message_queue = DispatchableMessageQueue(self._session_id, self.on_msg_coro)
+        self.metrics = REGISTRY.register(SessionMetrics(self.soup_session.session_id, layer='application'))
+        self._message_queue = DispatchableMessageQueue(
+            self._session_id,
+            self.on_msg_coro,
+            high_watermark=self.queue_high_watermark,
+            low_watermark=self.queue_low_watermark,
+            on_high_watermark=self.soup_session.pause_reading,
+            on_low_watermark=self.soup_session.resume_reading,
+            metrics=self.metrics,
+            on_dispatched=self.message_pool.release if self.message_pool is not None else None
+        )
         self.soup_session.set_handlers(on_msg_coro=self._on_soup_message, on_close_coro=self._on_soup_close)
         self.soup_session.start_dispatching()
 
@@ -105,7 +181,17 @@ class SoupAppClientSession(Generic[M]):
         Send a message to the server.
         Not implemented in all protocols (e.g., ITCH is read-only).
         """
-        self.soup_session.send_unseq_data(msg.to_bytes()[1])
+        self.soup_session.send_unseq_msg(msg)
+
+    async def feed(self, data: bytes | bytearray | memoryview) -> None:
+        """
+        Process soup packets as if they were received from the server, and wait until the
+        application messages decoded from them are dispatched, refer `AsyncSession.feed`.
+
+        :param data: soup packets.
+        """
+        await self.soup_session.feed(data)
+        await self._message_queue.join()
 
     async def close(self):
         """
@@ -119,14 +205,22 @@ class SoupAppClientSession(Generic[M]):
         await self._close_event.wait()
         self.log.debug('%s> closed.', self._session_id)
 
-    async def _on_soup_message(self, message: soup.SoupMessage):
+    def _on_soup_message(self, message: soup.SoupMessage):
+        # synchronous, the soup session hands the messages over straight from its reader.
         if isinstance(message, soup.SequencedData):
-            self.log.debug('%s> incoming sequenced bytes_', self._session_id)
-            decoded = self.decode(message.data)
-            await self._message_queue.put(decoded[1])
+            # a flyweight message is overwritten by the next decode, it is only used when the
+            # handler is done with it before then.
+            pool = self.message_pool
+            if pool is not None and (not pool.flyweight or self._message_queue.dispatches_inline()):
+                decoded = pool.decode(message.data)
+            else:
+                decoded = self.decode(message.data)
+            if decoded[1] is not None:
+                self._message_queue.dispatch_nowait(decoded[1])
 
     async def _on_soup_close(self):
         await self._message_queue.stop()
+        REGISTRY.unregister(self.metrics)
         if self.on_close_coro is not None:
             await self.on_close_coro()
         if self._close_event:
@@ -9,7 +9,8 @@ from nasdaq_protocols.common import utils
 LOG = logging.getLogger('soup-tail')
 
 
-async def _tail_soup(remote, user, passwd, session, sequence, client_heartbeat_interval, server_heartbeat_interval):
+async def _tail_soup(remote, user, passwd, session, sequence,
+                     client_heartbeat_interval, server_heartbeat_interval, capture=None):
     closed = asyncio.Event()
     soup_session = None
 
@@ -30,7 +31,8 @@ async def _tail_soup(remote, user, passwd, session, sequence, client_heartbeat_i
             on_msg_coro=on_msg,
             on_close_coro=on_close,
             client_heartbeat_interval=client_heartbeat_interval,
-            server_heartbeat_interval=server_heartbeat_interval
+            server_heartbeat_interval=server_heartbeat_interval,
+            capture=capture
         )
         LOG.info('connected')
         await closed.wait()
@@ -48,13 +50,20 @@ async def _tail_soup(remote, user, passwd, session, sequence, client_heartbeat_i
 @click.option('-s', '--sequence', default=1, show_default=True)
 @click.option('-t', '--client-heartbeat-interval', default=10, show_default=True)
 @click.option('-T', '--server-heartbeat-interval', default=10, show_default=True)
+@click.option('-c', '--capture', default=None, help='journal file the sequenced messages are captured to')
 @click.option('-v', '--verbose', count=True)
 def command(host, port, user, password, session, sequence,
-            client_heartbeat_interval, server_heartbeat_interval, verbose):
+            client_heartbeat_interval, server_heartbeat_interval, capture, verbose):
     """ Simple command that tails soup messages"""
     utils.enable_logging_tools(verbose)
-    asyncio.run(
-        _tail_soup(
-            (host, port), user, password, session, sequence, client_heartbeat_interval, server_heartbeat_interval
+    journal = soup.JournalWriter(capture) if capture else None
+    try:
+        asyncio.run(
+            _tail_soup(
+                (host, port), user, password, session, sequence, client_heartbeat_interval, server_heartbeat_interval,
+                journal
+            )
         )
-    )
+    finally:
+        if journal is not None:
+            journal.close()
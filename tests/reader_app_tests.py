@@ -17,10 +17,14 @@ READER_TESTS = []
 class MsgHandler:
     received_messages: asyncio.Queue = attrs.field(init=False, default=attrs.Factory(asyncio.Queue))
     closed: asyncio.Event = attrs.field(init=False, default=attrs.Factory(asyncio.Event))
+    received_batches: asyncio.Queue = attrs.field(init=False, default=attrs.Factory(asyncio.Queue))
 
     async def on_msg(self, msg: Any):
         await self.received_messages.put(msg)
 
+    async def on_msg_batch(self, msgs: list[Any]):
+        await self.received_batches.put(msgs)
+
     async def on_close(self):
         self.closed.set()
 
@@ -97,6 +101,39 @@ async def _reader__multiple_msgs_per_packet__all_msgs_read(**kwargs):
     await reader.stop()
 
 
+@reader_test
+async def reader__batch_mode__all_complete_msgs_dispatched_in_one_batch(**kwargs):
+    handler, reader, input_factory, output_factory = all_test_params(**kwargs)
+    reader.on_msg_batch_coro = handler.on_msg_batch
+
+    # two complete messages and the first half of a third one.
+    partial = input_factory(1)
+    reader.on_data(input_factory(1) + input_factory(2) + partial[:len(partial) // 2])
+
+    batch = await asyncio.wait_for(handler.received_batches.get(), 1)
+    assert batch == [output_factory(1), output_factory(2)]
+    assert handler.received_messages.empty()
+
+    # the rest of the partial message forms the next batch.
+    reader.on_data(partial[len(partial) // 2:])
+    batch = await asyncio.wait_for(handler.received_batches.get(), 1)
+    assert batch == [output_factory(1)]
+
+    await reader.stop()
+
+
+@reader_test
+async def reader__batch_mode__end_of_session__batch_dispatched_and_reader_stopped(**kwargs):
+    handler, reader, input_factory, output_factory = all_test_params(**kwargs)
+    reader.on_msg_batch_coro = handler.on_msg_batch
+
+    reader.on_data(input_factory(1) + input_factory(0))
+
+    batch = await asyncio.wait_for(handler.received_batches.get(), 1)
+    assert batch == [output_factory(1)]
+    await asyncio.wait_for(handler.closed.wait(), 1)
+
+
 @reader_test
 async def reader__one_msg_in_multiple_packets__msg_is_read(**kwargs):
     handler, reader, input_factory, output_factory = all_test_params(**kwargs)
@@ -101,3 +101,32 @@ async def test__heartbeatmonitor__stopped_from_trip_handler__monitor_is_stopped(
 
     await event.wait()
     assert monitor.is_stopped()
+
+
+@pytest.mark.asyncio
+async def test__heartbeatmonitor__not_stopped_when_no_activity__trips_again(monitor_trip_receiver_kit):
+    q, receiver = monitor_trip_receiver_kit
+    monitor = common.HeartbeatMonitor(session_id='test', interval=0.05, on_no_activity_coro=receiver,
+                                      stop_when_no_activity=False)
+
+    first_trip_time = await asyncio.wait_for(q.get(), 1)
+    second_trip_time = await asyncio.wait_for(q.get(), 1)
+
+    assert second_trip_time - first_trip_time >= 0.05
+    assert monitor.is_running()
+    await monitor.stop()
+    assert monitor.is_stopped()
+
+
+@pytest.mark.asyncio
+async def test__heartbeatmonitor__tolerate_missed_heartbeats__trips_after_tolerated_misses(monitor_trip_receiver_kit):
+    q, receiver = monitor_trip_receiver_kit
+    start_time = time.time()
+
+    monitor = common.HeartbeatMonitor(session_id='test', interval=0.05, on_no_activity_coro=receiver,
+                                      tolerate_missed_heartbeats=3)
+
+    monitor_trip_time = await asyncio.wait_for(q.get(), 1)
+    # first check consumes the initial ping, the next three are misses.
+    assert monitor_trip_time - start_time >= 0.05 * 4
+    assert not monitor.is_running()
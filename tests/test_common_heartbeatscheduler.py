@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from nasdaq_protocols import common
+
+
+@pytest.mark.asyncio
+async def test__heartbeatscheduler__get__one_scheduler_per_loop():
+    assert common.HeartbeatScheduler.get() is common.HeartbeatScheduler.get()
+
+
+@pytest.mark.asyncio
+async def test__heartbeatscheduler__calls_fired_in_order_of_due_time():
+    scheduler = common.HeartbeatScheduler()
+    fired = []
+    done = asyncio.Event()
+
+    scheduler.call_later(0.03, lambda: (fired.append('third'), done.set()))
+    scheduler.call_later(0.02, lambda: fired.append('second'))
+    # an earlier call wakes up the sleeping driver.
+    await asyncio.sleep(0)
+    scheduler.call_later(0.01, lambda: fired.append('first'))
+
+    await asyncio.wait_for(done.wait(), 1)
+    assert fired == ['first', 'second', 'third']
+
+
+@pytest.mark.asyncio
+async def test__heartbeatscheduler__cancelled_call__not_fired():
+    scheduler = common.HeartbeatScheduler()
+    fired = []
+    done = asyncio.Event()
+
+    call = scheduler.call_later(0.01, lambda: fired.append('cancelled'))
+    scheduler.call_later(0.02, done.set)
+    call.cancel()
+
+    await asyncio.wait_for(done.wait(), 1)
+    assert fired == []
+
+
+@pytest.mark.asyncio
+async def test__heartbeatscheduler__nothing_scheduled__driver_exits():
+    scheduler = common.HeartbeatScheduler()
+    done = asyncio.Event()
+
+    scheduler.call_later(0.01, done.set)
+    assert scheduler.is_running()
+
+    await asyncio.wait_for(done.wait(), 1)
+    await asyncio.sleep(0)
+    assert not scheduler.is_running()
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test__heartbeatscheduler__exception_in_callback__other_calls_fired():
+    scheduler = common.HeartbeatScheduler()
+    done = asyncio.Event()
+
+    scheduler.call_later(0.01, lambda: 1 / 0)
+    scheduler.call_later(0.02, done.set)
+
+    await asyncio.wait_for(done.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test__heartbeatscheduler__many_monitors__share_one_task():
+    async def on_no_activity():
+        pass
+
+    tasks_before = len(asyncio.all_tasks())
+    monitors = [
+        common.HeartbeatMonitor(session_id=f'test-{i}', interval=10, on_no_activity_coro=on_no_activity)
+        for i in range(100)
+    ]
+
+    assert len(asyncio.all_tasks()) == tasks_before + 1
+    assert all(monitor.is_running() for monitor in monitors)
+
+    await common.stop_task(monitors)
+    assert not any(monitor.is_running() for monitor in monitors)
+    await common.HeartbeatScheduler.get().stop()
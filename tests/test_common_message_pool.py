@@ -0,0 +1,115 @@
+from nasdaq_protocols.common import *
+from nasdaq_protocols import itch
+
+
+class PoolTestMessage(itch.Message, app_name='pool_test'):
+    def __init_subclass__(cls, **kwargs):
+        kwargs['app_name'] = 'pool_test'
+        super().__init_subclass__(**kwargs)
+
+
+class PoolAddOrder(PoolTestMessage, indicator=65, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('orderRef', UnsignedLongBE),
+            Field('side', CharAscii),
+            Field('price', UnsignedIntBE),
+        ]
+
+
+class PoolText(PoolTestMessage, indicator=84, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('text', AsciiString),
+        ]
+
+
+class LazyPoolTestMessage(itch.Message, app_name='lazy_pool_test'):
+    LazyDecoding = True
+
+    def __init_subclass__(cls, **kwargs):
+        kwargs['app_name'] = 'lazy_pool_test'
+        super().__init_subclass__(**kwargs)
+
+
+class LazyPoolAddOrder(LazyPoolTestMessage, indicator=65, direction='outgoing'):
+    __test__ = False
+    BodyRecord = PoolAddOrder.BodyRecord
+
+
+def add_order(order_ref, price, cls=PoolAddOrder):
+    msg = cls()
+    msg.orderRef, msg.side, msg.price = order_ref, 'B', price
+    return msg
+
+
+def text(value):
+    msg = PoolText()
+    msg.text = value
+    return msg
+
+
+def test__message_pool__decode__same_as_from_bytes():
+    pool = MessagePool(PoolTestMessage)
+
+    for msg in [add_order(1, 100), text('hello')]:
+        bytes_ = msg.to_bytes()[1]
+        assert pool.decode(bytes_ + b'trailing') == PoolTestMessage.from_bytes(bytes_ + b'trailing')
+
+
+def test__message_pool__released_message__reused():
+    pool = MessagePool(PoolTestMessage)
+
+    _, first = pool.decode(add_order(1, 100).to_bytes()[1])
+    pool.release(first)
+    _, second = pool.decode(add_order(2, 200).to_bytes()[1])
+    _, third = pool.decode(add_order(3, 300).to_bytes()[1])
+
+    assert second is first
+    assert third is not first
+    assert (second.orderRef, second.price) == (2, 200)
+    assert (third.orderRef, third.price) == (3, 300)
+    assert (pool.created, pool.reused) == (2, 1)
+
+
+def test__message_pool__max_size__extra_messages_dropped():
+    pool = MessagePool(PoolTestMessage, max_size=2)
+
+    for i in range(3):
+        pool.release(add_order(i, i))
+    pool.release(None)
+
+    assert len(pool) == 2
+
+
+def test__message_pool__flyweight__one_message_per_class():
+    pool = MessagePool(PoolTestMessage, flyweight=True)
+
+    _, first = pool.decode(add_order(1, 100).to_bytes()[1])
+    pool.release(first)
+    _, second = pool.decode(add_order(2, 200).to_bytes()[1])
+    _, other = pool.decode(text('hello').to_bytes()[1])
+
+    assert second is first
+    assert first.orderRef == 2
+    assert other.text == 'hello'
+    assert (pool.created, pool.reused) == (2, 1)
+
+
+def test__message_pool__lazy_decoding__record_reused_lazily():
+    pool = MessagePool(LazyPoolTestMessage, flyweight=True)
+
+    _, first = pool.decode(add_order(1, 100, LazyPoolAddOrder).to_bytes()[1])
+    assert first.record.is_lazy()
+    assert first.orderRef == 1
+
+    _, second = pool.decode(memoryview(add_order(2, 200, LazyPoolAddOrder).to_bytes()[1]))
+
+    assert second is first
+    assert second.record.is_lazy()
+    assert (second.orderRef, second.side, second.price) == (2, 'B', 200)
+    assert second == add_order(2, 200, LazyPoolAddOrder)
@@ -0,0 +1,267 @@
+import pytest
+from nasdaq_protocols.common import *
+
+
+FIXED_FIELDS = [
+    Field('byte', Byte),
+    Field('short', ShortBE),
+    Field('ushort', UnsignedShortBE),
+    Field('int', IntBE),
+    Field('uint', UnsignedIntBE),
+    Field('long', LongBE),
+    Field('ulong', UnsignedLongBE),
+    Field('flag', Boolean),
+    Field('char', CharAscii),
+    Field('iso_char', CharIso8599),
+    Field('stock', FixedAsciiString(8)),
+    Field('iso_name', FixedIsoString(4, right_justified=True)),
+    Field('with_default', UnsignedIntBE, default_value=7),
+]
+
+
+class FixedTestRecord(Record):
+    __test__ = False
+    Fields = FIXED_FIELDS
+
+
+class VariableTestRecord(Record):
+    __test__ = False
+    Fields = [
+        Field('byte', Byte),
+        Field('name', AsciiString),
+    ]
+
+
+FIXED_VALUES = {
+    'byte': 255,
+    'short': -2,
+    'ushort': 65535,
+    'int': -70000,
+    'uint': 4000000000,
+    'long': -(2 ** 40),
+    'ulong': 2 ** 63,
+    'flag': True,
+    'char': 'B',
+    'iso_char': 'é',
+    'stock': 'AAPL',
+    'iso_name': 'ab',
+}
+
+
+def per_field_bytes(fields, values):
+    return b''.join(
+        field.type.to_bytes(values.get(field.name, field.default_value or field.type.default_value))[1]
+        for field in fields
+    )
+
+
+def test__compile_struct_codec__fixed_fields__codec_compiled():
+    codec = compile_struct_codec(FIXED_FIELDS)
+
+    assert codec.struct_.format == '>BhHiIqQccc8s4sI'
+    assert codec.size == 1 + 2 + 2 + 4 + 4 + 8 + 8 + 1 + 1 + 1 + 8 + 4 + 4
+    assert FixedTestRecord.Codec is not None
+
+
+@pytest.mark.parametrize('fields', [
+    [Field('byte', Byte), Field('name', AsciiString)],
+    [Field('short', Short), Field('short_be', ShortBE)],
+    [Field('records', Array(Byte))],
+    [],
+])
+def test__compile_struct_codec__not_fixed_layout__no_codec(fields):
+    assert compile_struct_codec(fields) is None
+
+
+def test__compile_struct_codec__overridden_codec__no_codec():
+    class Price(UnsignedIntBE):
+        from_bytes = staticmethod(lambda x: (4, int.from_bytes(x[:4], 'big') / 10000))
+
+    class Plain(UnsignedIntBE):
+        pass
+
+    assert compile_struct_codec([Field('price', Price)]) is None
+    assert compile_struct_codec([Field('price', Plain)]) is not None
+
+
+def test__record__fixed_layout__encoded_as_per_field_codecs():
+    record = FixedTestRecord(dict(FIXED_VALUES))
+
+    len_, bytes_ = FixedTestRecord.to_bytes(record)
+
+    assert bytes_ == per_field_bytes(FIXED_FIELDS, FIXED_VALUES)
+    assert len_ == len(bytes_) == FixedTestRecord.Codec.size
+
+
+def test__record__fixed_layout__decoded_as_per_field_codecs():
+    bytes_ = per_field_bytes(FIXED_FIELDS, FIXED_VALUES) + b'trailing'
+
+    len_, record = FixedTestRecord.from_bytes(bytes_)
+
+    assert len_ == FixedTestRecord.Codec.size
+    assert record.values == {**FIXED_VALUES, 'with_default': 7}
+
+
+def test__record__fixed_layout__decoded_from_memoryview():
+    bytes_ = per_field_bytes(FIXED_FIELDS, FIXED_VALUES)
+
+    _, record = FixedTestRecord.from_bytes(memoryview(bytes_))
+
+    assert record.values == {**FIXED_VALUES, 'with_default': 7}
+
+
+def test__record__fixed_layout__short_buffer__falls_back_to_per_field_codecs():
+    class ShortTestRecord(Record):
+        Fields = [Field('byte', Byte), Field('uint', UnsignedIntBE)]
+
+    assert ShortTestRecord.from_bytes(b'\x01\x00\x01')[1].values == {'byte': 1, 'uint': 1}
+
+
+def test__record__fixed_layout__oversized_value__falls_back_to_per_field_codecs():
+    record = FixedTestRecord(dict(FIXED_VALUES, stock='TOO-LONG-SYMBOL'))
+
+    _, bytes_ = FixedTestRecord.to_bytes(record)
+
+    assert bytes_ == per_field_bytes(FIXED_FIELDS, dict(FIXED_VALUES, stock='TOO-LONG-SYMBOL'))
+
+
+def test__record__fixed_layout__value_out_of_range__raises_as_per_field_codec():
+    record = FixedTestRecord(dict(FIXED_VALUES, byte=256))
+
+    with pytest.raises(OverflowError):
+        FixedTestRecord.to_bytes(record)
+
+
+def test__record__variable_layout__per_field_codecs_used():
+    assert VariableTestRecord.Codec is None
+    assert VariableTestRecord.from_bytes(b'\x01\x02\x00ab')[1].values == {'byte': 1, 'name': 'ab'}
+
+
+class NestedTestRecord(Record):
+    __test__ = False
+    Fields = [
+        Field('short', ShortBE),
+        Field('char', CharAscii),
+    ]
+
+
+class MixedTestRecord(Record):
+    __test__ = False
+    Fields = [
+        Field('byte', Byte),
+        Field('uint', UnsignedIntBE),
+        Field('name', AsciiString),
+        Field('stock', FixedAsciiString(4)),
+        Field('short_le', Short),
+        Field('nested', NestedTestRecord),
+        Field('bytes', Array(Byte)),
+        Field('flag', Boolean),
+        Field('with_default', UnsignedIntBE, default_value=7),
+    ]
+
+
+MIXED_VALUES = {
+    'byte': 1,
+    'uint': 2,
+    'name': 'abc',
+    'stock': 'AAPL',
+    'short_le': -3,
+    'nested': NestedTestRecord({'short': 4, 'char': 'X'}),
+    'bytes': [5, 6],
+    'flag': True,
+}
+
+
+def test__compile_record_codec__no_fields__no_codec():
+    assert compile_record_codec([]) is None
+
+
+def test__compile_record_codec__offsets_computed_up_to_first_variable_field():
+    source = MixedTestRecord.CompiledCodec.source
+
+    assert '_unpack0(buffer, offset)' in source
+    assert 'offset, v2 = _unpack_from2(buffer, offset + 5)' in source
+    assert '_unpack3(buffer, offset)' in source
+    assert 'buffer[' not in source
+    assert '_unpack7(buffer, offset)' in source
+    assert 'zip(' not in source and 'sum(' not in source
+
+
+def test__compile_record_codec__mixed_byte_orders__one_struct_per_byte_order():
+    codec = compile_record_codec([Field('short_le', Short), Field('short_be', ShortBE), Field('byte', Byte)])
+
+    assert '_unpack0(buffer, offset)' in codec.source
+    assert '_unpack1(buffer, offset + 2)' in codec.source
+    assert codec.from_bytes(b'\x01\x00\x00\x02\x03') == (5, {'short_le': 1, 'short_be': 2, 'byte': 3})
+    assert codec.unpack_from(b'..\x01\x00\x00\x02\x03', 2) == (7, {'short_le': 1, 'short_be': 2, 'byte': 3})
+    assert codec.to_bytes({'short_le': 1, 'short_be': 2, 'byte': 3}) == (5, b'\x01\x00\x00\x02\x03')
+
+
+def test__compile_record_codec__generated_code_in_tracebacks():
+    import linecache
+
+    code = MixedTestRecord.CompiledCodec.unpack_from.__code__
+
+    assert 'MixedTestRecord' in code.co_filename
+    assert linecache.getline(code.co_filename, 1).startswith('def unpack_from(buffer, offset)')
+
+
+def test__record__compiled_codec__encoded_as_per_field_codecs(monkeypatch):
+    record = MixedTestRecord(dict(MIXED_VALUES))
+
+    compiled = MixedTestRecord.to_bytes(record)
+    monkeypatch.setattr(Record, 'UseCompiledCodec', False)
+    expected = MixedTestRecord.to_bytes(record)
+
+    assert compiled == expected
+    assert compiled[0] == len(compiled[1])
+
+
+def test__record__compiled_codec__decoded_as_per_field_codecs(monkeypatch):
+    _, bytes_ = MixedTestRecord.to_bytes(MixedTestRecord(dict(MIXED_VALUES)))
+
+    len_, record = MixedTestRecord.from_bytes(bytes_ + b'trailing')
+    monkeypatch.setattr(Record, 'UseCompiledCodec', False)
+    expected_len, expected = MixedTestRecord.from_bytes(bytes_ + b'trailing')
+
+    assert len_ == expected_len == len(bytes_)
+    assert Record.get_value(record) == Record.get_value(expected)
+    assert record.values['with_default'] == 7
+    assert record.values['nested'].values == {'short': 4, 'char': 'X'}
+
+
+def test__record__compiled_codec__disabled__per_field_codecs_used(monkeypatch):
+    class Failing:
+        def unpack_from(self, *_):
+            raise AssertionError('compiled codec used')
+
+        def to_bytes(self, _):
+            raise AssertionError('compiled codec used')
+
+    monkeypatch.setattr(VariableTestRecord, 'CompiledCodec', Failing())
+    monkeypatch.setattr(Record, 'UseCompiledCodec', False)
+
+    _, record = VariableTestRecord.from_bytes(b'\x01\x02\x00ab')
+
+    assert record.values == {'byte': 1, 'name': 'ab'}
+    assert VariableTestRecord.to_bytes(record) == (5, b'\x01\x02\x00ab')
+
+
+def test__record__compiled_codec__short_buffer__falls_back_to_per_field_codecs():
+    assert VariableTestRecord.from_bytes(b'\x01')[1].values == {'byte': 1, 'name': ''}
+
+
+def test__record__compiled_codec__used_by_generated_messages():
+    from tests.sqf_messages import SqfQuoteBlockMessage, SqfQuote
+
+    assert SqfQuote.CompiledCodec is not None
+    assert SqfQuoteBlockMessage.BodyRecord.CompiledCodec is not None
+
+
+def test__compile_struct_codec__field_accessors__decode_single_field():
+    codec = compile_struct_codec(FIXED_FIELDS)
+    bytes_ = per_field_bytes(FIXED_FIELDS, FIXED_VALUES)
+
+    for name, value in FIXED_VALUES.items():
+        assert codec.accessors[name].decode(bytes_) == value
+    assert codec.accessors['with_default'].offset == codec.size - 4
@@ -352,3 +352,266 @@ def test__common_message__as_collection():
         'body': {}
     }
     assert str(message) == json.dumps(data, indent=2)
+
+
+def test__record__fields_are_attributes__values_not_in_instance_dict():
+    record = SampleTestRecord()
+    record.byte_field = 2
+
+    assert isinstance(SampleTestRecord.__dict__['byte_field'], structures._FieldDescriptor)
+    assert record.values == {'byte_field': 2}
+    assert 'values' not in record.__dict__
+    assert record.short_field == 0
+    assert record.string_field == ''
+
+
+def test__record__validate_types_disabled__no_exception(monkeypatch):
+    class TestEnum(Enum):
+        A = 1
+
+    monkeypatch.setattr(SampleTestRecord, 'ValidateTypes', False)
+    record = SampleTestRecord()
+    record.string_field = 3
+    record.byte_field = TestEnum.A
+
+    assert record.string_field == 3
+    assert record.byte_field == 1
+
+
+def test__record__non_field_attribute__set_on_instance():
+    record = SampleTestRecord()
+    record.extra = 'extra'
+
+    assert record.extra == 'extra'
+    assert record.values == {}
+
+
+def test__common_message__fields_are_attributes():
+    message = SampleTestMessage()
+    message.byte_field = 2
+    message.string_field = 'test'
+
+    assert message.record.values == {'byte_field': 2, 'string_field': 'test'}
+    assert message.byte_field == 2
+    assert message.short_field == 0
+    assert 'record' not in message.__dict__
+
+    with pytest.raises(ValueError):
+        message.short_field = 'invalid'
+
+
+def test__record__values_assigned__fields_replaced():
+    _, record = SampleFixedTestRecord.from_bytes_lazy(SAMPLE_FIXED_BYTES)
+    record.values = {'byte_field': 2, 'stock': 'CD', 'price': 3}
+
+    assert not record.is_lazy()
+    assert record.price == 3
+    assert SampleFixedTestRecord.to_bytes(record)[1] == b'\x02CD  \x00\x00\x00\x03'
+
+
+class SampleShadowedFieldTestRecord(Record):
+    __test__ = False
+    Fields = [
+        structures.Field('hint', types.AsciiString),
+        structures.Field('byte_field', types.Byte),
+    ]
+
+
+class SampleShadowedFieldTestMessage(structures.CommonMessage):
+    BodyRecord = SampleShadowedFieldTestRecord
+
+
+def test__record__field_named_after_class_attribute__assignment_stored():
+    record = SampleShadowedFieldTestRecord()
+    record.hint = 'abc'
+    record.byte_field = 1
+    record.extra = 'extra'
+
+    assert record.values == {'hint': 'abc', 'byte_field': 1}
+    assert SampleShadowedFieldTestRecord.to_bytes(record)[1] == b'\x03\x00abc\x01'
+    assert SampleShadowedFieldTestRecord.hint == 'SampleShadowedFieldTestRecord'
+    assert record.extra == 'extra'
+
+    with pytest.raises(ValueError):
+        record.hint = 1
+
+    message = SampleShadowedFieldTestMessage()
+    message.hint = 'abc'
+    assert message.record.values == {'hint': 'abc'}
+
+
+class SampleFixedTestRecord(Record):
+    __test__ = False
+    Fields = [
+        structures.Field('byte_field', types.Byte),
+        structures.Field('stock', types.FixedAsciiString(4)),
+        structures.Field('price', types.UnsignedIntBE),
+    ]
+
+
+SAMPLE_FIXED_BYTES = b'\x01AB  \x00\x00\x00\x02'
+
+
+def test__record__from_bytes_lazy__fields_decoded_on_access():
+    len_, record = SampleFixedTestRecord.from_bytes_lazy(SAMPLE_FIXED_BYTES + b'trailing')
+
+    assert len_ == len(SAMPLE_FIXED_BYTES)
+    assert record.is_lazy()
+    assert record.price == 2
+    assert record.is_lazy()
+    assert record.stock == 'AB'
+    assert record.values == {'byte_field': 1, 'stock': 'AB', 'price': 2}
+    assert not record.is_lazy()
+
+
+def test__record__from_bytes_lazy__untouched__encodes_to_original_bytes():
+    payload = b'\x01 AB \x00\x00\x00\x02'  # not left justified, a re-encode would differ
+
+    _, record = SampleFixedTestRecord.from_bytes_lazy(memoryview(payload))
+
+    assert record.stock == 'AB'
+    assert SampleFixedTestRecord.to_bytes(record) == (9, payload)
+
+
+def test__record__from_bytes_lazy__modified__encodes_new_values():
+    _, record = SampleFixedTestRecord.from_bytes_lazy(SAMPLE_FIXED_BYTES)
+
+    record.price = 3
+
+    assert not record.is_lazy()
+    assert record.values == {'byte_field': 1, 'stock': 'AB', 'price': 3}
+    assert SampleFixedTestRecord.to_bytes(record) == (9, b'\x01AB  \x00\x00\x00\x03')
+
+
+def test__record__from_bytes_lazy__equal_to_eager_record():
+    _, lazy = SampleFixedTestRecord.from_bytes_lazy(SAMPLE_FIXED_BYTES)
+    _, eager = SampleFixedTestRecord.from_bytes(SAMPLE_FIXED_BYTES)
+
+    assert lazy == eager
+    assert lazy == SampleFixedTestRecord.from_bytes_lazy(SAMPLE_FIXED_BYTES)[1]
+
+
+@pytest.mark.parametrize('record_cls, bytes_', [
+    (SampleTestRecord, b'\x02\x05\x00\x04\x00test'),
+    (SampleFixedTestRecord, SAMPLE_FIXED_BYTES[:-1]),
+])
+def test__record__from_bytes_lazy__not_fixed_or_short__decoded_right_away(record_cls, bytes_):
+    len_, record = record_cls.from_bytes_lazy(bytes_)
+
+    assert not record.is_lazy()
+    assert (len_, record) == record_cls.from_bytes(bytes_)
+
+
+def test__record__unpack_from__decoded_at_offset_without_slicing():
+    class Inner(RecordWithPresentBit):
+        Fields = [Field('value', UnsignedShortBE)]
+
+    class Outer(Record):
+        Fields = [
+            Field('name', AsciiString),
+            Field('items', Array(Inner)),
+            Field('inner', Inner),
+            Field('shorts', Array(UnsignedShortBE, length_type=Byte)),
+        ]
+
+    record = Outer({
+        'name': 'abc',
+        'items': [Inner({'value': 1}), Inner({'value': 2})],
+        'inner': Inner({'value': 3}),
+        'shorts': [4, 5],
+    })
+    size, bytes_ = Outer.to_bytes(record)
+
+    end, decoded = Outer.unpack_from(memoryview(b'xyz' + bytes_), 3)
+
+    assert end == size + 3
+    assert Record.get_value(decoded) == Record.get_value(record)
+
+
+def test__array__pack_into__same_as_to_bytes():
+    class Inner(RecordWithPresentBit):
+        Fields = [Field('value', UnsignedShortBE), Field('name', AsciiString)]
+
+    for array, items in [
+        (Array(UnsignedIntBE), [1, 2, 3]),
+        (Array(AsciiString), ['a', 'bc']),
+        (Array(Inner), [Inner({'value': 1, 'name': 'x'})]),
+    ]:
+        size, bytes_ = array.to_bytes(items)
+        buffer = bytearray(size + 1)
+
+        assert array.pack_into(buffer, 1, items) == size + 1
+        assert bytes(buffer[1:]) == bytes_
+        assert Record.get_value(array.unpack_from(buffer, 1)[1]) == Record.get_value(items)
+
+
+def test__record_with_present_bit__unpack_from_and_pack_into():
+    class Optional(RecordWithPresentBit):
+        Fields = [Field('value', UnsignedShortBE)]
+
+    buffer = bytearray(5)
+
+    assert Optional.pack_into(buffer, 0, None) == 1
+    assert Optional.pack_into(buffer, 1, Optional({'value': 7})) == 4
+    assert Optional.unpack_from(buffer, 0) == (1, None)
+    assert Optional.unpack_from(buffer, 1)[1].values == {'value': 7}
+
+
+@pytest.mark.parametrize('record_cls, record', [
+    (SampleTestRecord, SampleTestRecord({'byte_field': 2, 'short_field': 5, 'string_field': 'test'})),
+    (SampleTestRecordWithPresentBit, None),
+    (SampleTestArrayOfRecords, SampleTestArrayOfRecords({'records': [
+        SampleTestRecordWithPresentBit({'byte_field': 1, 'short_field': 2, 'string_field': 'ab'}),
+        SampleTestRecordWithPresentBit({'byte_field': 3, 'short_field': 4, 'string_field': ''}),
+    ]})),
+], ids=['record', 'absent', 'array'])
+def test__record__pack_into__same_as_to_bytes(record_cls, record):
+    size, bytes_ = record_cls.to_bytes(record)
+    buffer = bytearray(size + 2)
+
+    assert record_cls.packed_size(record) == size
+    assert record_cls.pack_into(buffer, 2, record) == size + 2
+    assert buffer[2:] == bytes_
+
+
+def test__record__pack_into__compiled_codec_disabled__same_bytes(monkeypatch):
+    record = SampleTestRecord({'byte_field': 2, 'short_field': 5, 'string_field': 'test'})
+    buffer, expected = bytearray(9), bytearray(9)
+    SampleTestRecord.pack_into(expected, 0, record)
+
+    monkeypatch.setattr(Record, 'UseCompiledCodec', False)
+
+    assert SampleTestRecord.packed_size(record) == 9
+    assert SampleTestRecord.pack_into(buffer, 0, record) == 9
+    assert buffer == expected
+
+
+def test__record__pack_into__fixed_layout__size_cached():
+    record = SampleFixedTestRecord({'byte_field': 1, 'stock': 'AB', 'price': 3})
+    buffer = bytearray(SampleFixedTestRecord.CompiledCodec.size)
+
+    assert SampleFixedTestRecord.packed_size(record) == len(buffer)
+    SampleFixedTestRecord.pack_into(buffer, 0, record)
+    assert buffer == SampleFixedTestRecord.to_bytes(record)[1]
+    assert SampleTestRecord.CompiledCodec.size is None
+
+
+def test__record__pack_into__lazy_record__raw_payload_copied():
+    _, bytes_ = SampleFixedTestRecord.to_bytes(SampleFixedTestRecord({'byte_field': 1, 'stock': 'AB', 'price': 3}))
+    _, record = SampleFixedTestRecord.from_bytes_lazy(bytes_)
+    buffer = bytearray(len(bytes_))
+
+    assert SampleFixedTestRecord.packed_size(record) == len(bytes_)
+    SampleFixedTestRecord.pack_into(buffer, 0, record)
+    assert buffer == bytes_
+    assert record.is_lazy()
+
+
+def test__record__pack_into__buffer_too_short__raises():
+    import struct
+    record = SampleTestRecord({'byte_field': 2, 'short_field': 5, 'string_field': 'test'})
+    buffer = bytearray(5)
+
+    with pytest.raises(struct.error):
+        SampleTestRecord.pack_into(buffer, 0, record)
+    assert len(buffer) == 5
@@ -248,4 +248,101 @@ def test__non_ascii_string__all_methods():
     assert non_ascii_string_with_len_5.to_str('ßßßßß') == 'ßßßßß'
     assert non_ascii_string_with_len_5.from_str('ßßßßß') == 'ßßßßß'
     assert non_ascii_string_with_len_5.to_bytes('ßßßßß') == (5, b'\xdf' * 5)
-    assert non_ascii_string_with_len_5.from_bytes(b'\xdf' * 5) == (5, 'ßßßßß')
\ No newline at end of file
+    assert non_ascii_string_with_len_5.from_bytes(b'\xdf' * 5) == (5, 'ßßßßß')
+
+
+def test__string_types__from_memoryview__decoded_without_copy():
+    data = memoryview(b'\x05\x00abcdeX')
+
+    assert types.AsciiString.from_bytes(data) == (7, 'abcde')
+    assert types.Iso8859String.from_bytes(data) == (7, 'abcde')
+    assert types.CharAscii.from_bytes(data[7:]) == (1, 'X')
+    assert types.CharIso8599.from_bytes(data[7:]) == (1, 'X')
+    assert types.FixedAsciiString(length=5).from_bytes(data[2:]) == (5, 'abcde')
+    assert types.FixedIsoString(length=5).from_bytes(data[2:]) == (5, 'abcde')
+
+
+@pytest.mark.parametrize('type_', INT_TYPES + [types.Byte])
+def test__int_types__unpack_from__same_as_from_bytes(type_):
+    size, bytes_ = type_.to_bytes(123)
+    buffer = memoryview(b'xx' + bytes_ + b'yy')
+
+    assert type_.unpack_from(buffer, 2) == (2 + size, 123)
+    assert type_.unpack_from(bytes_) == type_.from_bytes(bytes_)
+
+
+@pytest.mark.parametrize('type_', INT_TYPES + [types.Byte])
+def test__int_types__pack_into__same_as_to_bytes(type_):
+    size, bytes_ = type_.to_bytes(123)
+    buffer = bytearray(size + 3)
+
+    assert type_.pack_into(buffer, 1, 123) == 1 + size
+    assert buffer == b'\x00' + bytes_ + b'\x00\x00'
+
+
+@pytest.mark.parametrize('type_', [types.Int, types.AsciiString, types.FixedAsciiString(length=4)])
+def test__types__unpack_from__short_buffer__raises(type_):
+    import struct
+
+    with pytest.raises(struct.error):
+        type_.unpack_from(b'\x05\x00ab', 1)
+
+
+@pytest.mark.parametrize('type_, value', [
+    (types.Int, 1),
+    (types.AsciiString, 'abc'),
+    (types.FixedAsciiString(length=4), 'abc'),
+    (types.FixedAsciiString(length=2), 'abc'),
+])
+def test__types__pack_into__value_does_not_fit__raises(type_, value):
+    import struct
+    buffer = bytearray(4)
+
+    with pytest.raises(struct.error):
+        type_.pack_into(buffer, 2, value)
+    assert len(buffer) == 4
+
+
+def test__boolean_and_char__unpack_from__pack_into():
+    buffer = bytearray(4)
+
+    assert types.Boolean.pack_into(buffer, 0, True) == 1
+    assert types.CharAscii.pack_into(buffer, 1, 'X') == 2
+    assert types.CharIso8599.pack_into(buffer, 2, 'ß') == 3
+    assert buffer == b'\x01X\xdf\x00'
+    assert types.Boolean.unpack_from(memoryview(buffer), 0) == (1, True)
+    assert types.Boolean.unpack_from(memoryview(buffer), 3) == (4, False)
+    assert types.CharAscii.unpack_from(memoryview(buffer), 1) == (2, 'X')
+    assert types.CharIso8599.unpack_from(memoryview(buffer), 2) == (3, 'ß')
+
+
+def test__string_types__unpack_from__pack_into():
+    buffer = bytearray(18)
+
+    offset = types.AsciiString.pack_into(buffer, 0, 'abc')
+    offset = types.Iso8859String.pack_into(buffer, offset, 'ß')
+    offset = types.FixedAsciiString(length=5, right_justified=True).pack_into(buffer, offset, 'ab')
+    offset = types.FixedIsoString(length=5).pack_into(buffer, offset, 'ß')
+
+    assert offset == 18
+    assert buffer == b'\x03\x00abc' + b'\x01\x00\xdf' + b'   ab' + b'\xdf    '
+    view = memoryview(buffer)
+    assert types.AsciiString.unpack_from(view, 0) == (5, 'abc')
+    assert types.Iso8859String.unpack_from(view, 5) == (8, 'ß')
+    assert types.FixedAsciiString(length=5).unpack_from(view, 8) == (13, 'ab')
+    assert types.FixedIsoString(length=5).unpack_from(view, 13) == (18, 'ß')
+
+
+def test__resolve_unpack_from__legacy_codec__adapted():
+    from nasdaq_protocols.common.message.types import resolve_unpack_from, resolve_pack_into
+
+    class Price(types.UnsignedIntBE):
+        to_bytes = staticmethod(lambda x: types.UnsignedIntBE.to_bytes(int(x * 100)))
+        from_bytes = staticmethod(lambda x: (4, types.UnsignedIntBE.from_bytes(x)[1] / 100))
+
+    buffer = bytearray(6)
+
+    assert resolve_pack_into(Price)(buffer, 2, 1.5) == 6
+    assert resolve_unpack_from(Price)(buffer, 2) == (6, 1.5)
+    assert resolve_unpack_from(types.UnsignedIntBE) is types.UnsignedIntBE.unpack_from
+    assert resolve_pack_into(types.UnsignedIntBE) is types.UnsignedIntBE.pack_into
@@ -30,6 +30,209 @@ async def test__dispatchablemessagequeue__no_active_dispatcher__able_to_put_and_
     assert q.get_nowait() == 'test'
 
 
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__put_batch__all_entries_queued_in_order(receiver: asyncio.Queue):
+    q = common.DispatchableMessageQueue(session_id='test')
+    await q.put_batch(['test1', 'test2', 'test3'])
+
+    assert len(q) == 3
+    assert [await q.get() for _ in range(3)] == ['test1', 'test2', 'test3']
+
+    q.start_dispatching(receiver.put)
+    await q.put_batch(['test4', 'test5'])
+    assert await receiver.get() == 'test4'
+    assert await receiver.get() == 'test5'
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__watermarks__callbacks_invoked_once_per_crossing():
+    events = []
+    q = common.DispatchableMessageQueue(
+        session_id='test',
+        high_watermark=3,
+        low_watermark=1,
+        on_high_watermark=lambda: events.append('high'),
+        on_low_watermark=lambda: events.append('low')
+    )
+
+    await q.put('test1')
+    await q.put('test2')
+    assert events == []
+
+    await q.put('test3')
+    q.put_nowait('test4')
+    assert events == ['high']
+
+    assert await q.get() == 'test1'
+    assert q.get_nowait() == 'test2'
+    assert events == ['high']
+
+    assert q.get_nowait() == 'test3'
+    assert events == ['high', 'low']
+
+    await q.put_batch(['test5', 'test6'])
+    assert events == ['high', 'low', 'high']
+    assert q.high_watermark_crossings == 2
+    assert q.low_watermark_crossings == 1
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__watermarks__dispatcher_drains_below_low_watermark(receiver: asyncio.Queue):
+    events = []
+    q = common.DispatchableMessageQueue(
+        session_id='test',
+        high_watermark=4,
+        on_high_watermark=lambda: events.append('high'),
+        on_low_watermark=lambda: events.append('low')
+    )
+    assert q.low_watermark == 2
+
+    await q.put_batch([f'test{i}' for i in range(5)])
+    assert events == ['high']
+
+    q.start_dispatching(receiver.put)
+    for i in range(5):
+        assert await receiver.get() == f'test{i}'
+    assert events == ['high', 'low']
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__watermarks__messages_buffered_while_draining_counted():
+    events = []
+    q = common.DispatchableMessageQueue(
+        session_id='test',
+        high_watermark=3,
+        low_watermark=1,
+        on_high_watermark=lambda: events.append('high'),
+        on_low_watermark=lambda: events.append('low')
+    )
+
+    async with q.buffer_until_drained():
+        await q.put('test1')
+        await q.put('test2')
+        assert events == []
+        q.put_nowait('test3')
+        assert events == ['high']
+
+    assert q.get_nowait() == 'test1'
+    assert events == ['high']
+    assert q.get_nowait() == 'test2'
+    assert events == ['high', 'low']
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__sync_handler__message_delivered_inline():
+    received = []
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=received.append)
+
+    await q.put('test1')
+    assert received == ['test1']
+
+    await q.put_batch(['test2', 'test3'])
+    assert received == ['test1', 'test2', 'test3']
+    assert len(q) == 0
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__sync_handler__backlog_dispatched_before_new_messages():
+    received = []
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=received.append)
+
+    q.put_nowait('test1')
+    q.put_nowait('test2')
+    await q.put('test3')
+    assert received == []
+
+    while len(received) < 3:
+        await asyncio.sleep(0)
+    assert received == ['test1', 'test2', 'test3']
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__sync_handler__paused_dispatching_queues_messages():
+    received = []
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=received.append)
+
+    async with q.pause_dispatching():
+        await q.put('test1')
+        assert received == []
+        assert len(q) == 1
+
+    while not received:
+        await asyncio.sleep(0)
+    assert received == ['test1']
+
+    await q.put('test2')
+    assert received == ['test1', 'test2']
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__sync_handler__exception_does_not_stop_dispatching():
+    received = []
+
+    def handler(msg):
+        if msg == 'bad':
+            raise ValueError(msg)
+        received.append(msg)
+
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=handler)
+    await q.put('bad')
+    await q.put('test1')
+    assert received == ['test1']
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__function_returning_coroutine__awaited_by_dispatcher():
+    received = []
+
+    async def slow_handler(msg):
+        await asyncio.sleep(0.01)
+        received.append((msg, asyncio.current_task().get_name()))
+
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=lambda msg: slow_handler(msg))
+
+    await q.put('test1')
+    await q.put_batch(['test2', 'test3'])
+    q.dispatch_nowait('test4')
+    assert received == []
+
+    await asyncio.wait_for(q.join(), 1)
+    assert received == [(f'test{i}', 'test-dispatcher') for i in range(1, 5)]
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__sync_handler__dispatch_nowait_delivered_inline():
+    received = []
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=received.append)
+
+    q.dispatch_nowait('test1')
+    assert received == ['test1']
+
+    async with q.pause_dispatching():
+        q.dispatch_nowait('test2')
+        assert received == ['test1']
+        assert len(q) == 1
+
+    await asyncio.wait_for(q.join(), 1)
+    assert received == ['test1', 'test2']
+
+    await q.stop()
+
+
 @pytest.mark.asyncio
 async def test__dispatchablemessagequeue__when_queue_is_empty__get_nowait_returns_none():
     q = common.DispatchableMessageQueue(session_id='test')
@@ -298,3 +501,56 @@ async def test__dispatchablemessagequeue__continious_message_puts_while_bufferin
     LOG.info('Final Produced: %d, Consumed: %d', produced_messages.qsize(), consumed_messages.qsize())
     LOG.info('Test completed in %.2f seconds', time.monotonic() - start_time)
 
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__on_dispatched__called_after_handler():
+    events = []
+
+    async def handler(msg):
+        events.append(('handled', msg))
+        if msg == 'bad':
+            raise ValueError(msg)
+
+    q = common.DispatchableMessageQueue(
+        session_id='test', on_msg_coro=handler, on_dispatched=lambda msg: events.append(('dispatched', msg))
+    )
+    await q.put_batch(['test1', 'bad'])
+
+    while len(events) < 4:
+        await asyncio.sleep(0)
+    assert events == [('handled', 'test1'), ('dispatched', 'test1'), ('handled', 'bad'), ('dispatched', 'bad')]
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__join__waits_until_all_messages_handled():
+    handled = []
+
+    async def handler(msg):
+        await asyncio.sleep(0.01)
+        handled.append(msg)
+
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=handler)
+    await q.put_batch(['test1', 'test2', 'test3'])
+
+    await asyncio.wait_for(q.join(), 1)
+    assert handled == ['test1', 'test2', 'test3']
+
+    await q.stop()
+
+
+@pytest.mark.asyncio
+async def test__dispatchablemessagequeue__queue_stopped_while_joining__join_returns():
+    async def handler(_msg):
+        await asyncio.sleep(10)
+
+    q = common.DispatchableMessageQueue(session_id='test', on_msg_coro=handler)
+    await q.put('test1')
+    join = asyncio.create_task(q.join())
+    await asyncio.sleep(0.01)
+    assert not join.done()
+
+    await q.stop()
+    await asyncio.wait_for(join, 1)
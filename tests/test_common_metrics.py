@@ -0,0 +1,118 @@
+import asyncio
+import gc
+
+from nasdaq_protocols import common, itch, soup
+
+
+def test__histogram__record__counted_in_bucket():
+    histogram = common.Histogram(bounds_ns=(1_000, 1_000_000))
+
+    histogram.record(500)
+    histogram.record(1_000)
+    histogram.record(2_000, count=3)
+    histogram.record(5_000_000)
+
+    assert histogram.count == 6
+    assert histogram.sum_ns == 500 + 1_000 + 6_000 + 5_000_000
+    assert histogram.buckets() == [(1e-06, 2), (0.001, 5), (float('inf'), 6)]
+
+
+def test__sessionmetrics__snapshot__contains_all_counters():
+    metrics = common.SessionMetrics('test')
+    metrics.bytes_in = 10
+    metrics.decode_time.record(100)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot['session_id'] == 'test'
+    assert snapshot['layer'] == 'transport'
+    assert snapshot['bytes_in'] == 10
+    assert snapshot['decode_time']['count'] == 1
+    assert set(snapshot) == {
+        'session_id', 'layer', 'bytes_in', 'bytes_out', 'frames_decoded', 'decode_time', 'dispatch_latency',
+        'queue_depth_high_water', 'queue_high_watermark_crossings', 'queue_low_watermark_crossings',
+        'heartbeats_sent', 'heartbeats_received', 'heartbeats_missed', 'sequence_gaps'
+    }
+
+
+def test__metricsregistry__metrics_dropped_with_owner():
+    registry = common.MetricsRegistry()
+    metrics = registry.register(common.SessionMetrics('test'))
+    assert len(registry) == 1
+
+    del metrics
+    gc.collect()
+    assert len(registry) == 0
+
+
+def test__metricsregistry__to_prometheus__text_format():
+    registry = common.MetricsRegistry(prefix='test')
+    metrics = registry.register(common.SessionMetrics('session-"1"'))
+    metrics.bytes_in = 42
+    metrics.queue_depth_high_water = 7
+    metrics.decode_time.record(1_500)
+
+    text = registry.to_prometheus()
+
+    assert '# TYPE test_bytes_in_total counter\n' in text
+    assert 'test_bytes_in_total{session="session-\\"1\\"",layer="transport"} 42\n' in text
+    assert '# TYPE test_queue_depth_high_water gauge\n' in text
+    assert 'test_queue_depth_high_water{session="session-\\"1\\"",layer="transport"} 7\n' in text
+    assert '# TYPE test_decode_time histogram\n' in text
+    assert 'test_decode_time_bucket{session="session-\\"1\\"",layer="transport",le="1e-06"} 0\n' in text
+    assert 'test_decode_time_bucket{session="session-\\"1\\"",layer="transport",le="2.5e-06"} 1\n' in text
+    assert 'test_decode_time_bucket{session="session-\\"1\\"",layer="transport",le="+Inf"} 1\n' in text
+    assert 'test_decode_time_count{session="session-\\"1\\"",layer="transport"} 1\n' in text
+
+
+async def http_get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+async def test__metricsexporter__serves_registry():
+    registry = common.MetricsRegistry()
+    metrics = registry.register(common.SessionMetrics('test'))
+    metrics.frames_decoded = 3
+    exporter = await common.MetricsExporter(registry=registry).start()
+
+    response = await asyncio.wait_for(http_get(exporter.port, '/metrics'), 1)
+    assert response.startswith(b'HTTP/1.0 200 OK\r\n')
+    assert b'nasdaq_protocols_frames_decoded_total{session="test",layer="transport"} 3\n' in response
+
+    response = await asyncio.wait_for(http_get(exporter.port, '/'), 1)
+    assert response.startswith(b'HTTP/1.0 404 Not Found\r\n')
+
+    await exporter.stop()
+    assert exporter.is_stopped()
+
+
+async def test__dispatchablemessagequeue__metrics__depth_and_dispatch_recorded():
+    q = common.DispatchableMessageQueue(session_id='test')
+    await q.put_batch(['test1', 'test2', 'test3'])
+    assert q.metrics.queue_depth_high_water == 3
+
+    received = []
+    q.start_dispatching(received.append)
+    while len(received) < 3:
+        await asyncio.sleep(0)
+    assert q.metrics.dispatch_latency.count == 3
+
+    await q.stop()
+
+
+async def test__soup_app_session__closed__metrics_unregistered():
+    server = await soup.SoupServer().start()
+    session = await itch.connect_async(('127.0.0.1', server.port), 'test-u', 'test-p', '')
+    label = str(session.soup_session.session_id)
+
+    layers = sorted(snapshot['layer'] for snapshot in common.REGISTRY.snapshot() if snapshot['session_id'] == label)
+    assert layers == ['application', 'transport']
+
+    await session.close()
+    assert [snapshot for snapshot in common.REGISTRY.snapshot() if snapshot['session_id'] == label] == []
+
+    await server.stop()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+
+import pytest
+
+from nasdaq_protocols import common, soup
+from tests.mocks import matches, send
+
+
+class RecordingTracer(common.Tracer):
+    def __init__(self):
+        self.events = []
+
+    def data_received(self, session_id, data):
+        self.events.append(('data_received', bytes(data)))
+
+    def message_decoded(self, session_id, msg):
+        self.events.append(('message_decoded', msg))
+
+    def message_dispatched(self, session_id, msg):
+        self.events.append(('message_dispatched', msg))
+
+    def data_sent(self, session_id, data):
+        self.events.append(('data_sent', bytes(data)))
+
+    def heartbeat(self, session_id, monitor, event):
+        self.events.append(('heartbeat', monitor, event))
+
+    def of_kind(self, kind):
+        return [event[1:] for event in self.events if event[0] == kind]
+
+
+@pytest.fixture(scope='function')
+def tracer():
+    tracer_ = RecordingTracer()
+    previous = common.set_tracer(tracer_)
+    yield tracer_
+    common.set_tracer(previous)
+
+
+def test__tracing__set_tracer__returns_previous_tracer():
+    tracer_ = common.Tracer()
+    assert common.get_tracer() is None
+
+    assert common.set_tracer(tracer_) is None
+    assert common.get_tracer() is tracer_
+    assert common.set_tracer(None) is tracer_
+    assert common.get_tracer() is None
+
+
+async def test__tracing__soup_session__traffic_traced(mock_server_session, tracer):
+    port, server_session = mock_server_session
+    server_session.when(
+        matches(soup.LoginRequest('test-u', 'test-p', 'session', '1')), 'login-request-match',
+    ).do(
+        send(soup.LoginAccepted('session', 1)), 'login-accepted'
+    )
+    server_session.when(
+        matches(soup.UnSequencedData(b'ping')), 'ping-match'
+    ).do(
+        send(soup.SequencedData(b'pong')), 'pong'
+    )
+
+    received = asyncio.Queue()
+    session = await soup.connect_async(('127.0.0.1', port), 'test-u', 'test-p', 'session',
+                                       on_msg_coro=received.put)
+    session.send_unseq_data(b'ping')
+    assert await asyncio.wait_for(received.get(), 1) == soup.SequencedData(b'pong')
+    await session.close()
+
+    login_request = soup.LoginRequest('test-u', 'test-p', 'session', '1').to_bytes()[1]
+    assert (login_request,) in tracer.of_kind('data_sent')
+    assert (soup.UnSequencedData(b'ping').to_bytes()[1],) in tracer.of_kind('data_sent')
+    assert b''.join(data for data, in tracer.of_kind('data_received')).endswith(
+        soup.SequencedData(b'pong').to_bytes()[1]
+    )
+    assert (soup.LoginAccepted('session', 1),) in tracer.of_kind('message_decoded')
+    assert (soup.SequencedData(b'pong'),) in tracer.of_kind('message_decoded')
+    assert (soup.SequencedData(b'pong'),) in tracer.of_kind('message_dispatched')
+
+
+async def test__tracing__heartbeat_monitor__checks_traced(tracer):
+    tripped = asyncio.Event()
+
+    async def on_no_activity():
+        tripped.set()
+
+    common.HeartbeatMonitor('test', 0.01, on_no_activity, name='hb', tolerate_missed_heartbeats=2)
+    await asyncio.wait_for(tripped.wait(), 1)
+
+    assert tracer.of_kind('heartbeat') == [('hb', 'pinged'), ('hb', 'missed'), ('hb', 'missed'), ('hb', 'tripped')]
+
+
+async def test__tracing__logging_tracer__events_logged(caplog):
+    caplog.set_level(logging.DEBUG, logger='LoggingTracer')
+    tracer_ = common.LoggingTracer()
+
+    tracer_.data_received('test', memoryview(b'abc'))
+    tracer_.message_decoded('test', 'msg')
+    tracer_.heartbeat('test', 'hb', 'missed')
+
+    assert "test> received b'abc'" in caplog.text
+    assert 'test> decoded message msg' in caplog.text
+    assert 'test> hb missed' in caplog.text
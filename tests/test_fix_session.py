@@ -2,7 +2,7 @@ import asyncio
 
 import pytest
 
-from nasdaq_protocols.common import stop_task
+from nasdaq_protocols.common import stop_task, buffered_session
 from nasdaq_protocols.fix.session import (
     Fix44Session,
     Fix50Session
@@ -39,7 +39,9 @@ def if_heartbeat():
     return matcher
 
 
-@pytest.mark.parametrize('session_factory', [Fix44Session, Fix50Session])
+@pytest.mark.parametrize('session_factory', [
+    Fix44Session, Fix50Session, buffered_session(Fix44Session), buffered_session(Fix50Session)
+])
 async def test__fix_session__login_successful(mock_server_session, session_factory):
     port, server_session = mock_server_session
 
@@ -1,3 +1,5 @@
+import pytest
+
 from nasdaq_protocols.common import *
 from nasdaq_protocols import itch
 
@@ -89,3 +91,103 @@ def test__from_bytes__same_identifier_different_apps__returns_correct_message():
 
     decoded_app_2_msg = App2ItchMessage.from_bytes(app2_msg.to_bytes()[1])
     assert decoded_app_2_msg[1] == app2_msg
+
+
+def test__from_bytes__memoryview_payload__returns_correct_message():
+    for msg in [TestItchApp1Message1.get(123456789), TestItchApp1Message2.get('AB')]:
+        payload = memoryview(b'\x00' + msg.to_bytes()[1])[1:]
+
+        assert App1ItchMessage.from_bytes(payload)[1] == msg
+
+
+class TestItchApp1LazyMessage(App1ItchMessage, indicator=3, direction='outgoing'):
+    __test__ = False
+    LazyDecoding = True
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('stockLocate', UnsignedShortBE),
+            Field('orderRef', UnsignedLongBE),
+            Field('stock', FixedAsciiString(8)),
+        ]
+
+
+def test__from_bytes__lazy_decoding__fields_decoded_on_access():
+    msg = TestItchApp1LazyMessage()
+    msg.stockLocate = 7
+    msg.orderRef = 123456789
+    msg.stock = 'AAPL'
+    bytes_ = msg.to_bytes()[1]
+
+    len_, decoded = App1ItchMessage.from_bytes(bytes_)
+
+    assert len_ == len(bytes_)
+    assert decoded.record.is_lazy()
+    assert decoded.orderRef == 123456789
+    assert decoded.record.is_lazy()
+    assert decoded.to_bytes()[1] == bytes_
+    assert decoded == msg
+
+
+class TestItchApp1IncomingMessage(App1ItchMessage, indicator=1, direction='incoming'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('shares', UnsignedIntBE),
+        ]
+
+
+@logable
+class IncomingItchMessage(App1ItchMessage, indicator=None):
+    DecodeDirection = 'incoming'
+
+
+@logable
+class SkippingItchMessage(App1ItchMessage, indicator=None):
+    UnknownMsgIdPolicy = UnknownMessagePolicy.SKIP
+
+
+def test__dispatch_table__indexed_by_indicator_per_direction():
+    outgoing = App1ItchMessage.dispatch_table()
+    incoming = IncomingItchMessage.dispatch_table()
+
+    assert len(outgoing) == len(incoming) == 256
+    assert outgoing[1] == TestItchApp1Message1.decode_body
+    assert outgoing[2] == TestItchApp1Message2.decode_body
+    assert incoming[1] == TestItchApp1IncomingMessage.decode_body
+    assert outgoing[0] is None and incoming[2] is None
+
+
+def test__from_bytes__decode_direction__incoming_message_decoded():
+    msg = TestItchApp1IncomingMessage()
+    msg.shares = 100
+
+    assert IncomingItchMessage.from_bytes(msg.to_bytes()[1]) == (5, msg)
+
+
+def test__from_bytes__unknown_indicator__raises():
+    with pytest.raises(UnknownMessageException) as exc_info:
+        App1ItchMessage.from_bytes(b'\xffdata')
+
+    assert isinstance(exc_info.value, KeyError)
+    assert exc_info.value.msg_id == itch.Message.MsgIdClass(255)
+
+
+def test__from_bytes__unknown_indicator_skip_policy__skipped():
+    assert SkippingItchMessage.from_bytes(b'\xffdata') == (5, None)
+    assert SkippingItchMessage.from_bytes(TestItchApp1Message1.get(1).to_bytes()[1])[1] == TestItchApp1Message1.get(1)
+
+
+def test__dispatch_table__message_defined_later__table_rebuilt():
+    assert App2ItchMessage.dispatch_table()[9] is None
+
+    class TestItchApp2LateMessage(App2ItchMessage, indicator=9, direction='outgoing'):
+        class BodyRecord(Record):
+            Fields = [
+                Field('orderToken', CharAscii),
+            ]
+
+    msg = TestItchApp2LateMessage()
+    msg.orderToken = 'X'
+    assert App2ItchMessage.from_bytes(msg.to_bytes()[1])[1] == msg
@@ -1,7 +1,9 @@
+import asyncio
+
 from nasdaq_protocols.common import *
-from nasdaq_protocols import itch
+from nasdaq_protocols import itch, soup
 
-from .soup_client_app_tests import soup_clientapp_common_tests
+from .soup_client_app_tests import soup_clientapp_common_tests, connect_to_soup_server, sequenced
 
 
 class TestOrderBookMessage(itch.Message, indicator=1, direction='outgoing'):
@@ -25,4 +27,92 @@ async def test__soup_clientapp_common_tests__all_basic_tests_pass(soup_clientapp
         itch.connect_async,
         itch.ClientSession,
         TestOrderBookMessage.get,
-    )
\ No newline at end of file
+    )
+
+
+async def test__itch_session__message_pool__messages_released_after_dispatch(mock_server_session):
+    port, server_session = mock_server_session
+    pool = MessagePool(itch.Message)
+    received = []
+
+    def on_msg(msg):
+        received.append((msg.orderToken, msg.orderBookId, id(msg)))
+
+    client_session = await connect_to_soup_server(
+        port, server_session, itch.connect_async,
+        session_factory=lambda x: itch.ClientSession(x, on_msg_coro=on_msg, message_pool=pool)
+    )
+    for i in range(3):
+        server_session.send(sequenced(TestOrderBookMessage.get(i)))
+    while len(received) < 3:
+        await asyncio.sleep(0.01)
+
+    assert [(token, book) for token, book, _ in received] == [(0, 0), (1, 1), (2, 2)]
+    assert len({msg_id for _, _, msg_id in received}) == 1
+    assert (pool.created, pool.reused, len(pool)) == (1, 2, 1)
+
+    await client_session.close()
+
+
+async def test__itch_session__sync_handler__called_from_reader(mock_server_session):
+    port, server_session = mock_server_session
+    tasks = []
+
+    def on_msg(msg):
+        tasks.append((msg.orderToken, asyncio.current_task().get_name()))
+
+    client_session = await connect_to_soup_server(
+        port, server_session, itch.connect_async,
+        session_factory=lambda x: itch.ClientSession(x, on_msg_coro=on_msg)
+    )
+    for i in range(3):
+        server_session.send(sequenced(TestOrderBookMessage.get(i)))
+    while len(tasks) < 3:
+        await asyncio.sleep(0.01)
+
+    assert [token for token, _ in tasks] == [0, 1, 2]
+    assert all(name.startswith('reader:') for _, name in tasks), tasks
+
+    await client_session.close()
+
+
+async def test__itch_session__flyweight_pool_async_handler__every_message_received(mock_server_session):
+    port, server_session = mock_server_session
+    pool = MessagePool(itch.Message, flyweight=True)
+    received = []
+
+    async def on_msg(msg):
+        await asyncio.sleep(0)
+        received.append(msg.orderToken)
+
+    client_session = await connect_to_soup_server(
+        port, server_session, itch.connect_async,
+        session_factory=lambda x: itch.ClientSession(x, on_msg_coro=on_msg, message_pool=pool)
+    )
+    for i in range(5):
+        server_session.send(sequenced(TestOrderBookMessage.get(i)))
+    while len(received) < 5:
+        await asyncio.sleep(0.01)
+
+    assert received == [0, 1, 2, 3, 4]
+
+    await client_session.close()
+
+
+async def test__itch_session__unknown_message_skip_policy__message_not_dispatched(mock_server_session, monkeypatch):
+    monkeypatch.setattr(itch.Message, 'UnknownMsgIdPolicy', UnknownMessagePolicy.SKIP)
+    port, server_session = mock_server_session
+    received = []
+
+    client_session = await connect_to_soup_server(
+        port, server_session, itch.connect_async,
+        session_factory=lambda x: itch.ClientSession(x, on_msg_coro=received.append)
+    )
+    server_session.send(soup.SequencedData(b'\xffunknown'))
+    server_session.send(sequenced(TestOrderBookMessage.get(1)))
+    while not received:
+        await asyncio.sleep(0.01)
+
+    assert received == [TestOrderBookMessage.get(1)]
+
+    await client_session.close()
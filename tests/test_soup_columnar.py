@@ -0,0 +1,232 @@
+import pytest
+
+from nasdaq_protocols.common import *
+from nasdaq_protocols import itch, soup
+
+numpy = pytest.importorskip('numpy')
+
+
+class ColumnarTestMessage(itch.Message, app_name='columnar_test'):
+    def __init_subclass__(cls, **kwargs):
+        kwargs['app_name'] = 'columnar_test'
+        super().__init_subclass__(**kwargs)
+
+
+class ColumnarAddOrder(ColumnarTestMessage, indicator=65, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('stockLocate', UnsignedShortBE),
+            Field('orderRef', UnsignedLongBE),
+            Field('side', CharAscii),
+            Field('stock', FixedAsciiString(8)),
+            Field('price', UnsignedIntBE),
+            Field('printable', Boolean),
+        ]
+
+
+class ColumnarDelete(ColumnarTestMessage, indicator=68, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('orderRef', UnsignedLongBE),
+        ]
+
+
+class ColumnarText(ColumnarTestMessage, indicator=84, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('text', AsciiString),
+        ]
+
+
+class ColumnarIncoming(ColumnarTestMessage, indicator=65, direction='incoming'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('byte', Byte),
+        ]
+
+
+def add_order(order_ref, price, side='B', stock='AAPL'):
+    msg = ColumnarAddOrder()
+    msg.stockLocate = 1
+    msg.orderRef = order_ref
+    msg.side = side
+    msg.stock = stock
+    msg.price = price
+    msg.printable = True
+    return msg
+
+
+def delete(order_ref):
+    msg = ColumnarDelete()
+    msg.orderRef = order_ref
+    return msg
+
+
+def text(value):
+    msg = ColumnarText()
+    msg.text = value
+    return msg
+
+
+def sequenced(msg):
+    return soup.SequencedData(msg.to_bytes()[1]).to_bytes()[1]
+
+
+def test__record_dtype__fixed_layout__dtype_matches_wire_format():
+    dtype = soup.record_dtype(ColumnarAddOrder.BodyRecord)
+
+    assert dtype.itemsize == ColumnarAddOrder.BodyRecord.Codec.size
+    assert dtype['stockLocate'] == numpy.dtype('>u2')
+    assert dtype['orderRef'] == numpy.dtype('>u8')
+    assert dtype['side'] == numpy.dtype('S1')
+    assert dtype['stock'] == numpy.dtype('S8')
+    assert dtype['printable'] == numpy.dtype('?')
+
+
+def test__record_dtype__variable_layout__raises():
+    with pytest.raises(ValueError):
+        soup.record_dtype(ColumnarText.BodyRecord)
+
+
+def test__columnar_decoder__decode_frames__one_array_per_message_type():
+    stream = b''.join([
+        sequenced(add_order(1, 100)),
+        soup.ServerHeartbeat().to_bytes()[1],
+        sequenced(delete(1)),
+        sequenced(add_order(2, 200, side='S', stock='MSFT')),
+        sequenced(text('not fixed')),
+        soup.SequencedData(b'\x01unknown').to_bytes()[1],
+        sequenced(add_order(3, 300))[:-2],  # truncated
+    ])
+
+    batch = soup.ColumnarDecoder(ColumnarTestMessage).decode_frames(stream)
+
+    add_orders = batch.arrays[ColumnarAddOrder]
+    assert add_orders['orderRef'].tolist() == [1, 2]
+    assert add_orders['price'].tolist() == [100, 200]
+    assert add_orders['side'].tolist() == [b'B', b'S']
+    assert add_orders['stock'].tolist() == [b'AAPL    ', b'MSFT    ']
+    assert add_orders['printable'].tolist() == [True, True]
+    assert batch.arrays[ColumnarDelete]['orderRef'].tolist() == [1]
+    assert ColumnarText not in batch.arrays
+    assert ColumnarIncoming not in batch.arrays
+    assert batch.skipped == 2
+    assert len(batch) == 3
+
+
+def test__columnar_decoder__decode_payloads__columns():
+    payloads = [
+        add_order(1, 100).to_bytes()[1],
+        soup.SequencedData(delete(5).to_bytes()[1]),
+        memoryview(add_order(2, 200).to_bytes()[1]),
+    ]
+
+    batch = soup.ColumnarDecoder(ColumnarTestMessage).decode_payloads(payloads)
+    columns = batch.columns(ColumnarAddOrder)
+
+    assert list(columns) == [field.name for field in ColumnarAddOrder.BodyRecord.Fields]
+    assert columns['orderRef'].tolist() == [1, 2]
+    assert batch.columns(ColumnarDelete)['orderRef'].tolist() == [5]
+    assert batch.skipped == 0
+
+
+def test__columnar_decoder__empty__no_arrays():
+    batch = soup.ColumnarDecoder(ColumnarTestMessage).decode_payloads([])
+
+    assert batch.arrays == {}
+    assert len(batch) == 0
+
+
+class ColumnarEnterOrder(ColumnarTestMessage, indicator=79, direction='incoming'):
+    __test__ = False
+
+    class BodyRecord(Record):
+        Fields = [
+            Field('orderToken', FixedAsciiString(14)),
+            Field('side', CharAscii),
+            Field('shares', UnsignedIntBE),
+            Field('stock', FixedAsciiString(8, right_justified=True)),
+            Field('price', UnsignedIntBE),
+            Field('timeInForce', UnsignedIntBE, default_value=99999),
+        ]
+
+
+def enter_order(token, shares, price, side='B', stock='AAPL'):
+    msg = ColumnarEnterOrder()
+    msg.orderToken = token
+    msg.side = side
+    msg.shares = shares
+    msg.stock = stock
+    msg.price = price
+    return msg
+
+
+def test__columnar_encoder__columns__encoded_as_messages():
+    columns = {
+        'orderToken': ['token-1', 'token-2'],
+        'side': 'S',
+        'shares': numpy.array([10, 20]),
+        'stock': [b'AAPL', b'MSFT'],
+        'price': [1000, 2000],
+    }
+
+    encoded = soup.ColumnarEncoder(ColumnarEnterOrder).encode(columns)
+
+    assert encoded == b''.join([
+        enter_order('token-1', 10, 1000, side='S').to_bytes()[1],
+        enter_order('token-2', 20, 2000, side='S', stock='MSFT').to_bytes()[1],
+    ])
+
+
+def test__columnar_encoder__structured_array__unsequenced_framing():
+    encoder = soup.ColumnarEncoder(ColumnarEnterOrder)
+    orders = numpy.zeros(2, dtype=encoder.dtype)
+    orders['orderToken'] = [b'token-1', b'token-2']
+    orders['side'] = b'B'
+    orders['shares'] = [10, 20]
+    orders['stock'] = b'AAPL'
+    orders['price'] = [1000, 2000]
+    orders['timeInForce'] = 99999
+
+    encoded = encoder.encode(orders, unsequenced=True)
+
+    assert encoded == b''.join([
+        soup.UnSequencedData(enter_order('token-1', 10, 1000).to_bytes()[1]).to_bytes()[1],
+        soup.UnSequencedData(enter_order('token-2', 20, 2000).to_bytes()[1]).to_bytes()[1],
+    ])
+
+
+def test__columnar_encoder__messages_decoded_back():
+    encoded = soup.ColumnarEncoder(ColumnarAddOrder).encode(
+        {'stockLocate': 1, 'orderRef': range(5), 'price': 100, 'side': 'B', 'stock': 'AAPL', 'printable': True}
+    )
+
+    size = len(encoded) // 5
+    for i in range(5):
+        assert ColumnarTestMessage.from_bytes(encoded[i * size:])[1] == add_order(i, 100)
+
+
+def test__columnar_encoder__scalars_only__count_required():
+    encoder = soup.ColumnarEncoder(ColumnarDelete)
+
+    with pytest.raises(ValueError):
+        encoder.encode({'orderRef': 1})
+    assert encoder.encode({'orderRef': 1}, count=2) == delete(1).to_bytes()[1] * 2
+
+
+def test__columnar_encoder__string_too_long__raises():
+    with pytest.raises(ValueError):
+        soup.ColumnarEncoder(ColumnarEnterOrder).encode({'stock': ['TOO-LONG-SYMBOL']})
+
+
+def test__columnar_encoder__variable_layout__raises():
+    with pytest.raises(ValueError):
+        soup.ColumnarEncoder(ColumnarText)
@@ -1,7 +1,8 @@
 import logging
 
 import pytest
-from nasdaq_protocols import soup
+from nasdaq_protocols import common, soup
+from nasdaq_protocols.soup.soup_app import SoupAppMessage
 
 
 logger = logging.getLogger(__name__)
@@ -254,3 +255,85 @@ def test__logout_request__invalid_message__from_bytes():
 def test__logout_request__invalid_message2__from_bytes():
     with pytest.raises(soup.InvalidSoupMessage):
         soup.SoupMessage.from_bytes(b'\x00\x01O\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00')
+
+
+class FramingTestMessage(SoupAppMessage, app_name='soup_framing_test', indicator=79, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(common.Record):
+        Fields = [
+            common.Field('token', common.FixedAsciiString(14)),
+            common.Field('shares', common.UnsignedIntBE),
+            common.Field('stock', common.AsciiString),
+        ]
+
+
+def framing_message(token='token-1', shares=100, stock='AAPL'):
+    msg = FramingTestMessage()
+    msg.token, msg.shares, msg.stock = token, shares, stock
+    return msg
+
+
+@pytest.mark.parametrize('data_cls', [soup.SequencedData, soup.UnSequencedData])
+def test__application_data__encode_message__same_as_to_bytes(data_cls):
+    msg = framing_message()
+
+    encoded = data_cls.encode_message(msg)
+
+    assert isinstance(encoded, bytearray)
+    assert msg.packed_size() == len(msg.to_bytes()[1])
+    assert encoded == data_cls(msg.to_bytes()[1]).to_bytes()[1]
+    assert soup.SoupMessage.from_bytes(bytes(encoded))[1] == data_cls(msg.to_bytes()[1])
+
+
+def test__application_data__pack_message_into__messages_back_to_back():
+    msgs = [framing_message(), framing_message('token-2', 200, 'MSFT')]
+    buffer = bytearray(sum(soup.UnSequencedData.packed_size(msg) for msg in msgs))
+
+    offset = 0
+    for msg in msgs:
+        offset = soup.UnSequencedData.pack_message_into(memoryview(buffer), offset, msg)
+
+    assert offset == len(buffer)
+    assert buffer == b''.join(soup.UnSequencedData(msg.to_bytes()[1]).to_bytes()[1] for msg in msgs)
+
+
+ALL_SOUP_MESSAGES = [
+    test_login_reject, test_login_accepted, test_login_rejected, test_debug, test_sequenced,
+    test_un_sequenced, client_heartbeat_message, server_heartbeat_message, end_of_session_message,
+    logout_request_message, b'\x00\x01S',
+]
+
+
+@pytest.mark.parametrize('buffer_type', [bytes, bytearray, memoryview])
+def test__soup_message__unpack_from__messages_back_to_back(buffer_type):
+    buffer = buffer_type(b''.join(ALL_SOUP_MESSAGES) + b'\x00\x09Strunc')
+
+    offset, decoded = 0, []
+    for _ in ALL_SOUP_MESSAGES:
+        offset, msg = soup.SoupMessage.unpack_from(buffer, offset)
+        decoded.append(msg)
+
+    assert decoded == [soup.SoupMessage.from_bytes(bytes_)[1] for bytes_ in ALL_SOUP_MESSAGES]
+    payload_type = memoryview if buffer_type is memoryview else bytes
+    data_msgs = (soup.SequencedData, soup.UnSequencedData)
+    assert {type(msg.data) for msg in decoded if isinstance(msg, data_msgs)} == {payload_type}
+    with pytest.raises(soup.InvalidSoupMessage):
+        soup.SoupMessage.unpack_from(buffer, offset)
+
+
+def test__soup_message__unpack_from_subclass__message_must_be_of_the_subclass():
+    assert soup.LoginAccepted.unpack_from(b'xx' + test_login_accepted, 2) == (35, soup.LoginAccepted('test', 2))
+    with pytest.raises(soup.InvalidSoupMessage):
+        soup.LoginAccepted.unpack_from(test_login_rejected)
+
+
+@pytest.mark.parametrize('bytes_', [
+    b'\x00\x05Stest_txt',
+    b'\x00\x03Ztest',
+    test_login_accepted[:-1],
+    b'\x00\x1e' + test_login_accepted[2:-1],
+], ids=['length_field_short', 'header_only_with_body', 'truncated', 'fixed_size_mismatch'])
+def test__soup_message__from_bytes__length_mismatch__exception_is_raised(bytes_):
+    with pytest.raises(soup.InvalidSoupMessage):
+        soup.SoupMessage.from_bytes(bytes_)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from nasdaq_protocols import soup
+
+
+def write_journal(path, count, first_sequence=1, index_interval=4):
+    with soup.JournalWriter(path, index_interval=index_interval) as journal:
+        journal.begin(first_sequence)
+        for i in range(count):
+            journal.append(f'msg-{i}'.encode(), timestamp=1000 + i)
+    return path
+
+
+def frames(journal, sequence=None):
+    return [(seq, timestamp, bytes(payload)) for seq, timestamp, payload in journal.frames(sequence)]
+
+
+def test__journal__written__frames_read_back(tmp_path):
+    path = write_journal(tmp_path / 'test.journal', 10, first_sequence=5)
+
+    with soup.JournalReader(path) as journal:
+        assert len(journal) == 10
+        assert journal.first_sequence == 5
+        assert journal.next_sequence == 15
+        assert frames(journal) == [(5 + i, 1000 + i, f'msg-{i}'.encode()) for i in range(10)]
+
+
+@pytest.mark.parametrize('sequence', [5, 8, 9, 10, 14])
+def test__journal__frames_from_sequence__starts_at_sequence(tmp_path, sequence):
+    path = write_journal(tmp_path / 'test.journal', 10, first_sequence=5)
+
+    with soup.JournalReader(path) as journal:
+        assert frames(journal, sequence) == [(seq, 995 + seq, f'msg-{seq - 5}'.encode()) for seq in range(sequence, 15)]
+        assert bytes(journal.payload(sequence)) == f'msg-{sequence - 5}'.encode()
+        assert journal.timestamp(sequence) == 995 + sequence
+
+
+def test__journal__sequence_not_in_journal__index_error(tmp_path):
+    path = write_journal(tmp_path / 'test.journal', 10, first_sequence=5)
+
+    with soup.JournalReader(path) as journal:
+        for sequence in (4, 15):
+            with pytest.raises(IndexError):
+                journal.payload(sequence)
+        assert frames(journal, 15) == []
+        assert frames(journal, 1)[0][0] == 5
+
+
+def test__journal__index_missing__frames_found_by_scanning(tmp_path):
+    path = write_journal(tmp_path / 'test.journal', 10)
+    os.remove(f'{path}.idx')
+
+    with soup.JournalReader(path) as journal:
+        assert len(journal) == 10
+        assert bytes(journal.payload(10)) == b'msg-9'
+
+
+def test__journal__partial_last_record__ignored(tmp_path):
+    path = write_journal(tmp_path / 'test.journal', 9)
+    os.truncate(path, os.path.getsize(path) - 2)
+
+    with soup.JournalReader(path) as journal:
+        assert len(journal) == 8
+        assert frames(journal, 8) == [(8, 1007, b'msg-7')]
+
+
+def test__journal__empty__no_frames(tmp_path):
+    soup.JournalWriter(tmp_path / 'test.journal').close()
+
+    with soup.JournalReader(tmp_path / 'test.journal') as journal:
+        assert len(journal) == 0
+        assert frames(journal) == []
+
+
+def test__journal__not_a_journal__value_error(tmp_path):
+    (tmp_path / 'test.journal').write_bytes(b'not a journal at all')
+
+    with pytest.raises(ValueError):
+        soup.JournalReader(tmp_path / 'test.journal')
+
+
+def test__journal__payload_referenced__close_raises_until_released(tmp_path):
+    journal = soup.JournalReader(write_journal(tmp_path / 'test.journal', 1))
+    payload = journal.payload(1)
+
+    with pytest.raises(BufferError):
+        journal.close()
+
+    payload.release()
+    journal.close()
+
+
+def test__journal__begin_after_gap__value_error(tmp_path):
+    with soup.JournalWriter(tmp_path / 'test.journal') as journal:
+        journal.begin(1)
+        journal.append(b'msg-0')
+        journal.begin(2)
+
+        with pytest.raises(ValueError):
+            journal.begin(5)
+        assert journal.next_sequence == 2
+
+
+@pytest.mark.parametrize('batch_dispatch', [False, True])
+async def test__soup_client_session__capture__sequenced_messages_journaled(tmp_path, batch_dispatch):
+    server = await soup.SoupServer().start()
+    for i in range(20):
+        server.append(f'msg-{i}'.encode())
+    journal = soup.JournalWriter(tmp_path / 'test.journal', index_interval=8)
+    received = asyncio.Queue()
+
+    async def on_msg(msg):
+        await received.put(msg)
+
+    client = await soup.connect_async(
+        ('127.0.0.1', server.port), 'test-u', 'test-p', '', 5,
+        session_factory=lambda: soup.SoupClientSession(
+            on_msg_coro=on_msg, capture=journal, batch_dispatch=batch_dispatch
+        )
+    )
+    server.append(b'live')
+    for _ in range(17):
+        await asyncio.wait_for(received.get(), 2)
+
+    await client.close()
+    await server.stop()
+    journal.close()
+
+    with soup.JournalReader(tmp_path / 'test.journal') as reader:
+        assert reader.first_sequence == 5
+        assert [payload for _, _, payload in frames(reader)] == [f'msg-{i}'.encode() for i in range(4, 20)] + [b'live']
+        timestamps = [timestamp for _, timestamp, _ in frames(reader)]
+        assert timestamps == sorted(timestamps)
+        assert 0 < time.time_ns() - timestamps[0] < 60 * 10 ** 9
+
+
+@pytest.mark.parametrize('batch_dispatch', [False, True])
+async def test__soup_client_session__capture_relogin_with_gap__capture_stopped(tmp_path, batch_dispatch):
+    server = await soup.SoupServer().start()
+    for i in range(3):
+        server.append(f'msg-{i}'.encode())
+    journal = soup.JournalWriter(tmp_path / 'test.journal')
+    received = asyncio.Queue()
+
+    async def on_msg(msg):
+        await received.put(bytes(msg.data))
+
+    async def connect(sequence):
+        return await soup.connect_async(
+            ('127.0.0.1', server.port), 'test-u', 'test-p', '', sequence,
+            session_factory=lambda: soup.SoupClientSession(
+                on_msg_coro=on_msg, capture=journal, batch_dispatch=batch_dispatch
+            )
+        )
+
+    client = await connect(1)
+    for _ in range(3):
+        await asyncio.wait_for(received.get(), 2)
+    await client.close()
+    for i in range(3, 8):
+        server.append(f'msg-{i}'.encode())
+
+    client = await connect(6)
+    assert [await asyncio.wait_for(received.get(), 2) for _ in range(3)] == [b'msg-5', b'msg-6', b'msg-7']
+    assert client.capture is None
+
+    await client.close()
+    await server.stop()
+    journal.close()
+
+    with soup.JournalReader(tmp_path / 'test.journal') as reader:
+        assert reader.next_sequence == 4
+        assert [payload for _, _, payload in frames(reader)] == [b'msg-0', b'msg-1', b'msg-2']
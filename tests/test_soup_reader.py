@@ -1,3 +1,8 @@
+import asyncio
+from functools import partial
+
+import pytest
+
 from nasdaq_protocols import soup
 from nasdaq_protocols.soup._reader import SoupMessageReader
 
@@ -6,10 +11,12 @@ from .reader_app_tests import *
 
 INPUT1 = soup.LoginRequest('nouser', 'nopassword', 'session', '1')
 INPUT2 = soup.LoginAccepted('session', 10)
+INPUT3 = soup.SequencedData(b'payload')
 MESSAGES = {
     0: soup.LogoutRequest(),
     1: INPUT1,
-    2: INPUT2
+    2: INPUT2,
+    3: INPUT3
 }
 
 
@@ -28,3 +35,98 @@ async def test__soup_reader__all_basic_tests_pass(reader_clientapp_common_tests)
         input_factory,
         output_factory
     )
+
+
+async def test__soup_reader__zero_copy__all_basic_tests_pass(reader_clientapp_common_tests):
+    await reader_clientapp_common_tests(
+        partial(SoupMessageReader, zero_copy=True),
+        input_factory,
+        output_factory
+    )
+
+
+async def test__soup_reader__zero_copy__payloads_are_views_into_arena(handler):
+    reader = SoupMessageReader('test', handler.on_msg, handler.on_close, zero_copy=True)
+
+    reader.on_data(input_factory(3) + input_factory(2) + soup.SequencedData(b'second').to_bytes()[1])
+    first = await asyncio.wait_for(handler.received_messages.get(), 1)
+    login = await asyncio.wait_for(handler.received_messages.get(), 1)
+    second = await asyncio.wait_for(handler.received_messages.get(), 1)
+
+    assert isinstance(first.data, memoryview) and first.data.readonly
+    assert first == INPUT3
+    assert login == INPUT2
+    assert bytes(second.data) == b'second'
+    assert first.data.obj is second.data.obj
+
+    # payloads stay valid while the reader keeps receiving and compacting its buffer.
+    for _ in range(100):
+        reader.on_data(input_factory(3))
+    for _ in range(100):
+        assert await asyncio.wait_for(handler.received_messages.get(), 1) == INPUT3
+    assert bytes(first.data) == b'payload'
+    assert bytes(second.data) == b'second'
+
+    await reader.stop()
+
+
+async def test__soup_reader__receive_buffer__grows_only_for_frames_larger_than_buffer(handler):
+    reader = SoupMessageReader('test', handler.on_msg, handler.on_close, receive_buffer_size=16)
+    small = [soup.SequencedData(f'msg-{i}'.encode()) for i in range(100)]
+    large = soup.SequencedData(b'x' * 100)
+
+    async def feed(stream: bytes, read_size: int):
+        pos = 0
+        while pos < len(stream):
+            buffer = reader.get_buffer(-1)
+            nbytes = min(len(buffer), read_size, len(stream) - pos)
+            buffer[:nbytes] = stream[pos:pos + nbytes]
+            reader.buffer_updated(nbytes)
+            pos += nbytes
+            await asyncio.sleep(0)
+
+    await feed(b''.join(msg.to_bytes()[1] for msg in small), 7)
+    for msg in small:
+        assert await asyncio.wait_for(handler.received_messages.get(), 1) == msg
+    assert len(reader._buffer) == 16
+
+    await feed(large.to_bytes()[1], 7)
+    assert await asyncio.wait_for(handler.received_messages.get(), 1) == large
+    assert len(reader._buffer) >= len(large.to_bytes()[1])
+
+    # on_data keeps working on top of the receive buffer.
+    reader.on_data(small[0].to_bytes()[1])
+    assert await asyncio.wait_for(handler.received_messages.get(), 1) == small[0]
+
+    await reader.stop()
+
+
+@pytest.mark.parametrize('zero_copy', [False, True])
+async def test__soup_reader__heartbeats__skipped_and_counted(handler, zero_copy):
+    reader = SoupMessageReader('test', handler.on_msg, handler.on_close, zero_copy=zero_copy)
+    heartbeats = soup.ServerHeartbeat().to_bytes()[1] + soup.ClientHeartbeat().to_bytes()[1]
+
+    reader.on_data(heartbeats + input_factory(3) + heartbeats + input_factory(2))
+
+    assert await asyncio.wait_for(handler.received_messages.get(), 1) == INPUT3
+    assert await asyncio.wait_for(handler.received_messages.get(), 1) == INPUT2
+    assert reader.metrics.heartbeats_received == 4
+    assert reader.metrics.frames_decoded == 2
+
+    await reader.stop()
+
+
+@pytest.mark.parametrize('zero_copy', [False, True])
+async def test__soup_reader__on_heartbeat__heartbeats_observed(handler, zero_copy):
+    heartbeats = []
+    reader = SoupMessageReader('test', handler.on_msg, handler.on_close,
+                               zero_copy=zero_copy, on_heartbeat=heartbeats.append)
+
+    reader.on_data(soup.ServerHeartbeat().to_bytes()[1] + input_factory(3) + soup.ClientHeartbeat().to_bytes()[1])
+
+    assert await asyncio.wait_for(handler.received_messages.get(), 1) == INPUT3
+    await asyncio.sleep(0)
+    assert heartbeats == [soup.ServerHeartbeat(), soup.ClientHeartbeat()]
+    assert handler.received_messages.empty()
+
+    await reader.stop()
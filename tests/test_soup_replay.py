@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from nasdaq_protocols.common import *
+from nasdaq_protocols import itch, soup
+
+
+class ReplayTestMessage(itch.Message, indicator=90, direction='outgoing'):
+    __test__ = False
+    class BodyRecord(Record):
+        Fields = [
+            Field('orderToken', LongBE),
+        ]
+
+    @staticmethod
+    def get(key):
+        msg = ReplayTestMessage()
+        msg.orderToken = key
+        return msg
+
+
+def packets(count):
+    return b''.join(soup.SequencedData(f'msg-{i}'.encode()).to_bytes()[1] for i in range(count))
+
+
+def write_journal(path, payloads, interval_ns=0):
+    with soup.JournalWriter(path) as journal:
+        for i, payload in enumerate(payloads):
+            journal.append(payload, timestamp=1_000_000_000 + i * interval_ns)
+    return path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+async def test__replay__raw_bytes__all_messages_handled(chunk_size):
+    received = []
+
+    async def on_msg(msg):
+        received.append(bytes(msg.data))
+
+    session = soup.SoupClientSession(on_msg_coro=on_msg)
+    stats = await soup.replay(packets(100), session, chunk_size=chunk_size)
+
+    assert received == [f'msg-{i}'.encode() for i in range(100)]
+    assert stats.messages == 100
+    assert stats.bytes == len(packets(100))
+    assert stats.messages_per_second > 0
+    assert set(stats.stages) == {'read', 'decode', 'dispatch'}
+    await session.close()
+
+
+@pytest.mark.parametrize('batch_dispatch', [False, True])
+async def test__replay__journal__application_messages_handled(tmp_path, batch_dispatch):
+    received = []
+
+    def on_msg(msg):
+        received.append(msg.orderToken)
+
+    path = write_journal(tmp_path / 'test.journal', [ReplayTestMessage.get(i).to_bytes()[1] for i in range(1000)])
+    session = itch.ClientSession(soup.SoupClientSession(batch_dispatch=batch_dispatch), on_msg_coro=on_msg)
+
+    stats = await soup.replay(path, session, chunk_size=100)
+
+    assert received == list(range(1000))
+    assert stats.messages == 1000
+    assert set(stats.stages) == {'read', 'decode', 'dispatch', 'handler'}
+    await session.close()
+
+
+async def test__replay__journal_from_sequence__messages_from_sequence_handled(tmp_path):
+    received = []
+    path = write_journal(tmp_path / 'test.journal', [f'msg-{i}'.encode() for i in range(10)])
+    session = soup.SoupClientSession(on_msg_coro=lambda msg: received.append(bytes(msg.data)))
+
+    with soup.JournalReader(path) as journal:
+        await soup.replay(journal, session, sequence=8)
+
+    assert received == [b'msg-7', b'msg-8', b'msg-9']
+    await session.close()
+
+
+@pytest.mark.parametrize('speed, expected_duration', [(1, 0.2), (4, 0.05)])
+async def test__replay__paced__original_timing_scaled(tmp_path, speed, expected_duration):
+    arrivals = []
+    path = write_journal(tmp_path / 'test.journal', [b'x'] * 5, interval_ns=50_000_000)
+    session = soup.SoupClientSession(on_msg_coro=lambda msg: arrivals.append(time.perf_counter()))
+
+    stats = await soup.replay(path, session, speed=speed)
+
+    assert len(arrivals) == 5
+    assert expected_duration <= arrivals[-1] - arrivals[0] < expected_duration + 0.5
+    assert stats.elapsed >= expected_duration
+    await session.close()
+
+
+async def test__replay__paced_raw_bytes__value_error():
+    with pytest.raises(ValueError):
+        await soup.replay(packets(1), soup.SoupClientSession(), speed=1)
+
+
+async def test__replay__end_of_session__replay_stops():
+    received = []
+    session = soup.SoupClientSession(on_msg_coro=lambda msg: received.append(msg))
+    stream = packets(2) + soup.EndOfSession().to_bytes()[1] + packets(2)
+
+    await soup.replay(stream, session)
+
+    assert len(received) == 2
+    assert session.is_closed()
+
+
+async def test__session__feed_not_connected__state_error():
+    with pytest.raises(StateError):
+        await soup.SoupClientSession().feed(packets(1))
+
+
+async def test__session__feed_connected_to_network__state_error():
+    server = await soup.SoupServer().start()
+    session = await soup.connect_async(('127.0.0.1', server.port), 'test-u', 'test-p', '')
+
+    with pytest.raises(StateError):
+        await session.feed(packets(1))
+
+    await session.close()
+    await server.stop()
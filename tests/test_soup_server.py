@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+from nasdaq_protocols import soup
+
+
+async def connect(server, sequence=1, user='test-u', session='', **kwargs):
+    received = asyncio.Queue()
+
+    async def on_msg(msg):
+        await received.put(msg)
+
+    client = await soup.connect_async(
+        ('127.0.0.1', server.port), user, 'test-p', session, sequence, on_msg_coro=on_msg, **kwargs
+    )
+    return client, received
+
+
+async def receive(received, count):
+    return [bytes((await asyncio.wait_for(received.get(), 2)).data) for _ in range(count)]
+
+
+@pytest.fixture(params=['memory', 'mmap'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return soup.MemoryStore()
+    return soup.MmapStore(tmp_path / 'store.log', initial_size=64)
+
+
+def test__sequenced_store__append__indexed_by_sequence(store):
+    assert store.next_sequence == 1
+    for i in range(100):
+        assert store.append(f'msg-{i}'.encode()) == i + 1
+
+    assert len(store) == 100
+    assert store.payload(1) == b'msg-0'
+    assert store.payload(100) == b'msg-99'
+    with pytest.raises(IndexError):
+        store.payload(101)
+    store.close()
+
+
+def test__sequenced_store__read_packets__batched_up_to_max_bytes(store):
+    packets = [soup.SequencedData(f'msg-{i}'.encode()).to_bytes()[1] for i in range(10)]
+    for packet in packets:
+        store.append(packet[3:])
+
+    assert store.read_packets(1, 3 * len(packets[0])) == (b''.join(packets[:3]), 3)
+    assert store.read_packets(9, 1000) == (b''.join(packets[8:]), 2)
+    assert store.read_packets(4, 1) == (packets[3], 1)
+    assert store.read_packets(11, 1000) == (b'', 0)
+    store.close()
+
+
+def test__mmap_store__reopened__messages_indexed_again(tmp_path):
+    store = soup.MmapStore(tmp_path / 'store.log', initial_size=16)
+    for i in range(50):
+        store.append(f'msg-{i}'.encode())
+    store.close()
+    assert (tmp_path / 'store.log').stat().st_size == sum(3 + len(f'msg-{i}') for i in range(50))
+
+    store = soup.MmapStore(tmp_path / 'store.log')
+    assert len(store) == 50
+    assert store.append(b'msg-50') == 51
+    assert [store.payload(i + 1) for i in range(51)] == [f'msg-{i}'.encode() for i in range(51)]
+    store.close()
+
+
+async def test__soup_server__login_from_sequence__stored_then_live_messages_received():
+    server = await soup.SoupServer(batch_bytes=32).start()
+    for i in range(10):
+        server.append(f'msg-{i}'.encode())
+
+    client, received = await connect(server, sequence=4)
+    assert await receive(received, 7) == [f'msg-{i}'.encode() for i in range(3, 10)]
+
+    server.append(b'live-1')
+    server.append(b'live-2')
+    assert await receive(received, 2) == [b'live-1', b'live-2']
+    assert received.empty()
+
+    await client.close()
+    await server.stop()
+
+
+async def test__soup_server__login_sequence_0__live_messages_only():
+    server = await soup.SoupServer().start()
+    server.append(b'old')
+
+    client, received = await connect(server, sequence=0)
+    server.append(b'new')
+
+    assert await receive(received, 1) == [b'new']
+
+    await client.close()
+    await server.stop()
+
+
+async def test__soup_server__many_sessions__appends_fanned_out():
+    server = await soup.SoupServer().start()
+    server.append(b'first')
+    clients = [await connect(server) for _ in range(50)]
+
+    for i in range(20):
+        server.append(f'live-{i}'.encode())
+
+    expected = [b'first'] + [f'live-{i}'.encode() for i in range(20)]
+    for _, received in clients:
+        assert await receive(received, 21) == expected
+
+    for client, _ in clients:
+        await client.close()
+    await server.stop()
+
+
+async def test__soup_server__authentication_failed__login_rejected():
+    server = await soup.SoupServer(authenticate=lambda user, password: user == 'good').start()
+
+    with pytest.raises(ConnectionRefusedError):
+        await connect(server, user='bad')
+    client, _ = await connect(server, user='good')
+
+    await client.close()
+    await server.stop()
+
+
+async def test__soup_server__other_session__login_rejected():
+    server = await soup.SoupServer(session_name='session').start()
+
+    with pytest.raises(ConnectionRefusedError):
+        await connect(server, session='other')
+
+    await server.stop()
+
+
+async def test__soup_server__unsequenced__handler_called():
+    received = asyncio.Queue()
+
+    async def on_unsequenced(session, msg):
+        await received.put(msg.data)
+        session.server.append(b'ack-' + msg.data)
+
+    server = await soup.SoupServer(on_unsequenced=on_unsequenced).start()
+    client, acks = await connect(server)
+
+    client.send_unseq_data(b'order')
+
+    assert await asyncio.wait_for(received.get(), 2) == b'order'
+    assert await receive(acks, 1) == [b'ack-order']
+
+    await client.close()
+    await server.stop()
+
+
+async def test__soup_server__end_session__clients_closed():
+    server = await soup.SoupServer().start()
+    client, _ = await connect(server)
+
+    server.end_session()
+
+    await asyncio.wait_for(received_close(client), 2)
+    await server.stop()
+
+
+async def received_close(client):
+    while not client.is_closed():
+        await asyncio.sleep(0.01)
+
+
+class FakeTransport(asyncio.Transport):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+
+    def get_extra_info(self, name, default=None):
+        return ('127.0.0.1', 0) if name == 'peername' else default
+
+    def close(self):
+        pass
+
+    def is_closing(self):
+        return False
+
+
+async def test__sequenced_server_session__writing_paused__streaming_resumed_on_resume_writing():
+    server = soup.SoupServer(batch_bytes=16)
+    for i in range(10):
+        server.append(f'msg-{i}'.encode())
+    session = server.create_session()
+    session.connection_made(FakeTransport())
+    session.sequence = 1
+    session._logged_in = True
+
+    session.pause_writing()
+    session.pump()
+    assert session._transport.writes == []
+
+    session.resume_writing()
+    await asyncio.sleep(0)
+    assert b''.join(session._transport.writes) == server.store.read_packets(1, 1000)[0]
+    assert len(session._transport.writes) == 5
+    assert session.sequence == 11
+
+    await session.close()
+    assert not server.sessions
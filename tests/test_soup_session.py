@@ -4,8 +4,9 @@ import time
 import attrs
 import pytest
 
-from nasdaq_protocols import soup
+from nasdaq_protocols import common, soup
 from nasdaq_protocols.soup import LoginRequest, LoginAccepted, LoginRejected, UnSequencedData
+from nasdaq_protocols.soup.soup_app import SoupAppMessage
 from tests.mocks import matches, send
 
 
@@ -366,3 +367,237 @@ def test__sync_soup_session__sending_debug_from_client(sync_mock_server_session)
 
     client_session.logout()
     sync_wait_for_session_close(client_session)
+
+
+async def test__soup_session__batch_dispatch__sequence_tracks_all_sequenced_messages(mock_server_session):
+    port, server_session = mock_server_session
+    server_session.when(
+        matches(soup.LoginRequest('test-u', 'test-p', 'session', '1')), 'login-request-match',
+    ).do(
+        send(LoginAccepted('session', 1)), 'login-accepted'
+    ).do(
+        lambda session, _: session.send(b''.join(soup.SequencedData(f'msg-{i}'.encode()).to_bytes()[1]
+                                                 for i in range(10))),
+        'stream'
+    )
+
+    client_session = await soup.connect_async(
+        ('127.0.0.1', port),
+        'test-u',
+        'test-p',
+        'session',
+        session_factory=lambda: soup.SoupClientSession(batch_dispatch=True)
+    )
+
+    for i in range(10):
+        reply = await client_session.receive_msg()
+        assert reply.data == f'msg-{i}'.encode()
+    assert client_session.sequence == 10
+
+    client_session.logout()
+
+    await wait_for_session_close(client_session)
+
+
+async def test__soup_session__metrics__traffic_counted(mock_server_session):
+    port, server_session = mock_server_session
+    server_session = configure_login_accept(server_session)
+    server_session.when(
+        matches(UnSequencedData(b'ping')), 'ping-match'
+    ).do(
+        send(soup.SequencedData(b'pong')), 'pong'
+    )
+
+    client_session = await soup.connect_async(('127.0.0.1', port), 'test-u', 'test-p', 'session')
+    client_session.send_unseq_data(b'ping')
+    assert await client_session.receive_msg() == soup.SequencedData(b'pong')
+
+    metrics = client_session.metrics
+    assert metrics in list(common.REGISTRY._metrics)
+    assert metrics.bytes_out == len(LoginRequest('test-u', 'test-p', 'session', '1').to_bytes()[1]) + \
+        len(UnSequencedData(b'ping').to_bytes()[1])
+    assert metrics.bytes_in == len(LoginAccepted('session', 1).to_bytes()[1]) + \
+        len(soup.SequencedData(b'pong').to_bytes()[1])
+    assert metrics.frames_decoded == 2
+    assert metrics.decode_time.count == 2
+    assert metrics.sequence_gaps == 0
+
+    client_session.logout()
+    await wait_for_session_close(client_session)
+
+
+async def test__soup_session__login_accepted_ahead_of_requested__sequence_gap_counted(mock_server_session):
+    port, server_session = mock_server_session
+    server_session.when(
+        matches(soup.LoginRequest('test-u', 'test-p', 'session', '5')), 'login-request-match',
+    ).do(
+        send(LoginAccepted('session', 10)), 'login-accepted'
+    )
+
+    client_session = await soup.connect_async(('127.0.0.1', port), 'test-u', 'test-p', 'session', sequence=5)
+
+    assert client_session.metrics.sequence_gaps == 1
+    assert client_session.sequence == 9
+
+    client_session.logout()
+    await wait_for_session_close(client_session)
+
+
+async def test__soup_session__zero_copy__sequenced_payload_is_memoryview(mock_server_session):
+    port, server_session = mock_server_session
+    server_session = configure_login_accept(server_session)
+    server_session.when(
+        matches(soup.UnSequencedData(b'hello')), 'unsequenced-data'
+    ).do(
+        send(soup.SequencedData(b'hello-ack'))
+    )
+
+    client_session = await soup.connect_async(
+        ('127.0.0.1', port),
+        'test-u',
+        'test-p',
+        'session',
+        session_factory=lambda: soup.SoupClientSession(zero_copy=True)
+    )
+
+    client_session.send_msg(soup.UnSequencedData(b'hello'))
+    reply = await client_session.receive_msg()
+    assert isinstance(reply.data, memoryview)
+    assert reply == soup.SequencedData(b'hello-ack')
+
+    client_session.logout()
+
+    await wait_for_session_close(client_session)
+
+
+async def test__soup_session__buffered_protocol__able_to_stream_messages(mock_server_session):
+    port, server_session = mock_server_session
+    server_session = configure_login_accept(server_session)
+    stream = [soup.SequencedData(f'msg-{i}'.encode()) for i in range(10000)]
+    server_session.when(
+        matches(soup.UnSequencedData(b'start')), 'start-stream'
+    ).do(
+        lambda session, _: session.send(b''.join(msg.to_bytes()[1] for msg in stream))
+    )
+
+    client_session = await soup.connect_async(
+        ('127.0.0.1', port),
+        'test-u',
+        'test-p',
+        'session',
+        buffered_protocol=True
+    )
+    assert isinstance(client_session, asyncio.BufferedProtocol)
+
+    client_session.send_msg(soup.UnSequencedData(b'start'))
+    for msg in stream:
+        assert await asyncio.wait_for(client_session.receive_msg(), 1) == msg
+
+    client_session.logout()
+
+    await wait_for_session_close(client_session)
+
+
+async def test__soup_session__send_encoded__packets_written_in_one_write(mock_server_session):
+    port, server_session = mock_server_session
+    server_session = configure_login_accept(server_session)
+    client_session = await soup.connect_async(('127.0.0.1', port), 'test-u', 'test-p', 'session')
+    encoded = b''.join(soup.UnSequencedData(f'hello-{i}'.encode()).to_bytes()[1] for i in range(1, 3))
+    server_session.when(
+        lambda data: data == encoded, 'unsequenced-batch'
+    ).do(
+        send(soup.SequencedData(b'hello-1-ack'))
+    ).do(
+        send(soup.SequencedData(b'hello-2-ack'))
+    )
+    bytes_out = client_session.metrics.bytes_out
+
+    client_session.send_encoded(encoded)
+
+    assert client_session.metrics.bytes_out == bytes_out + len(encoded)
+    for i in range(1, 3):
+        reply = await client_session.receive_msg()
+        assert reply.data == f'hello-{i}-ack'.encode()
+
+    client_session.logout()
+    await wait_for_session_close(client_session)
+
+
+class SessionTestMessage(SoupAppMessage, app_name='soup_session_test', indicator=79, direction='outgoing'):
+    __test__ = False
+
+    class BodyRecord(common.Record):
+        Fields = [
+            common.Field('token', common.FixedAsciiString(4)),
+            common.Field('text', common.AsciiString),
+        ]
+
+
+async def test__soup_session__send_unseq_msg__message_framed_in_place(mock_server_session):
+    port, server_session = mock_server_session
+    server_session = configure_login_accept(server_session)
+    msg = SessionTestMessage()
+    msg.token, msg.text = 'T1', 'ping'
+    server_session.when(
+        matches(UnSequencedData(msg.to_bytes()[1])), 'msg-match'
+    ).do(
+        send(soup.SequencedData(b'pong')), 'pong'
+    )
+
+    client_session = await soup.connect_async(('127.0.0.1', port), 'test-u', 'test-p', 'session')
+    client_session.send_unseq_msg(msg)
+
+    assert await client_session.receive_msg() == soup.SequencedData(b'pong')
+
+    client_session.logout()
+    await wait_for_session_close(client_session)
+
+
+def test__sync_soup_session__send_unseq_msg__message_sent(sync_mock_server_session):
+    port, server_session = sync_mock_server_session
+    server_session = configure_login_accept(server_session)
+    msg = SessionTestMessage()
+    msg.token, msg.text = 'T2', 'ping'
+    server_session.when(
+        matches(UnSequencedData(msg.to_bytes()[1])), 'msg-match'
+    ).do(
+        send(soup.SequencedData(b'pong')), 'pong'
+    )
+
+    client_session = soup.connect(('127.0.0.1', port), 'test-u', 'test-p', 'session')
+    client_session.send_unseq_msg(msg)
+
+    assert client_session.receive() == soup.SequencedData(b'pong')
+
+    client_session.logout()
+    sync_wait_for_session_close(client_session)
+
+
+async def test__soup_session__on_heartbeat__server_heartbeats_observed(mock_server_session):
+    port, server_session = mock_server_session
+    server_session = configure_login_accept(server_session)
+    server_session.when(
+        matches(soup.UnSequencedData(b'hello')), 'unsequenced-data'
+    ).do(
+        send(soup.ServerHeartbeat())
+    ).do(
+        send(soup.SequencedData(b'hello-ack'))
+    )
+    heartbeats = []
+
+    client_session = await soup.connect_async(
+        ('127.0.0.1', port),
+        'test-u',
+        'test-p',
+        'session',
+        session_factory=lambda: soup.SoupClientSession(on_heartbeat=heartbeats.append)
+    )
+
+    client_session.send_msg(soup.UnSequencedData(b'hello'))
+    assert await client_session.receive_msg() == soup.SequencedData(b'hello-ack')
+    assert heartbeats == [soup.ServerHeartbeat()]
+    assert client_session.metrics.heartbeats_received == 1
+
+    client_session.logout()
+
+    await wait_for_session_close(client_session)